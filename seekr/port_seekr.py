@@ -1,13 +1,19 @@
 import asyncio
 import socket
-import ssl
 import psutil
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress
 from scapy.all import ARP, Ether, srp
 import ipaddress
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from skr_scanner import async_check_open_ports, scan_hosts
+from skr_fingerprint import fingerprint_port, fingerprint_services
+from skr_ports import parse_port_spec
+from skr_records import Device
+from skr_events import event_bus
+from skr_discovery import async_sweep_network, interface_network
+from skr_utils import is_admin
+from skr_tls import get_tls_context, peer_certificates, summarize_certificate
 import requests
 from urllib.parse import urlparse
 
@@ -37,7 +43,7 @@ def get_network_range(local_ip):
     if not local_ip:
         return None
     try:
-        return str(ipaddress.ip_network(f"{local_ip}/24", strict=False))
+        return str(interface_network(local_ip))
     except ValueError as e:
         console.print(f"[bold red]Error getting network range: {e}[/bold red]")
         return None
@@ -54,12 +60,18 @@ async def async_scan_network(target_ip):
     with console.status("[bold cyan]Sending ARP requests to discover devices...[/bold cyan]"):
         result = await loop.run_in_executor(None, send_packet)
     
-    devices = [{'ip': received.psrc, 'mac': received.hwsrc} for sent, received in result]
+    devices = [Device(received.psrc, received.hwsrc, "arp") for sent, received in result]
 
     if not devices:
         console.print("[bold yellow]No devices found. Check your network settings and try again.[/bold yellow]")
     return devices
 
+async def find_devices(network_range):
+    """Use an ARP broadcast when running as root, and an unprivileged TCP/ICMP sweep otherwise."""
+    if is_admin():
+        return await async_scan_network(network_range)
+    return await async_sweep_network(network_range)
+
 def display_devices(devices):
     table = Table(title="Available Devices")
     table.add_column("Index", justify="right", style="cyan", no_wrap=True)
@@ -67,7 +79,7 @@ def display_devices(devices):
     table.add_column("MAC Address", style="green")
 
     for index, device in enumerate(devices):
-        table.add_row(str(index + 1), device['ip'], device['mac'])
+        table.add_row(str(index + 1), device.ip, device.mac or "Unknown")
 
     console.print(table)
 
@@ -78,22 +90,22 @@ def scan_port(target, port):
     sock.close()
     return port if result == 0 else None
 
+async def async_scan_ports(target, port_range=(1, 1000)):
+    try:
+        ports = parse_port_spec(port_range)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return []
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Scanning {target}", total=len(ports))
+        try:
+            return await async_check_open_ports(target, ports, progress=task.advance)
+        except OSError as e:
+            console.print(f"[bold red]An error occurred while scanning {target}: {str(e)}[/bold red]")
+            return []
+
 def check_open_ports(target, port_range=(1, 1000)):
-    open_ports = []
-    with ThreadPoolExecutor(max_workers=100) as executor:
-        future_to_port = {executor.submit(scan_port, target, port): port for port in range(port_range[0], port_range[1] + 1)}
-        with Progress() as progress:
-            task = progress.add_task(f"[cyan]Scanning {target}", total=port_range[1] - port_range[0] + 1)
-            for future in as_completed(future_to_port):
-                port = future_to_port[future]
-                try:
-                    result = future.result()
-                    if result:
-                        open_ports.append(result)
-                    progress.update(task, advance=1, description=f"[cyan]Scanning {target} - Port {port}")
-                except Exception as e:
-                    console.print(f"[bold red]An error occurred while scanning port {port}: {str(e)}[/bold red]")
-    return open_ports
+    return asyncio.run(async_scan_ports(target, port_range))
 
 def get_service_name(port):
     try:
@@ -103,16 +115,15 @@ def get_service_name(port):
 
 def get_ssl_info(ip, port):
     try:
-        context = ssl.create_default_context()
         with socket.create_connection((ip, port), timeout=3) as sock:
-            with context.wrap_socket(sock, server_hostname=ip) as secure_sock:
-                cert = secure_sock.getpeercert()
-                return {
-                    "Issuer": dict(x[0] for x in cert['issuer']),
-                    "Subject": dict(x[0] for x in cert['subject']),
-                    "Version": cert['version'],
-                    "Serial Number": cert['serialNumber'],
-                }
+            with get_tls_context().wrap_socket(sock) as secure_sock:
+                chain = peer_certificates(secure_sock)
+                if not chain:
+                    return "SSL Error: no certificate presented"
+                info = summarize_certificate(chain[0])
+                info["Version"] = secure_sock.version()
+                info["Cipher"] = secure_sock.cipher()[0]
+                return info
     except Exception as e:
         return f"SSL Error: {str(e)}"
 
@@ -129,76 +140,90 @@ def get_http_info(ip, port):
         return f"HTTP Error: {str(e)}"
 
 def analyze_port(ip, port):
-    service_name = get_service_name(port)
-    result = {
-        "Port": port,
-        "Service": service_name,
-        "SSL Info": None,
-        "HTTP Info": None,
-    }
+    return asyncio.run(fingerprint_port(ip, port))[1]
 
-    if service_name in ['https', 'ssl']:
-        result["SSL Info"] = get_ssl_info(ip, port)
+async def async_closer_look(targets):
+    """Fingerprint the open ports of several hosts in one pipeline; `targets` maps ip -> ports."""
+    pairs = [(ip, port) for ip, ports in targets.items() for port in ports]
+    if len(targets) == 1:
+        console.print(f"\n[bold cyan]Performing a closer look at open ports on {next(iter(targets))}...[/bold cyan]")
+    else:
+        console.print(f"\n[bold cyan]Performing a closer look at {len(pairs)} open ports on {len(targets)} devices...[/bold cyan]")
 
-    if service_name in ['http', 'https']:
-        result["HTTP Info"] = get_http_info(ip, port)
+    results = {ip: [] for ip in targets}
+    with event_bus() as bus:
+        task = bus.add_task("[cyan]Analyzing ports...", total=len(pairs))
+        async for ip, result in fingerprint_services(pairs, progress=task.advance):
+            results[ip].append(result)
 
-    return result
+    for ip, host_results in results.items():
+        display_analysis_results(sorted(host_results, key=lambda result: result.port), ip)
 
 def closer_look(ip, open_ports):
-    console.print(f"\n[bold cyan]Performing a closer look at open ports on {ip}...[/bold cyan]")
-    results = []
-
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Analyzing ports...", total=len(open_ports))
-        
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_port = {executor.submit(analyze_port, ip, port): port for port in open_ports}
-            for future in as_completed(future_to_port):
-                port = future_to_port[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    console.print(f"[bold red]An error occurred while analyzing port {port}: {str(e)}[/bold red]")
-                progress.update(task, advance=1)
-
-    display_analysis_results(results)
-
-def display_analysis_results(results):
-    table = Table(title="Port Analysis Results")
+    asyncio.run(async_closer_look({ip: open_ports}))
+
+def display_analysis_results(results, ip=None):
+    table = Table(title=f"Port Analysis Results for {ip}" if ip else "Port Analysis Results")
     table.add_column("Port", style="cyan")
     table.add_column("Service", style="magenta")
+    table.add_column("Banner", style="blue")
     table.add_column("SSL Info", style="green")
     table.add_column("HTTP Info", style="yellow")
 
     for result in results:
-        ssl_info = str(result["SSL Info"]) if result["SSL Info"] else "N/A"
-        http_info = str(result["HTTP Info"]) if result["HTTP Info"] else "N/A"
+        ssl_info = str(result.ssl_info) if result.ssl_info else "N/A"
+        http_info = str(result.http_info) if result.http_info else "N/A"
         table.add_row(
-            str(result["Port"]),
-            result["Service"],
+            str(result.port),
+            result.service,
+            result.banner or "N/A",
             ssl_info,
             http_info
         )
 
     console.print(table)
 
-async def scan_single_device(target):
+async def scan_single_device(target, port_range=(1, 1000)):
     console.print(f"\n[bold cyan]Scanning {target}...[/bold cyan]")
-    open_ports = check_open_ports(target)
+    open_ports = await async_scan_ports(target, port_range)
 
     if open_ports:
         console.print(f"\n[bold green]Open ports on {target}:[/bold green] {sorted(open_ports)}")
         choice = input("Do you want to take a closer look at these ports? (y/n): ")
         if choice.lower() == 'y':
-            closer_look(target, open_ports)
+            await async_closer_look({target: open_ports})
     else:
         console.print("\n[bold yellow]No open ports found.[/bold yellow]")
 
-async def scan_all_devices(devices):
-    for device in devices:
-        await scan_single_device(device['ip'])
+async def scan_all_devices(devices, port_range=(1, 1000)):
+    targets = [device.ip for device in devices]
+    try:
+        ports = parse_port_spec(port_range)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return
+
+    console.print(f"\n[bold cyan]Scanning {len(targets)} devices...[/bold cyan]")
+
+    results = {}
+    with event_bus() as bus:
+        task = bus.add_task("[cyan]Scanning devices", total=len(targets) * len(ports))
+        async for target, open_ports, error in scan_hosts(targets, ports, progress=task.advance):
+            if error:
+                bus.message(f"[bold red]An error occurred while scanning {target}: {str(error)}[/bold red]")
+            elif open_ports:
+                bus.message(f"[bold green]Open ports on {target}:[/bold green] {open_ports.to_list()}")
+                results[target] = open_ports.to_list()
+            else:
+                bus.message(f"[bold yellow]No open ports found on {target}.[/bold yellow]")
+
+    selected = {}
+    for target, open_ports in results.items():
+        choice = input(f"Do you want to take a closer look at the ports on {target}? (y/n): ")
+        if choice.lower() == 'y':
+            selected[target] = open_ports
+    if selected:
+        await async_closer_look(selected)
 
 async def main_menu():
     local_ip = get_local_ip()
@@ -215,7 +240,7 @@ async def main_menu():
     if not network_range:
         return
 
-    devices = await async_scan_network(network_range)
+    devices = await find_devices(network_range)
 
     if not devices:
         return
@@ -240,7 +265,7 @@ async def main_menu():
             try:
                 device_index = int(device_choice) - 1
                 if 0 <= device_index < len(devices):
-                    await scan_single_device(devices[device_index]['ip'])
+                    await scan_single_device(devices[device_index].ip)
                 else:
                     console.print("[bold red]Invalid device number.[/bold red]")
             except ValueError:
@@ -248,7 +273,7 @@ async def main_menu():
         elif choice == '3':
             await scan_all_devices(devices)
         elif choice == '4':
-            devices = await async_scan_network(network_range)
+            devices = await find_devices(network_range)
             if devices:
                 display_devices(devices)
             else:
@@ -1,14 +1,28 @@
+import sys
 import asyncio
+import threading
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from skr_tools import (
     scan_directories, get_all_drives, scan_drive, visualize_storage,
     generate_storage_report, show_performance_metrics, optimize_performance
 )
+from skr_memory import analyze_memory_attribution
+from skr_governor import display_governor_status
 from skr_network import (
     get_local_ip, get_network_interface, get_network_range, async_scan_network,
-    display_devices, scan_single_device, scan_all_devices
+    display_devices, scan_single_device, scan_all_devices, discover_devices, delta_rescan,
+    find_devices, analyze_network_connections
 )
+from skr_inventory import Inventory, display_inventory
+from skr_ports import parse_port_spec
+from skr_tls import audit_tls_network, display_certificates
+from skr_throughput import DEFAULT_PORT, start_server, run_peer_test, display_peer_results
+from skr_coordinator import distributed_sweep, parse_remote
+from skr_jobs import (
+    JobManager, MAX_SAMPLES, directory_scan_job, port_scan_job, sweep_job, sampling_job, display_jobs, display_job_results
+)
+import skr_cli
 
 console = Console()
 
@@ -52,15 +66,25 @@ async def performance_menu():
         console.print("\n[bold cyan]Performance Analysis Menu:[/bold cyan]")
         console.print("1. Show performance metrics")
         console.print("2. Optimize system performance")
-        console.print("3. Return to main menu")
+        console.print("3. Analyze memory by application")
+        console.print("4. Analyze network connections")
+        console.print("5. Show resource governor status")
+        console.print("6. Return to main menu")
 
-        performance_choice = Prompt.ask("Enter your choice", choices=["1", "2", "3"], default="3")
+        performance_choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5", "6"], default="6")
 
         if performance_choice == '1':
             show_performance_metrics()
         elif performance_choice == '2':
             optimize_performance()
         elif performance_choice == '3':
+            group_by = Prompt.ask("Group by", choices=["exe", "cgroup"], default="exe")
+            analyze_memory_attribution(group_by)
+        elif performance_choice == '4':
+            analyze_network_connections()
+        elif performance_choice == '5':
+            display_governor_status()
+        elif performance_choice == '6':
             break
 
 async def network_menu():
@@ -78,7 +102,8 @@ async def network_menu():
     if not network_range:
         return
 
-    devices = await async_scan_network(network_range)
+    inventory = Inventory()
+    devices = await discover_devices(network_range, inventory)
 
     if not devices:
         return
@@ -89,9 +114,15 @@ async def network_menu():
         console.print("2. Scan a single device")
         console.print("3. Scan all devices")
         console.print("4. Rescan network")
-        console.print("5. Return to main menu")
+        console.print("5. Delta rescan (known ports and new devices)")
+        console.print("6. Show device inventory")
+        console.print("7. Audit TLS certificates")
+        console.print("8. Sweep a subnet for live hosts (no root needed)")
+        console.print("9. Peer throughput test (between seekr instances)")
+        console.print("10. Distributed sweep (multi-process and remote workers)")
+        console.print("11. Return to main menu")
 
-        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5"], default="5")
+        choice = Prompt.ask("Enter your choice", choices=[str(i) for i in range(1, 12)], default="11")
 
         if choice == '1':
             display_devices(devices)
@@ -103,45 +134,193 @@ async def network_menu():
             try:
                 device_index = int(device_choice) - 1
                 if 0 <= device_index < len(devices):
-                    await scan_single_device(devices[device_index]['ip'])
+                    port_spec = Prompt.ask("Ports to scan (e.g. 22,80,8000-9000 or all)", default="1-1000")
+                    await scan_single_device(devices[device_index].ip, port_spec, inventory)
                 else:
                     console.print("[bold red]Invalid device number.[/bold red]")
             except ValueError:
                 console.print("[bold red]Invalid input. Please enter a number or 'b'.[/bold red]")
         elif choice == '3':
-            await scan_all_devices(devices)
+            port_spec = Prompt.ask("Ports to scan (e.g. 22,80,8000-9000 or all)", default="1-1000")
+            await scan_all_devices(devices, port_spec, inventory)
         elif choice == '4':
-            devices = await async_scan_network(network_range)
+            devices = await discover_devices(network_range, inventory, ttl=0)
             if devices:
                 display_devices(devices)
             else:
                 console.print("[bold yellow]No devices found after rescan.[/bold yellow]")
         elif choice == '5':
+            devices = await delta_rescan(inventory, network_range) or devices
+        elif choice == '6':
+            display_inventory(inventory, network_range)
+        elif choice == '7':
+            network = Prompt.ask("Network to audit (up to a /16)", default=network_range)
+            port_spec = Prompt.ask("TLS ports", default="443,8443")
+            try:
+                results = await audit_tls_network(network, parse_port_spec(port_spec))
+            except ValueError as e:
+                console.print(f"[bold red]{e}[/bold red]")
+                continue
+            display_certificates(results)
+        elif choice == '8':
+            network = Prompt.ask("Network to sweep (up to a /16)", default=network_range)
+            found = await find_devices(network, method="sweep")
+            if found:
+                inventory.record_devices(found)
+                devices = found
+                display_devices(devices)
+        elif choice == '9':
+            role = Prompt.ask("Run as", choices=["server", "client"], default="client")
+            port = Prompt.ask("Port", default=str(DEFAULT_PORT)).strip()
+            if not port.isdigit() or not 0 < int(port) < 65536:
+                console.print("[bold red]The port must be a number from 1 to 65535.[/bold red]")
+                continue
+            port = int(port)
+            if role == "server":
+                bind = Prompt.ask("Listen address (0.0.0.0 for every interface)", default="127.0.0.1")
+                try:
+                    server = start_server(bind, port)
+                except OSError as e:
+                    console.print(f"[bold red]Could not start the server: {e}[/bold red]")
+                    continue
+                console.print(f"[bold cyan]Waiting for peer tests on {local_ip if bind == '0.0.0.0' else bind}:{port}.[/bold cyan]")
+                Prompt.ask("Press Enter to stop the server", default="")
+                server.shutdown()
+                server.server_close()
+            else:
+                peer = Prompt.ask("Peer address")
+                streams = Prompt.ask("Parallel streams", default="4").strip()
+                if not streams.isdigit() or int(streams) < 1:
+                    console.print("[bold red]The stream count must be a positive whole number.[/bold red]")
+                    continue
+                try:
+                    results = await asyncio.to_thread(run_peer_test, peer, port, int(streams))
+                except (OSError, threading.BrokenBarrierError) as e:
+                    console.print(f"[bold red]Peer test failed: {str(e) or type(e).__name__}[/bold red]")
+                    continue
+                display_peer_results(results)
+        elif choice == '10':
+            targets = Prompt.ask("Targets (CIDRs or addresses, comma-separated)", default=network_range).split(',')
+            port_spec = Prompt.ask("Ports to scan (e.g. 22,80,8000-9000 or all)", default="1-1000")
+            workers = Prompt.ask("Local worker processes (blank for one per CPU)", default="").strip()
+            if workers and (not workers.isdigit() or int(workers) < 1):
+                console.print("[bold red]The worker count must be a positive whole number.[/bold red]")
+                continue
+            remote = Prompt.ask("Remote workers (host:port/slots, comma-separated)", default="")
+            remote = [spec.strip() for spec in remote.split(',') if spec.strip()]
+            try:
+                for spec in remote:
+                    parse_remote(spec)
+            except ValueError as e:
+                console.print(f"[bold red]{e}[/bold red]")
+                continue
+            token = Prompt.ask("Remote worker token", password=True) if remote else None
+            results = await asyncio.to_thread(distributed_sweep, targets, port_spec, int(workers) if workers else None, remote, token)
+            for ip, open_ports in results.items():
+                inventory.record_ports(ip, open_ports, parse_port_spec(port_spec))
+        elif choice == '11':
+            inventory.close()
             break
 
-async def main_menu():
+async def jobs_menu(jobs):
     while True:
-        console.print(LOGO, style="bold blue")
-        console.print("\n[bold cyan]Main Menu:[/bold cyan]")
-        console.print("1. Storage Analysis")
-        console.print("2. Performance Analysis")
-        console.print("3. Network Analysis")
-        console.print("4. Exit")
+        console.print("\n[bold cyan]Background Jobs Menu:[/bold cyan]")
+        console.print("1. List jobs")
+        console.print("2. Start a directory or drive scan")
+        console.print("3. Start a port scan")
+        console.print("4. Start a subnet sweep")
+        console.print("5. Start resource sampling")
+        console.print("6. Show job results")
+        console.print("7. Cancel a job")
+        console.print("8. Return to main menu")
 
-        choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4"], default="4")
+        choice = Prompt.ask("Enter your choice", choices=[str(i) for i in range(1, 9)], default="8")
 
         if choice == '1':
-            await storage_menu()
+            display_jobs(jobs)
         elif choice == '2':
-            await performance_menu()
+            drives = get_all_drives()
+            root = Prompt.ask("Directory or drive to scan", default=drives[0] if drives else "/")
+            job = jobs.submit(f"Directory scan of {root}", directory_scan_job, root)
+            console.print(f"[bold green]Started job {job.id}.[/bold green]")
         elif choice == '3':
-            await network_menu()
+            targets = [t.strip() for t in Prompt.ask("Targets (comma-separated)").split(',') if t.strip()]
+            port_spec = Prompt.ask("Ports to scan (e.g. 22,80,8000-9000 or all)", default="1-1000")
+            try:
+                parse_port_spec(port_spec)
+            except ValueError as e:
+                console.print(f"[bold red]{e}[/bold red]")
+                continue
+            job = jobs.submit(f"Port scan of {', '.join(targets)} ({port_spec})", port_scan_job, targets, port_spec)
+            console.print(f"[bold green]Started job {job.id}.[/bold green]")
         elif choice == '4':
-            console.print("[bold cyan]Exiting SEEKR. Goodbye![/bold cyan]")
+            network = Prompt.ask("Network to sweep (up to a /16)")
+            job = jobs.submit(f"Sweep of {network}", sweep_job, network)
+            console.print(f"[bold green]Started job {job.id}.[/bold green]")
+        elif choice == '5':
+            try:
+                interval = float(Prompt.ask("Seconds between samples", default="1"))
+            except ValueError:
+                interval = 0
+            if not interval > 0:
+                console.print("[bold red]The interval must be a positive number of seconds.[/bold red]")
+                continue
+            job = jobs.submit("Resource sampling", sampling_job, interval, max_results=MAX_SAMPLES)
+            console.print(f"[bold green]Started job {job.id}; cancel it to stop sampling.[/bold green]")
+        elif choice in ('6', '7'):
+            display_jobs(jobs)
+            job_id = Prompt.ask("Job ID (or 'b' to go back)")
+            if job_id.lower() == 'b':
+                continue
+            job = jobs.get(int(job_id)) if job_id.isdigit() else None
+            if job is None:
+                console.print("[bold red]No such job.[/bold red]")
+            elif choice == '6':
+                display_job_results(job)
+            else:
+                job.cancel()
+                console.print(f"[bold yellow]Cancelling job {job.id}.[/bold yellow]")
+        elif choice == '8':
             break
 
-if __name__ == "__main__":
+async def main_menu():
+    jobs = JobManager()
+    try:
+        while True:
+            console.print(LOGO, style="bold blue")
+            console.print("\n[bold cyan]Main Menu:[/bold cyan]")
+            console.print("1. Storage Analysis")
+            console.print("2. Performance Analysis")
+            console.print("3. Network Analysis")
+            console.print("4. Background Jobs")
+            console.print("5. Exit")
+
+            choice = Prompt.ask("Enter your choice", choices=["1", "2", "3", "4", "5"], default="5")
+
+            if choice == '1':
+                await storage_menu()
+            elif choice == '2':
+                await performance_menu()
+            elif choice == '3':
+                await network_menu()
+            elif choice == '4':
+                await jobs_menu(jobs)
+            elif choice == '5':
+                if jobs.running():
+                    console.print(f"[bold yellow]Cancelling {len(jobs.running())} running jobs.[/bold yellow]")
+                console.print("[bold cyan]Exiting SEEKR. Goodbye![/bold cyan]")
+                break
+    finally:
+        jobs.shutdown()
+
+def run_menu():
     try:
         asyncio.run(main_menu())
     except KeyboardInterrupt:
-        console.print("\n[bold cyan]Program interrupted. Exiting...[/bold cyan]")
\ No newline at end of file
+        console.print("\n[bold cyan]Program interrupted. Exiting...[/bold cyan]")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Subcommands and --profile go through the CLI; with no subcommand it runs the menus
+        sys.exit(skr_cli.main(menu=run_menu))
+    run_menu()
\ No newline at end of file
@@ -0,0 +1,404 @@
+import os
+import ssl
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import platform
+import tempfile
+import subprocess
+import psutil
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+from skr_scanner import scan_hosts, DEFAULT_CONCURRENCY, LINGER_RESET
+from skr_discovery import sweep_network
+from skr_network import scan_port
+from skr_synscan import syn_scan, syn_scan_available, DEFAULT_RATE as DEFAULT_SYN_RATE
+
+# Report goes to stdout as JSON, the summary table to stderr
+console = Console(stderr=True)
+
+# Scanner benchmarks against stand-in listeners on loopback aliases
+# (127.0.0.0/8 is all local on Linux, no setup needed). Every listener kind
+# has a known expected state, so each run measures accuracy as well as speed.
+
+BENCH_NETWORK = "127.77.0.0/24"
+BENCH_PORTS = (20000, 20999)
+LISTENER_KINDS = ("tcp", "http", "tls", "slow", "reset", "drop")
+SLOW_DELAY = 0.5
+THREADED_WORKERS = 100
+SAMPLE_INTERVAL = 0.05
+REGRESSION_TOLERANCE = 0.2
+
+HTTP_RESPONSE = b"HTTP/1.1 200 OK\r\nServer: seekr-bench\r\nContent-Length: 2\r\n\r\nok"
+
+def make_test_certificate(directory):
+    """Create a throwaway self-signed certificate with openssl, returning (cert, key) or None."""
+    if not shutil.which("openssl"):
+        return None
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    result = subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=seekr-bench", "-keyout", key, "-out", cert],
+        capture_output=True,
+    )
+    return (cert, key) if result.returncode == 0 else None
+
+class StandInNetwork:
+    """Loopback hosts running listeners of every kind, and the ports each host should show as open.
+
+    'tcp' closes at once, 'http' and 'tls' answer a request, 'slow' waits
+    before answering, 'reset' aborts with RST, and 'drop' never accepts and
+    has a full backlog, so connects to it time out like a filtered port.
+    """
+
+    def __init__(self, hosts=16, listeners_per_host=12, ports=BENCH_PORTS, network=BENCH_NETWORK, seed=0):
+        self.network = network
+        self.port_range = ports
+        base = socket.inet_aton(network.split("/")[0])
+        self.hosts = [socket.inet_ntoa(base[:3] + bytes([i + 1])) for i in range(hosts)]
+        self.listeners_per_host = listeners_per_host
+        self.random = random.Random(seed)
+        self.kinds = {}
+        self.servers = []
+        self.sockets = []
+        self.tempdir = None
+
+    @property
+    def ports(self):
+        return range(self.port_range[0], self.port_range[1] + 1)
+
+    @property
+    def expected(self):
+        """Return {ip: set of ports a correct scanner reports open}."""
+        expected = {ip: set() for ip in self.hosts}
+        for (ip, port), kind in self.kinds.items():
+            if kind != "drop":
+                expected[ip].add(port)
+        return expected
+
+    async def _http(self, reader, writer):
+        try:
+            await asyncio.wait_for(reader.read(1024), 1)
+            writer.write(HTTP_RESPONSE)
+            await writer.drain()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _slow(self, reader, writer):
+        await asyncio.sleep(SLOW_DELAY)
+        await self._http(reader, writer)
+
+    async def _close(self, reader, writer):
+        writer.close()
+
+    async def _reset(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+        writer.transport.abort()
+
+    def _drop(self, ip, port):
+        listener = socket.socket()
+        listener.bind((ip, port))
+        listener.listen(0)
+        self.sockets.append(listener)
+        # Fill the accept queue so further SYNs are dropped by the kernel
+        for _ in range(3):
+            filler = socket.socket()
+            filler.setblocking(False)
+            filler.connect_ex((ip, port))
+            self.sockets.append(filler)
+
+    async def __aenter__(self):
+        self.tempdir = tempfile.mkdtemp(prefix="seekr-bench-")
+        certificate = make_test_certificate(self.tempdir)
+        tls_context = None
+        if certificate:
+            tls_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            tls_context.load_cert_chain(*certificate)
+        kinds = [kind for kind in LISTENER_KINDS if kind != "tls" or tls_context]
+        handlers = {"tcp": self._close, "http": self._http, "tls": self._http, "slow": self._slow, "reset": self._reset}
+
+        for ip in self.hosts:
+            ports = self.random.sample(list(self.ports), min(self.listeners_per_host, len(self.ports)))
+            for i, port in enumerate(ports):
+                kind = kinds[i % len(kinds)]
+                if kind == "drop":
+                    self._drop(ip, port)
+                else:
+                    server = await asyncio.start_server(handlers[kind], ip, port, ssl=tls_context if kind == "tls" else None)
+                    self.servers.append(server)
+                self.kinds[(ip, port)] = kind
+        await asyncio.sleep(0.1)
+        return self
+
+    async def __aexit__(self, *exc):
+        for server in self.servers:
+            server.close()
+        for sock in self.sockets:
+            sock.close()
+        shutil.rmtree(self.tempdir, ignore_errors=True)
+
+class ResourceSampler:
+    """Sample this process's RSS and open file descriptors in the background and keep the peaks."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.process = psutil.Process()
+        self.interval = interval
+        self.task = None
+        self.baseline_fds = self._fds()
+        self.peak_rss = 0
+        self.peak_fds = 0
+
+    def _fds(self):
+        if hasattr(self.process, "num_fds"):
+            return self.process.num_fds()
+        return self.process.num_handles()
+
+    def sample(self):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+        self.peak_fds = max(self.peak_fds, self._fds())
+
+    async def _run(self):
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self):
+        self.baseline_fds = self._fds()
+        self.task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self.task.cancel()
+        self.sample()
+
+    def result(self):
+        return {
+            "peak_rss_mb": round(self.peak_rss / 1024 ** 2, 1),
+            "peak_fds": self.peak_fds,
+            "peak_extra_fds": self.peak_fds - self.baseline_fds,
+        }
+
+def percentiles(samples):
+    """Return p50/p90/p99/max of latency samples in milliseconds."""
+    if not samples:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(samples)
+
+    def at(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {"p50": at(0.5), "p90": at(0.9), "p99": at(0.99), "max": round(ordered[-1] * 1000, 3)}
+
+def accuracy(found, expected):
+    """Compare {ip: ports found} with {ip: ports expected} and return precision and recall."""
+    hits = extra = missed = 0
+    for ip, ports in expected.items():
+        reported = set(found.get(ip, ()))
+        hits += len(reported & ports)
+        extra += len(reported - ports)
+        missed += len(ports - reported)
+    return {
+        "true_positive": hits,
+        "false_positive": extra,
+        "false_negative": missed,
+        "precision": round(hits / (hits + extra), 4) if hits + extra else 1.0,
+        "recall": round(hits / (hits + missed), 4) if hits + missed else 1.0,
+    }
+
+async def bench_threaded(net, workers=THREADED_WORKERS):
+    """The blocking scan_port pool, one thread per in-flight connect."""
+    latencies = []
+    found = {ip: set() for ip in net.hosts}
+    pairs = [(ip, port) for ip in net.hosts for port in net.ports]
+
+    def timed(ip, port):
+        start = time.perf_counter()
+        result = scan_port(ip, port)
+        latencies.append(time.perf_counter() - start)
+        return ip, result
+
+    def run():
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for ip, port in executor.map(lambda pair: timed(*pair), pairs):
+                if port:
+                    found[ip].add(port)
+
+    start = time.perf_counter()
+    await asyncio.to_thread(run)
+    return time.perf_counter() - start, len(pairs), latencies, found
+
+async def bench_async(net, concurrency=DEFAULT_CONCURRENCY):
+    """The asyncio connect engine scanning every host at once."""
+    latencies = []
+    found = {}
+    probes = 0
+
+    def on_probe(target, port, state, seconds):
+        nonlocal probes
+        probes += 1
+        latencies.append(seconds)
+
+    start = time.perf_counter()
+    async for ip, open_ports, error in scan_hosts(net.hosts, net.ports, concurrency, on_probe=on_probe):
+        found[ip] = set(open_ports)
+    return time.perf_counter() - start, probes, latencies, found
+
+async def bench_syn(net, rate=DEFAULT_SYN_RATE):
+    """The raw-socket SYN engine; needs root, and every probe of a host finishes together."""
+    start = time.perf_counter()
+    results = await asyncio.to_thread(syn_scan, net.hosts, net.ports, rate)
+    seconds = time.perf_counter() - start
+    found = {ip: set(open_ports) for ip, open_ports in results.items()}
+    return seconds, len(net.hosts) * len(net.ports), [], found
+
+async def bench_discovery(net):
+    """The unprivileged TCP/ICMP host sweep over the whole stand-in network."""
+    latencies = []
+    found = {}
+    start = time.perf_counter()
+    async for device in sweep_network(net.network):
+        latencies.append(device.rtt / 1000)
+        found[device.ip] = set()
+    return time.perf_counter() - start, len(found), latencies, found
+
+ENGINES = {
+    "threaded": bench_threaded,
+    "async": bench_async,
+    "syn": bench_syn,
+    "discovery": bench_discovery,
+}
+
+async def run_engine(name, net):
+    async with ResourceSampler() as sampler:
+        seconds, probes, latencies, found = await ENGINES[name](net)
+
+    result = {
+        "engine": name,
+        "seconds": round(seconds, 3),
+        "probes": probes,
+        "probes_per_sec": round(probes / seconds, 1) if seconds else None,
+        "hosts_per_sec": round(len(found) / seconds, 1) if seconds else None,
+        "latency_ms": percentiles(latencies),
+    }
+    if name == "discovery":
+        # Every loopback address answers, so only listener hosts being found is meaningful
+        missed = [ip for ip in net.hosts if ip not in found]
+        result["accuracy"] = {"hosts_found": len(found), "recall": round(1 - len(missed) / len(net.hosts), 4)}
+    else:
+        result["accuracy"] = accuracy(found, net.expected)
+    result.update(sampler.result())
+    return result
+
+async def run_benchmarks(engines=tuple(ENGINES), hosts=16, listeners_per_host=12, ports=BENCH_PORTS, seed=0):
+    """Start the stand-in network, run each engine against it in turn and return the JSON report."""
+    async with StandInNetwork(hosts, listeners_per_host, ports, seed=seed) as net:
+        results = []
+        for name in engines:
+            console.print(f"[cyan]Running {name} engine...[/cyan]")
+            results.append(await run_engine(name, net))
+        listeners = {}
+        for kind in net.kinds.values():
+            listeners[kind] = listeners.get(kind, 0) + 1
+
+    return {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {"hosts": hosts, "ports": list(ports), "listeners": listeners, "seed": seed},
+        "results": results,
+    }
+
+def find_regressions(report, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Return messages for engines that got slower, less accurate or heavier than in `baseline`."""
+    previous = {result["engine"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(result["engine"])
+        if not before:
+            continue
+        name = result["engine"]
+        if before["probes_per_sec"] and result["probes_per_sec"] < before["probes_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {before['probes_per_sec']} -> {result['probes_per_sec']} probes/s")
+        if result["accuracy"]["recall"] < before["accuracy"]["recall"]:
+            regressions.append(f"{name}: recall {before['accuracy']['recall']} -> {result['accuracy']['recall']}")
+        if result["accuracy"].get("precision", 1) < before["accuracy"].get("precision", 1):
+            regressions.append(f"{name}: precision {before['accuracy']['precision']} -> {result['accuracy']['precision']}")
+        if result["peak_rss_mb"] > before["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {before['peak_rss_mb']} -> {result['peak_rss_mb']} MB")
+    return regressions
+
+def display_benchmark(report):
+    table = Table(title="Scanner Benchmark")
+    table.add_column("Engine", style="cyan")
+    table.add_column("Seconds", justify="right", style="magenta")
+    table.add_column("Probes/s", justify="right", style="green")
+    table.add_column("Hosts/s", justify="right", style="green")
+    table.add_column("p50 / p99 (ms)", justify="right", style="yellow")
+    table.add_column("Recall", justify="right", style="blue")
+    table.add_column("Precision", justify="right", style="blue")
+    table.add_column("Peak RSS (MB)", justify="right", style="red")
+    table.add_column("Peak FDs", justify="right", style="red")
+
+    for result in report["results"]:
+        latency = result["latency_ms"]
+        table.add_row(
+            result["engine"],
+            f"{result['seconds']:.2f}",
+            f"{result['probes_per_sec']:.0f}",
+            f"{result['hosts_per_sec']:.0f}",
+            f"{latency['p50']} / {latency['p99']}",
+            str(result["accuracy"]["recall"]),
+            str(result["accuracy"].get("precision", "N/A")),
+            str(result["peak_rss_mb"]),
+            str(result["peak_fds"]),
+        )
+
+    console.print(table)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark seekr's scanners against local stand-in listeners.")
+    default_engines = [name for name in ENGINES if name != "syn" or syn_scan_available()]
+    parser.add_argument("--engines", default=",".join(default_engines), help="comma-separated engines to run")
+    parser.add_argument("--hosts", type=int, default=16, help="loopback hosts to start listeners on")
+    parser.add_argument("--listeners", type=int, default=12, help="listeners per host")
+    parser.add_argument("--ports", default=f"{BENCH_PORTS[0]}-{BENCH_PORTS[1]}", help="port range to scan, e.g. 20000-20999")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report; exit with status 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)}")
+    low, high = (int(part) for part in args.ports.split("-"))
+
+    report = asyncio.run(run_benchmarks(engines, args.hosts, args.listeners, (low, high), args.seed))
+    display_benchmark(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance)
+        for message in regressions:
+            console.print(f"[bold red]Regression: {message}[/bold red]")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
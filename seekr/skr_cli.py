@@ -0,0 +1,249 @@
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import argparse
+import psutil
+from rich.console import Console
+from rich.table import Table
+from skr_storage import iter_directory_sizes, iter_large_files
+from skr_procfs import top_processes
+from skr_performance import collect_resource_sample
+from skr_synscan import fast_scan_hosts
+from skr_discovery import sweep_network, network_hosts, read_arp_cache, DISCOVERY_PORTS, DEFAULT_RATE
+from skr_ports import parse_port_spec
+from skr_profile import profiling, span, add_profile_arguments
+from skr_events import event_bus, set_ui_mode, MODES
+
+console = Console()
+error_console = Console(stderr=True)
+
+# Non-interactive entry point for cron jobs, config management and pipes.
+# Every subcommand produces records one at a time and hands each to a
+# writer as soon as it exists: NDJSON or CSV lines are flushed immediately,
+# and a rich table is only built when stdout is a terminal. Progress goes
+# to stderr (bars or NDJSON events) so it never mixes with the results.
+
+FORMATS = ("auto", "ndjson", "csv", "table")
+
+class NdjsonWriter:
+    """One JSON object per line, flushed per record."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, default=str) + "\n")
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+class CsvWriter:
+    """CSV with a header taken from the first record; lists become space-separated cells."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = None
+
+    def write(self, record):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.stream, fieldnames=list(record), extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerow({
+            key: " ".join(map(str, value)) if isinstance(value, (list, tuple)) else value
+            for key, value in record.items()
+        })
+        self.stream.flush()
+
+    def close(self):
+        pass
+
+class TableWriter:
+    """Collects records and renders one rich table at the end, for terminals only."""
+
+    def __init__(self, title):
+        self.title = title
+        self.records = []
+        self.status = console.status(f"[cyan]{title}...", spinner="dots")
+        self.status.start()
+
+    def write(self, record):
+        self.records.append(record)
+        self.status.update(f"[cyan]{self.title}... {len(self.records)} results")
+
+    def close(self):
+        self.status.stop()
+        if not self.records:
+            console.print("[bold yellow]No results.[/bold yellow]")
+            return
+        table = Table(title=self.title)
+        for key in self.records[0]:
+            table.add_column(key, style="cyan")
+        for record in self.records:
+            table.add_row(*(
+                " ".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+                for value in record.values()
+            ))
+        with span("rich.render", rows=len(self.records)):
+            console.print(table)
+
+def make_writer(fmt, title, stream=None):
+    """Return a writer for `fmt`; 'auto' means a table on a terminal and NDJSON otherwise."""
+    stream = stream or sys.stdout
+    if fmt == "auto":
+        fmt = "table" if stream.isatty() else "ndjson"
+    if fmt == "csv":
+        return CsvWriter(stream)
+    if fmt == "table":
+        return TableWriter(title)
+    return NdjsonWriter(stream)
+
+def storage_records(args):
+    directories = args.paths
+    if args.children:
+        directories = [entry.path for path in args.paths for entry in os.scandir(path) if entry.is_dir(follow_symlinks=False)]
+    with event_bus() as bus:
+        task = bus.add_task("[cyan]Measuring directories", total=len(directories))
+        for entry in iter_directory_sizes(directories):
+            task.advance()
+            yield entry.to_dict()
+
+def large_file_records(args):
+    for path, size in iter_large_files(args.path, args.min_mb):
+        yield {"File": path, "SizeMB": round(size, 2)}
+
+def process_records(args):
+    for row in top_processes(args.interval, args.limit, args.sort):
+        row["cpu_percent"] = round(row["cpu_percent"], 2)
+        row["memory_percent"] = round(row["memory_percent"], 2)
+        yield row
+
+async def port_records(args):
+    ports = parse_port_spec(args.ports)
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Scanning {len(args.targets)} hosts", total=len(set(args.targets)) * len(ports))
+        async for target, open_ports, error in fast_scan_hosts(args.targets, ports, args.engine, progress=task.advance):
+            yield {"host": target, "open_ports": open_ports.to_list(), "error": str(error) if error else None}
+
+async def discovery_records(args):
+    arp = read_arp_cache()
+    ports = parse_port_spec(args.ports) if args.ports else DISCOVERY_PORTS
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Sweeping {args.network}", total=len(network_hosts(args.network)))
+        async for device in sweep_network(args.network, ports, args.rate, progress=task.advance):
+            device.mac = arp.get(device.ip)
+            device.rtt = round(device.rtt, 3)
+            yield device.to_dict()
+
+def metric_records(args):
+    psutil.cpu_percent()  # prime the CPU counter so the first sample is meaningful
+    taken = 0
+    while not args.count or taken < args.count:
+        time.sleep(args.interval)
+        yield {"timestamp": round(time.time(), 3), **collect_resource_sample()}
+        taken += 1
+
+COMMANDS = {
+    "storage": (storage_records, "Directory Sizes"),
+    "large-files": (large_file_records, "Large Files"),
+    "processes": (process_records, "Top Processes"),
+    "ports": (port_records, "Port Scan"),
+    "discover": (discovery_records, "Live Hosts"),
+    "metrics": (metric_records, "Resource Metrics"),
+}
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="seekr", description="Run seekr non-interactively; results stream as they are produced.")
+    parser.add_argument("--format", choices=FORMATS, default="auto",
+                        help="output format (default: table on a terminal, NDJSON otherwise)")
+    parser.add_argument("--progress", choices=("auto",) + MODES, default="auto",
+                        help="progress on stderr: rich bars, NDJSON events or none (default: bars when stderr is a "
+                             "terminal and no table is being drawn)")
+    add_profile_arguments(parser)
+    commands = parser.add_subparsers(dest="command")
+
+    storage = commands.add_parser("storage", help="directory sizes")
+    storage.add_argument("paths", nargs="+")
+    storage.add_argument("--children", action="store_true", help="report each immediate subdirectory instead")
+
+    large = commands.add_parser("large-files", help="files over a size limit")
+    large.add_argument("path")
+    large.add_argument("--min-mb", type=float, default=100)
+
+    processes = commands.add_parser("processes", help="top processes over a sampling interval")
+    processes.add_argument("--interval", type=float, default=1)
+    processes.add_argument("--limit", type=int, default=10, help="0 for every process")
+    processes.add_argument("--sort", choices=("cpu_percent", "memory_percent"), default="cpu_percent")
+
+    ports = commands.add_parser("ports", help="TCP port scan")
+    ports.add_argument("targets", nargs="+")
+    ports.add_argument("--ports", default="1-1000", help="e.g. 22,80,8000-9000 or all")
+    ports.add_argument("--engine", choices=("auto", "syn", "connect"), default="auto")
+
+    discover = commands.add_parser("discover", help="sweep a network (up to a /16) for live hosts")
+    discover.add_argument("network")
+    discover.add_argument("--ports", help="TCP ports to probe besides ICMP")
+    discover.add_argument("--rate", type=int, default=DEFAULT_RATE, help="probe packets per second")
+
+    metrics = commands.add_parser("metrics", help="CPU, memory, swap and disk usage samples")
+    metrics.add_argument("--interval", type=float, default=1)
+    metrics.add_argument("--count", type=int, default=1, help="samples to take, 0 to run until interrupted")
+    return parser
+
+async def _drain(records, writer):
+    async for record in records:
+        writer.write(record)
+
+def progress_mode(args):
+    if args.progress != "auto":
+        return args.progress
+    if args.format == "table" or (args.format == "auto" and sys.stdout.isatty()):
+        return "none"  # the table writer shows its own status line
+    return "rich" if sys.stderr.isatty() else "none"
+
+def main(argv=None, menu=None):
+    """Run one subcommand, or `menu` (the interactive menus) when none is given."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile:
+        directory = os.path.dirname(os.path.abspath(args.profile))
+        if not os.path.isdir(directory) or not os.access(directory, os.W_OK):
+            parser.error(f"--profile: cannot write a trace in {directory}")
+        with profiling(args.profile, args.cprofile, args.tracemalloc):
+            return _run(parser, args, menu)
+    return _run(parser, args, menu)
+
+def _run(parser, args, menu):
+    if args.command is None:
+        if menu is None:
+            parser.error("a command is required")
+        menu()
+        return 0
+    set_ui_mode(progress_mode(args), sys.stderr)
+    produce, title = COMMANDS[args.command]
+    writer = make_writer(args.format, title)
+    try:
+        records = produce(args)
+        if hasattr(records, "__aiter__"):
+            asyncio.run(_drain(records, writer))
+        else:
+            for record in records:
+                writer.write(record)
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly without a flush error at exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError) as e:
+        error_console.print(f"[bold red]{e}[/bold red]")
+        return 1
+    finally:
+        writer.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
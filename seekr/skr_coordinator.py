@@ -0,0 +1,347 @@
+import os
+import sys
+import hmac
+import json
+import queue
+import socket
+import secrets
+import asyncio
+import argparse
+import threading
+import ipaddress
+import socketserver
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from rich.console import Console
+from skr_events import event_bus
+from skr_scanner import scan_hosts, DEFAULT_CONCURRENCY, DEFAULT_TIMEOUT
+from skr_ports import PortBitmap, parse_port_spec, format_port_spec
+
+console = Console()
+
+# Sharded port sweeps across processes and machines. The target set
+# (hosts x ports) is cut into shards that worker slots pull from one queue,
+# so fast workers simply take more shards. A slot is either a local process
+# from a ProcessPoolExecutor or a connection to a remote `worker` speaking
+# JSON lines. Results are merged back into one stream in target order.
+# A worker scans whatever it is sent, so it listens on localhost unless
+# told otherwise and only serves connections that open with its token.
+
+DEFAULT_WORKER_PORT = 5310
+TOKEN_ENV = "SEEKR_WORKER_TOKEN"
+HOSTS_PER_SHARD = 16
+PORTS_PER_SHARD = 4096
+MAX_TARGET_HOSTS = 1 << 20
+
+def available_cpus():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+def expand_targets(targets):
+    """Expand CIDRs and single addresses into an ordered, de-duplicated host list."""
+    hosts = {}
+    for target in targets:
+        target = target.strip()
+        if not target:
+            continue
+        if "/" in target:
+            network = ipaddress.ip_network(target, strict=False)
+            if network.num_addresses > MAX_TARGET_HOSTS:
+                raise ValueError(f"{network} is too large to shard ({network.num_addresses} addresses)")
+            for ip in network.hosts() if network.num_addresses > 2 else network:
+                hosts[str(ip)] = None
+        else:
+            hosts[target] = None
+    return list(hosts)
+
+def make_shards(hosts, ports, hosts_per_shard=HOSTS_PER_SHARD, ports_per_shard=PORTS_PER_SHARD):
+    """Split hosts x ports into shards and return (shards, port chunks per host).
+
+    Shards are made host-major, so the first hosts complete first and the
+    ordered result stream starts flowing early.
+    """
+    chunks = [ports[i:i + ports_per_shard] for i in range(0, len(ports), ports_per_shard)]
+    shards = []
+    for start in range(0, len(hosts), hosts_per_shard):
+        group = hosts[start:start + hosts_per_shard]
+        for chunk in chunks:
+            shards.append({"id": len(shards), "hosts": group, "ports": format_port_spec(chunk), "probes": len(group) * len(chunk)})
+    return shards, len(chunks)
+
+def scan_shard(shard, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Scan one shard and return [(host, open ports as hex bitmap, error)], ready for pickling or JSON."""
+    async def run():
+        results = []
+        async for target, open_ports, error in scan_hosts(shard["hosts"], shard["ports"], concurrency, timeout=timeout, ordered=False):
+            results.append((target, open_ports.to_bytes().hex(), str(error) if error else None))
+        return results
+    return asyncio.run(run())
+
+class LocalSlot:
+    """Runs shards in a local worker process."""
+
+    def __init__(self, pool, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+        self.pool = pool
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.name = "local"
+
+    def run(self, shard):
+        return self.pool.submit(scan_shard, shard, self.concurrency, self.timeout).result()
+
+    def close(self):
+        pass
+
+class RemoteSlot:
+    """Runs shards on a remote seekr worker, one request line and one response line per shard."""
+
+    def __init__(self, host, port=DEFAULT_WORKER_PORT, token=None, connect_timeout=10):
+        self.name = f"{host}:{port}"
+        self.sock = socket.create_connection((host, port), timeout=connect_timeout)
+        self.file = self.sock.makefile("rwb")
+        try:
+            self.file.write(json.dumps({"token": token or ""}).encode() + b"\n")
+            self.file.flush()
+            reply = json.loads(self.file.readline() or b"{}")
+        except (OSError, ValueError) as e:
+            self.close()
+            raise ConnectionError(f"no handshake from worker {self.name}: {e}") from e
+        if not reply.get("ok"):
+            self.close()
+            raise ConnectionError(f"worker {self.name} refused the token")
+        self.sock.settimeout(None)
+
+    def run(self, shard):
+        self.file.write(json.dumps(shard).encode() + b"\n")
+        self.file.flush()
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError(f"worker {self.name} closed the connection")
+        return json.loads(line)["results"]
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+def parse_remote(spec):
+    """Parse 'host:port' or 'host:port/slots' into (host, port, slots)."""
+    address, _, slots = spec.partition("/")
+    host, sep, port = address.rpartition(":")
+    if not sep:
+        host, port = address, DEFAULT_WORKER_PORT
+    try:
+        port, slots = int(port), int(slots or 1)
+    except ValueError:
+        port = slots = 0
+    if not host or not 0 < port < 65536 or slots < 1:
+        raise ValueError(f"Invalid remote worker '{spec}', expected host:port or host:port/slots")
+    return host.strip("[]"), port, slots
+
+def coordinate_scan(targets, ports="1-1000", workers=None, remote=(), hosts_per_shard=HOSTS_PER_SHARD,
+                    ports_per_shard=PORTS_PER_SHARD, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                    progress=None, token=None):
+    """Sweep targets (CIDRs or addresses) x ports across worker slots and yield (host, PortBitmap, error) in target order.
+
+    `workers` local processes (default: one per CPU, or none when remote
+    workers are given) and every remote 'host:port/slots' pull shards from
+    one queue; `token` is the remote workers' shared token. A remote worker
+    that fails, or a broken local process pool, has its shard handed to
+    another slot. `progress`, if given, is called with the probes in each
+    finished shard.
+    """
+    hosts = expand_targets(targets)
+    ports = parse_port_spec(ports) if isinstance(ports, str) else parse_port_spec(list(ports))
+    shards, chunks_per_host = make_shards(hosts, ports, hosts_per_shard, ports_per_shard)
+    remote = [parse_remote(spec) for spec in remote]
+    if workers is None:
+        workers = 0 if remote else available_cpus()
+    if workers < 0:
+        raise ValueError("The local worker count cannot be negative")
+
+    pending = queue.Queue()
+    for shard in shards:
+        pending.put(shard)
+    finished_shards = queue.Queue()
+    done = threading.Event()
+
+    def serve(slot):
+        while not done.is_set():
+            try:
+                shard = pending.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                finished_shards.put((shard, slot.run(shard)))
+            except Exception as e:
+                # A lost connection or a dead process pool takes the slot out;
+                # anything else fails just this shard's hosts. Either way the
+                # coordinator hears about it, so it never waits on a dead slot.
+                if isinstance(slot, RemoteSlot) or isinstance(e, BrokenProcessPool):
+                    pending.put(shard)
+                    finished_shards.put((None, f"worker {slot.name} failed: {e or type(e).__name__}"))
+                    return
+                finished_shards.put((shard, [(host, "", str(e) or type(e).__name__) for host in shard["hosts"]]))
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    slots = [LocalSlot(pool, concurrency, timeout) for _ in range(workers)]
+    for host, port, count in remote:
+        for _ in range(count):
+            try:
+                slots.append(RemoteSlot(host, port, token))
+            except OSError as e:
+                console.print(f"[bold yellow]Skipping worker {host}:{port}: {e}[/bold yellow]")
+                break
+    if not slots:
+        raise ValueError("No workers: give a local worker count or remote workers")
+
+    threads = [threading.Thread(target=serve, args=(slot,), daemon=True) for slot in slots]
+    for thread in threads:
+        thread.start()
+
+    index = {host: i for i, host in enumerate(hosts)}
+    bits = [0] * len(hosts)
+    missing = [chunks_per_host] * len(hosts)
+    errors = {}
+    alive = len(slots)
+    merged = 0
+    next_host = 0
+    try:
+        while merged < len(shards):
+            shard, results = finished_shards.get()
+            if shard is None:
+                alive -= 1
+                console.print(f"[bold yellow]{results}; its shard was requeued[/bold yellow]")
+                if not alive:
+                    raise RuntimeError("All workers failed")
+                continue
+            merged += 1
+            for host, bitmap, error in results:
+                i = index[host]
+                if bitmap:
+                    bits[i] |= int.from_bytes(bytes.fromhex(bitmap), "little")
+                if error:
+                    errors[i] = error
+                missing[i] -= 1
+            if progress:
+                progress(shard["probes"])
+            while next_host < len(hosts) and not missing[next_host]:
+                yield hosts[next_host], PortBitmap(bits=bits[next_host]), errors.pop(next_host, None)
+                bits[next_host] = 0
+                next_host += 1
+    finally:
+        done.set()
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+        for slot in slots:
+            slot.close()
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            hello = json.loads(self.rfile.readline() or b"{}")
+        except ValueError:
+            return
+        token = hello.get("token") if isinstance(hello, dict) else None
+        if not isinstance(token, str) or not hmac.compare_digest(token.encode(), self.server.token.encode()):
+            self.wfile.write(b'{"ok": false, "error": "unauthorized"}\n')
+            return
+        self.wfile.write(b'{"ok": true}\n')
+        self.wfile.flush()
+        for line in self.rfile:
+            shard = json.loads(line)
+            results = self.server.pool.submit(scan_shard, shard, self.server.concurrency, self.server.timeout).result()
+            self.wfile.write(json.dumps({"id": shard["id"], "results": results}).encode() + b"\n")
+            self.wfile.flush()
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """Remote worker: scans shards sent by a coordinator holding `token` on a local process pool."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_WORKER_PORT, workers=None,
+                 concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, token=None):
+        if not token:
+            raise ValueError("A scan worker needs a shared token")
+        self.token = token
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.concurrency = concurrency
+        self.timeout = timeout
+        super().__init__((host, port), _WorkerHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def distributed_sweep(targets, ports="1-1000", workers=None, remote=(), token=None):
+    """Run a coordinated sweep with a progress bar, printing hosts with open ports as they complete.
+
+    Returns {host: PortBitmap} for every host scanned without error.
+    """
+    try:
+        hosts = expand_targets(targets)
+        total = len(hosts) * len(parse_port_spec(ports))
+        for spec in remote:
+            parse_remote(spec)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return {}
+
+    results = {}
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Sweeping {len(hosts)} hosts", total=total)
+        try:
+            for host, open_ports, error in coordinate_scan(hosts, ports, workers, remote,
+                                                           progress=task.advance, token=token):
+                if error:
+                    bus.message(f"[bold red]An error occurred while scanning {host}: {error}[/bold red]")
+                    continue
+                if open_ports:
+                    bus.message(f"[bold green]Open ports on {host}:[/bold green] {open_ports.to_list()}")
+                results[host] = open_ports
+        except (ValueError, RuntimeError) as e:
+            # No usable workers, or every one of them failed; keep what finished
+            bus.message(f"[bold red]Sweep stopped: {e}[/bold red]")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sharded multi-process port sweeps.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker = commands.add_parser("worker", help="serve shards to a coordinator")
+    worker.add_argument("--bind", default="127.0.0.1", help="address to listen on (use 0.0.0.0 for every interface)")
+    worker.add_argument("--port", type=int, default=DEFAULT_WORKER_PORT)
+    worker.add_argument("--workers", type=int, help="scanner processes (default: one per CPU)")
+    worker.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"shared token coordinators must present (default: ${TOKEN_ENV}, or a new random one)")
+    scan = commands.add_parser("scan", help="coordinate a sweep")
+    scan.add_argument("targets", nargs="+", help="CIDRs or addresses")
+    scan.add_argument("--ports", default="1-1000")
+    scan.add_argument("--workers", type=int, help="local scanner processes")
+    scan.add_argument("--remote", action="append", default=[], help="remote worker as host:port or host:port/slots")
+    scan.add_argument("--token", default=os.environ.get(TOKEN_ENV), help=f"remote workers' shared token (default: ${TOKEN_ENV})")
+    scan.add_argument("--ndjson", action="store_true", help="print one JSON object per host instead of a progress view")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        token = args.token or secrets.token_urlsafe(16)
+        with WorkerServer(args.bind, args.port, args.workers, token=token) as server:
+            console.print(f"[bold cyan]Scan worker listening on {args.bind}:{args.port} (Ctrl+C to stop)[/bold cyan]")
+            if not args.token:
+                console.print(f"[bold cyan]Coordinators must pass --token {token}[/bold cyan]")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    if args.ndjson:
+        for host, open_ports, error in coordinate_scan(args.targets, args.ports, args.workers, args.remote, token=args.token):
+            print(json.dumps({"host": host, "open_ports": open_ports.to_list(), "error": error}), flush=True)
+    else:
+        distributed_sweep(args.targets, args.ports, args.workers, args.remote, args.token)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import os
+import time
+import socket
+import struct
+import asyncio
+import ipaddress
+import psutil
+from rich.console import Console
+from skr_scanner import probe_port_state, effective_concurrency, PROGRESS_BATCH
+from skr_governor import get_governor
+from skr_records import Device
+from skr_events import event_bus
+
+console = Console()
+
+# Host discovery without root. Hosts are found with asyncio TCP connects to
+# a few common ports, where a refused connection proves a host is up as well
+# as an accepted one, plus ICMP echo where the system allows it. Unlike an
+# ARP broadcast this works across routers and on any CIDR up to a /16.
+
+DISCOVERY_PORTS = (80, 443, 22, 445, 3389, 8080)
+DEFAULT_RATE = 5000
+DEFAULT_CONCURRENCY = 1024
+DEFAULT_TIMEOUT = 1.0
+MAX_DISCOVERY_HOSTS = 65536
+ARP_CACHE = "/proc/net/arp"
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+class RateLimiter:
+    """Pace probes to at most `rate` per second, spread evenly rather than in bursts."""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = 0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self.next_slot)
+        self.next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+def network_hosts(network, max_hosts=MAX_DISCOVERY_HOSTS):
+    """Return the host addresses of a CIDR, refusing networks larger than `max_hosts`."""
+    network = ipaddress.ip_network(network, strict=False)
+    if network.num_addresses > max_hosts:
+        raise ValueError(f"{network} has {network.num_addresses} addresses; discovery is limited to {max_hosts}")
+    return [str(ip) for ip in network.hosts()] or [str(network.network_address)]
+
+def interface_network(local_ip, max_hosts=MAX_DISCOVERY_HOSTS):
+    """Return the network of the interface holding `local_ip`, narrowed to at most `max_hosts` addresses."""
+    netmask = None
+    for addrs in psutil.net_if_addrs().values():
+        for addr in addrs:
+            if addr.family == socket.AF_INET and addr.address == local_ip:
+                netmask = addr.netmask
+    network = ipaddress.ip_network(f"{local_ip}/{netmask or 24}", strict=False)
+    while network.num_addresses > max_hosts:
+        network = ipaddress.ip_network(f"{local_ip}/{network.prefixlen + 1}", strict=False)
+    return network
+
+def read_arp_cache():
+    """Return {ip: mac} from the kernel neighbour table, which connects to local hosts fill in for free."""
+    try:
+        with open(ARP_CACHE) as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return {}
+    cache = {}
+    for line in lines:
+        fields = line.split()
+        if len(fields) >= 4 and fields[3] != "00:00:00:00:00:00":
+            cache[fields[0]] = fields[3]
+    return cache
+
+def icmp_checksum(data):
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+def icmp_socket_type():
+    """Return the socket type usable for ICMP echo here, or None if ICMP is not allowed.
+
+    SOCK_DGRAM ping sockets need no privileges where net.ipv4.ping_group_range
+    includes our group; raw sockets need root.
+    """
+    for sock_type in (socket.SOCK_DGRAM, socket.SOCK_RAW):
+        try:
+            socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP).close()
+            return sock_type
+        except OSError:
+            continue
+    return None
+
+async def icmp_probe(ip, sock_type, timeout=DEFAULT_TIMEOUT, ident=None):
+    """Send one ICMP echo request and return the RTT of the reply, or None."""
+    loop = asyncio.get_running_loop()
+    ident = (os.getpid() if ident is None else ident) & 0xFFFF
+    header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, 0, ident, 1)
+    payload = b"seekr"
+    packet = struct.pack("!BBHHH", ICMP_ECHO_REQUEST, 0, icmp_checksum(header + payload), ident, 1) + payload
+
+    sock = socket.socket(socket.AF_INET, sock_type, socket.IPPROTO_ICMP)
+    sock.setblocking(False)
+    start = time.perf_counter()
+    deadline = loop.time() + timeout
+    try:
+        # Connecting filters what we receive to replies from this host
+        sock.connect((ip, 0))
+        await loop.sock_sendall(sock, packet)
+        while True:
+            data = await asyncio.wait_for(loop.sock_recv(sock, 2048), deadline - loop.time())
+            if sock_type == socket.SOCK_RAW:
+                data = data[(data[0] & 0x0F) * 4:]
+            # Ping sockets rewrite the identifier, so only raw replies can be matched on it
+            if data[:1] == bytes([ICMP_ECHO_REPLY]) and (sock_type != socket.SOCK_RAW or data[4:6] == packet[4:6]):
+                return time.perf_counter() - start
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        sock.close()
+
+async def _first_answer(probes):
+    """Run probes concurrently and return the first non-None result, cancelling the rest."""
+    pending = {asyncio.ensure_future(probe) for probe in probes}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.result() is not None:
+                    return task.result()
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+async def probe_host(ip, ports=DISCOVERY_PORTS, timeout=DEFAULT_TIMEOUT, limiter=None, icmp=None):
+    """Return a Device if `ip` answers ICMP or any TCP probe, otherwise None.
+
+    ICMP and the two most common ports are tried first; the remaining ports
+    are only probed when that gets no answer.
+    """
+    family = socket.AF_INET6 if ":" in ip else socket.AF_INET
+
+    async def tcp(port):
+        if limiter:
+            await limiter.wait()
+        try:
+            state, rtt = await probe_port_state(family, ip, port, timeout)
+        except OSError:
+            return None  # e.g. IPv6 on an IPv4-only host: no answer from this one, the sweep goes on
+        # Accepted or refused both come from the host itself; unreachable errors carry no RTT
+        return (f"tcp/{port}", rtt) if rtt is not None else None
+
+    async def ping():
+        if limiter:
+            await limiter.wait()
+        rtt = await icmp_probe(ip, icmp, timeout)
+        return ("icmp", rtt) if rtt is not None else None
+
+    first = [tcp(port) for port in ports[:2]]
+    if icmp and family == socket.AF_INET:
+        first.append(ping())
+    answer = await _first_answer(first)
+    if answer is None and ports[2:]:
+        answer = await _first_answer([tcp(port) for port in ports[2:]])
+    if answer is None:
+        return None
+    method, rtt = answer
+    return Device(ip, None, method, rtt * 1000)
+
+async def sweep_network(network, ports=DISCOVERY_PORTS, rate=DEFAULT_RATE, concurrency=DEFAULT_CONCURRENCY,
+                        timeout=DEFAULT_TIMEOUT, icmp=True, progress=None):
+    """Sweep a CIDR (up to a /16) for live hosts and yield each Device as soon as it answers.
+
+    `rate` caps probe packets per second and `concurrency` the hosts being
+    probed at once. `progress`, if given, is called with batches of
+    finished host counts.
+    """
+    hosts = network_hosts(network)
+    icmp = icmp_socket_type() if icmp else None
+    limiter = RateLimiter(rate)
+    # Each host in flight can hold several sockets
+    per_host = len(ports) + 1
+    concurrency = min(effective_concurrency(concurrency * per_host) // per_host or 1, len(hosts))
+    addresses = iter(hosts)
+    found = asyncio.Queue()
+
+    async def worker():
+        done = 0
+        for ip in addresses:
+            device = await probe_host(ip, ports, timeout, limiter, icmp)
+            if device:
+                found.put_nowait(device)
+            done += 1
+            if progress and done == PROGRESS_BATCH:
+                progress(done)
+                done = 0
+        if progress and done:
+            progress(done)
+
+    async def run(workers):
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            found.put_nowait(None)
+
+    async with get_governor().hold_sockets(concurrency * per_host, per_host) as sockets:
+        runner = asyncio.create_task(run(max(sockets // per_host, 1)))
+        try:
+            while True:
+                device = await found.get()
+                if device is None:
+                    break
+                yield device
+            await runner
+        finally:
+            runner.cancel()
+
+async def async_sweep_network(network_range, ports=DISCOVERY_PORTS, rate=DEFAULT_RATE, timeout=DEFAULT_TIMEOUT):
+    """Sweep a network with a progress bar, printing hosts as they are found, and return them sorted."""
+    try:
+        total = len(network_hosts(network_range))
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return []
+
+    devices = []
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Sweeping {network_range}", total=total)
+        async for device in sweep_network(network_range, ports, rate, timeout=timeout,
+                                          progress=task.advance):
+            devices.append(device)
+            bus.message(f"[green]Host up:[/green] {device.ip} ({device.method}, {device.rtt:.1f} ms)")
+
+    arp = read_arp_cache()
+    for device in devices:
+        device.mac = arp.get(device.ip)
+    devices.sort(key=Device.sort_key)
+
+    if not devices:
+        console.print("[bold yellow]No live hosts found. Hosts may be down or dropping all probes.[/bold yellow]")
+    return devices
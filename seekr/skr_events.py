@@ -0,0 +1,224 @@
+import sys
+import json
+import time
+import itertools
+import threading
+from rich.console import Console
+from rich.progress import Progress
+from rich.text import Text
+from skr_profile import span
+
+console = Console()
+
+# Progress reporting kept off the hot path. Scan engines only add to a
+# task's counter or queue a message; one renderer thread per bus collects
+# what changed REFRESH_PER_SECOND times a second and hands it to a sink in
+# one batch. The same events drive the rich progress bars, NDJSON progress
+# lines for other programs, or nothing at all: the 'none' mode starts no
+# thread and drops messages, so a scan pays for a counter increment only.
+
+REFRESH_PER_SECOND = 10
+MODES = ("rich", "ndjson", "none")
+
+class ProgressTask:
+    """One unit of progress on a bus; pass `advance` wherever an engine takes a progress callback."""
+
+    __slots__ = ("bus", "id", "description", "total", "done", "finished", "changed")
+
+    def __init__(self, bus, task_id, description, total):
+        self.bus = bus
+        self.id = task_id
+        self.description = description
+        self.total = total
+        self.done = 0
+        self.finished = False
+        self.changed = True
+
+    def advance(self, count=1):
+        # No lock: a task is advanced from one thread, and a render that
+        # races with this only shows the new count a tick late
+        self.done += count
+        self.changed = True
+
+    def update(self, description=None, total=None):
+        with self.bus._lock:
+            if description is not None:
+                self.description = description
+            if total is not None:
+                self.total = total
+            self.changed = True
+
+    def finish(self):
+        with self.bus._lock:
+            self.finished = True
+            self.changed = True
+
+class RichSink:
+    """Rich progress bars, refreshed only when the bus renders."""
+
+    def __init__(self, target=None):
+        self.progress = Progress(console=target or console, auto_refresh=False)
+        self.ids = {}
+
+    def start(self):
+        self.progress.start()
+
+    def render(self, tasks, messages):
+        for text in messages:
+            self.progress.console.print(text)
+        for state in tasks:
+            task_id = self.ids.get(state["task"])
+            if task_id is None:
+                task_id = self.ids[state["task"]] = self.progress.add_task(state["description"], total=state["total"])
+            self.progress.update(task_id, description=state["description"], completed=state["done"], total=state["total"])
+            if state["finished"]:
+                self.progress.stop_task(task_id)
+        self.progress.refresh()
+
+    def stop(self):
+        self.progress.stop()
+
+class NdjsonSink:
+    """Progress and message events as JSON lines, by default on stderr so stdout stays for results."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self.started = {}
+
+    def start(self):
+        pass
+
+    def render(self, tasks, messages):
+        if not tasks and not messages:
+            return
+        now = time.time()
+        lines = [json.dumps({"event": "message", "time": round(now, 3), "text": Text.from_markup(text).plain}) for text in messages]
+        for state in tasks:
+            started = self.started.setdefault(state["task"], now)
+            elapsed = now - started
+            lines.append(json.dumps({
+                "event": "progress",
+                "time": round(now, 3),
+                "task": state["task"],
+                "description": Text.from_markup(state["description"]).plain,
+                "done": state["done"],
+                "total": state["total"],
+                "rate": round(state["done"] / elapsed, 1) if elapsed else None,
+                "finished": state["finished"],
+            }))
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+
+    def stop(self):
+        pass
+
+class NullSink:
+    """Renders nothing; a bus with this sink never starts its thread."""
+
+    def start(self):
+        pass
+
+    def render(self, tasks, messages):
+        pass
+
+    def stop(self):
+        pass
+
+class EventBus:
+    """Collects progress and messages from any thread and renders them in batches at a fixed rate."""
+
+    def __init__(self, sink, refresh_per_second=REFRESH_PER_SECOND):
+        self.sink = sink
+        self.interval = 1 / refresh_per_second
+        self.active = not isinstance(sink, NullSink)
+        self.tasks = []
+        self.messages = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_task(self, description, total=None):
+        task = ProgressTask(self, next(self._ids), description, total)
+        if self.active:
+            with self._lock:
+                self.tasks.append(task)
+        return task
+
+    def message(self, text):
+        """Queue a line (rich markup allowed) to print above the progress display."""
+        if self.active:
+            with self._lock:
+                self.messages.append(text)
+
+    def _collect(self):
+        with self._lock:
+            messages, self.messages = self.messages, []
+            changed = []
+            for task in self.tasks:
+                if task.changed:
+                    task.changed = False
+                    changed.append({"task": task.id, "description": task.description, "done": task.done,
+                                    "total": task.total, "finished": task.finished})
+            self.tasks = [task for task in self.tasks if not task.finished]
+        return changed, messages
+
+    def flush(self):
+        changed, messages = self._collect()
+        with span("ui.render", tasks=len(changed), messages=len(messages)):
+            self.sink.render(changed, messages)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def start(self):
+        if self.active:
+            self.sink.start()
+            self._thread = threading.Thread(target=self._run, name="seekr-ui", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            for task in self.tasks:
+                task.finished = task.changed = True
+        self.flush()
+        self.sink.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+_mode = "rich"
+_stream = None
+
+def set_ui_mode(mode, stream=None):
+    """Choose how later buses render: 'rich', 'ndjson' or 'none'; `stream` redirects rich or NDJSON output."""
+    global _mode, _stream
+    if mode not in MODES:
+        raise ValueError(f"Unknown UI mode '{mode}', expected one of {', '.join(MODES)}")
+    _mode = mode
+    _stream = stream
+
+def get_ui_mode():
+    return _mode
+
+def make_sink(mode=None):
+    mode = mode or _mode
+    if mode == "rich":
+        return RichSink(Console(file=_stream) if _stream else None)
+    if mode == "ndjson":
+        return NdjsonSink(_stream)
+    return NullSink()
+
+def event_bus(mode=None):
+    """A bus rendering in `mode` (the configured UI mode by default); use it as a context manager."""
+    return EventBus(make_sink(mode))
@@ -0,0 +1,187 @@
+import re
+import ssl
+import socket
+import asyncio
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from skr_tls import get_tls_context, peer_certificates, summarize_certificate
+from skr_governor import get_governor
+from skr_profile import profiled
+from skr_records import PortResult
+
+# Service fingerprinting for open ports. Every port gets a banner grab and the
+# protocol is recognised from the bytes the service sends back, not from its
+# port number, so HTTP on 8080 or SSH on 2222 are identified all the same.
+
+DEFAULT_CONCURRENCY = 200
+HTTP_CONCURRENCY = 32
+CONNECT_TIMEOUT = 3
+BANNER_WAIT = 1.0
+READ_SIZE = 1024
+MAX_HTTP_BODY = 64 * 1024
+
+HTTP_PROBE = b"HEAD / HTTP/1.0\r\n\r\n"
+TITLE_PATTERN = re.compile(rb"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+_http_session = None
+
+def get_http_session():
+    """Return the shared keep-alive HTTP session used for metadata requests."""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_CONCURRENCY, pool_maxsize=HTTP_CONCURRENCY)
+        _http_session.mount("http://", adapter)
+        _http_session.mount("https://", adapter)
+        _http_session.headers["User-Agent"] = "seekr"
+    return _http_session
+
+def classify_banner(data):
+    """Identify a protocol from the first bytes a service sent."""
+    if not data:
+        return None
+    head = data[:64]
+    upper = head.upper()
+    if head.startswith(b"SSH-"):
+        return "ssh"
+    if head.startswith(b"HTTP/"):
+        return "http"
+    if head[:1] in (b"\x15", b"\x16") and head[1:2] == b"\x03":
+        return "tls"
+    if head.startswith(b"220"):
+        if b"SMTP" in upper or b"MAIL" in upper:
+            return "smtp"
+        return "ftp"
+    if head.startswith(b"+OK"):
+        return "pop3"
+    if head.startswith(b"* OK"):
+        return "imap"
+    if head.startswith(b"RFB "):
+        return "vnc"
+    if head.startswith((b"-ERR", b"-NOAUTH", b"-DENIED")):
+        return "redis"
+    if len(head) > 5 and head[4] == 0x0A and b"\x00" in head[5:40]:
+        return "mysql"  # handshake v10: 3-byte length, sequence id, protocol version 10
+    return "unknown"
+
+def banner_text(data):
+    return data.split(b"\r\n", 1)[0].split(b"\n", 1)[0][:120].decode("latin-1").strip()
+
+async def _exchange(ip, port, payload=None, wait=BANNER_WAIT, tls_context=None):
+    """Open a connection, optionally send a payload, and return the first bytes received."""
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(ip, port, ssl=tls_context, server_hostname="" if tls_context else None),
+        CONNECT_TIMEOUT,
+    )
+    try:
+        if payload:
+            writer.write(payload)
+            await writer.drain()
+        try:
+            data = await asyncio.wait_for(reader.read(READ_SIZE), wait)
+        except asyncio.TimeoutError:
+            data = b""
+        tls = writer.get_extra_info("ssl_object")
+        tls_info = None
+        if tls:
+            tls_info = {"Version": tls.version(), "Cipher": tls.cipher()[0]}
+            chain = peer_certificates(tls)
+            if chain:
+                leaf = summarize_certificate(chain[0])
+                tls_info.update({"Subject": leaf["Subject"], "Days Left": leaf["Days Left"], "SANs": leaf["SANs"]})
+        return data, tls_info
+    finally:
+        writer.close()
+
+async def detect_protocol(ip, port):
+    """Return (protocol, banner, tls_info) for an open port, probing as little as possible."""
+    # 1. Server-speaks-first protocols (SSH, FTP, SMTP, ...) announce themselves
+    try:
+        data, _ = await _exchange(ip, port)
+    except (OSError, asyncio.TimeoutError):
+        return "closed", None, None
+    protocol = classify_banner(data)
+    if protocol and protocol != "tls":
+        return protocol, banner_text(data), None
+
+    # 2. Client-speaks-first: plain HTTP answers a request, TLS answers with an alert
+    data = b""
+    try:
+        data, _ = await _exchange(ip, port, HTTP_PROBE)
+        protocol = classify_banner(data)
+    except (OSError, asyncio.TimeoutError):
+        protocol = None
+    if protocol not in (None, "tls", "unknown"):
+        return protocol, banner_text(data), None
+
+    # 3. Anything else that completes a TLS handshake is TLS, possibly HTTPS inside
+    try:
+        data, tls_info = await _exchange(ip, port, HTTP_PROBE, tls_context=get_tls_context())
+    except (OSError, ssl.SSLError, asyncio.TimeoutError):
+        return protocol or "unknown", banner_text(data) if data else None, None
+    inner = classify_banner(data)
+    if inner == "http":
+        return "https", banner_text(data), tls_info
+    return "tls", banner_text(data) if data else None, tls_info
+
+def fetch_http_metadata(ip, port, secure=False):
+    """Fetch status, headers and page title through the shared keep-alive session."""
+    url = f"{'https' if secure else 'http'}://{ip}:{port}/"
+    try:
+        with get_http_session().get(url, timeout=CONNECT_TIMEOUT, verify=False, stream=True, allow_redirects=False) as response:
+            info = {
+                "Status Code": response.status_code,
+                "Server": response.headers.get('Server', 'Unknown'),
+                "Content-Type": response.headers.get('Content-Type', 'Unknown'),
+            }
+            # Small bodies are read in full so the connection goes back to the pool
+            length = response.headers.get('Content-Length')
+            if length is not None and length.isdigit() and int(length) <= MAX_HTTP_BODY:
+                match = TITLE_PATTERN.search(response.content)
+                if match:
+                    info["Title"] = match.group(1).strip()[:80].decode("utf-8", "replace")
+            return info
+    except requests.RequestException as e:
+        return f"HTTP Error: {str(e)}"
+
+def service_name(port):
+    try:
+        return socket.getservbyport(port)
+    except OSError:
+        return "Unknown"
+
+@profiled()
+async def fingerprint_port(ip, port, http_limit=None):
+    """Fingerprint one open port and return (ip, PortResult)."""
+    protocol, banner, tls_info = await detect_protocol(ip, port)
+    service = protocol if protocol not in ("unknown", "closed") else service_name(port)
+    result = PortResult(port, service, banner, tls_info)
+    if protocol in ("http", "https"):
+        if http_limit is None:
+            result.http_info = await get_governor().run_in_thread(fetch_http_metadata, ip, port, protocol == "https")
+        else:
+            async with http_limit:
+                result.http_info = await get_governor().run_in_thread(fetch_http_metadata, ip, port, protocol == "https")
+    return ip, result
+
+async def fingerprint_services(pairs, concurrency=DEFAULT_CONCURRENCY, progress=None):
+    """Fingerprint many (ip, port) pairs concurrently and yield (ip, result) as each finishes."""
+    pairs = list(pairs)
+    http_limit = asyncio.Semaphore(HTTP_CONCURRENCY)
+    async with get_governor().hold_sockets(min(concurrency, len(pairs))) as granted:
+        limit = asyncio.Semaphore(granted)
+
+        async def run(ip, port):
+            async with limit:
+                try:
+                    return await fingerprint_port(ip, port, http_limit)
+                except Exception as e:
+                    return ip, PortResult(port, service_name(port), f"Error: {str(e)}")
+
+        for finished in asyncio.as_completed([run(ip, port) for ip, port in pairs]):
+            yield await finished
+            if progress:
+                progress(1)
@@ -0,0 +1,507 @@
+import os
+import sys
+import hmac
+import json
+import gzip
+import time
+import zlib
+import signal
+import socket
+import sqlite3
+import argparse
+import threading
+import http.client
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import psutil
+from rich.console import Console
+from rich.table import Table
+from skr_storage import iter_directory_sizes
+from skr_procfs import top_processes
+from skr_performance import collect_resource_sample
+
+console = Console()
+
+# Fleet mode: an agent on each host runs the storage, process and metric
+# collectors on a schedule and a collector (another seekr, possibly on the
+# same machine) keeps the results. The agent only reports records that
+# changed noticeably since it last sent them, queues reports and uploads
+# them in gzip-compressed JSON batches over one kept-alive HTTP connection.
+# The collector indexes the latest record per agent, collector and key in
+# SQLite and keeps a history of every change.
+
+DEFAULT_COLLECTOR_PORT = 8765
+DEFAULT_FLEET_DB = os.path.join(os.path.expanduser("~"), "seekr_fleet.db")
+DEFAULT_INTERVALS = {"metrics": 10, "processes": 60, "storage": 3600}
+DEFAULT_UPLOAD_INTERVAL = 60
+DEFAULT_PROCESS_LIMIT = 25
+MAX_BATCH_REPORTS = 100         # upload early once this many reports are waiting
+MAX_PENDING_REPORTS = 5000      # while the collector is unreachable; older reports are dropped past this
+MAX_BATCH_BYTES = 64 * 1024 * 1024  # decompressed, per upload
+REQUEST_TIMEOUT = 30
+HISTORY_RETENTION = 7 * 24 * 3600
+PRUNE_INTERVAL = 600
+
+# A numeric field only counts as changed once it moves this far from the value last sent
+DELTA_THRESHOLDS = {
+    "SizeMB": 1.0,
+    "cpu_percent": 2.0,
+    "memory_percent": 0.5,
+    "rss": 16 * 1024 * 1024,
+    "cpu": 2.0,
+    "memory": 1.0,
+    "swap": 1.0,
+    "disk": 0.1,
+}
+
+def storage_snapshot(roots):
+    """Sizes of the immediate subdirectories of each root, keyed by path."""
+    directories = []
+    for root in roots:
+        try:
+            directories.extend(entry.path for entry in os.scandir(root) if entry.is_dir(follow_symlinks=False))
+        except OSError as e:
+            console.print(f"[bold red]Cannot list {root}: {e}[/bold red]")
+    return {entry.path: entry.to_dict() for entry in iter_directory_sizes(directories)}
+
+def process_snapshot(limit=DEFAULT_PROCESS_LIMIT):
+    """The top processes by CPU over one second, keyed by pid."""
+    return {
+        str(row["pid"]): {
+            "pid": row["pid"],
+            "name": row["name"],
+            "cpu_percent": round(row["cpu_percent"], 1),
+            "memory_percent": round(row["memory_percent"], 2),
+            "rss": row["rss"],
+            "num_threads": row["num_threads"],
+        }
+        for row in top_processes(interval=1, limit=limit)
+    }
+
+def metrics_snapshot():
+    return {"system": collect_resource_sample()}
+
+def _differs(old, new):
+    for field, value in new.items():
+        before = old.get(field)
+        threshold = DELTA_THRESHOLDS.get(field)
+        if threshold is not None and isinstance(value, (int, float)) and isinstance(before, (int, float)):
+            if abs(value - before) >= threshold:
+                return True
+        elif value != before:
+            return True
+    return False
+
+def snapshot_delta(previous, current):
+    """Return (records new or changed past DELTA_THRESHOLDS, keys no longer present) between two snapshots."""
+    changed = {key: record for key, record in current.items() if key not in previous or _differs(previous[key], record)}
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+class Agent:
+    """Runs collectors on a schedule and uploads their deltas to a collector in compressed batches."""
+
+    def __init__(self, url, name=None, intervals=None, storage_roots=(), process_limit=DEFAULT_PROCESS_LIMIT,
+                 upload_interval=DEFAULT_UPLOAD_INTERVAL, token=None):
+        parts = urlsplit(url if "//" in url else f"http://{url}")
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"Collector URL must look like http://host:port, got '{url}'")
+        self.host = parts.hostname
+        self.port = parts.port or DEFAULT_COLLECTOR_PORT
+        self.path = parts.path.rstrip("/") + "/reports"
+        self.name = name or socket.gethostname()
+        self.token = token
+        self.upload_interval = upload_interval
+        self.intervals = {**DEFAULT_INTERVALS, **(intervals or {})}
+        self.collectors = {"metrics": metrics_snapshot, "processes": lambda: process_snapshot(process_limit)}
+        if storage_roots:
+            self.collectors["storage"] = lambda: storage_snapshot(storage_roots)
+        self.sent = {name: {} for name in self.collectors}
+        self.resync = set(self.collectors)  # the next report of these is a full snapshot
+        self.pending = deque()
+        self.connection = None
+        self.stats = {"reports": 0, "batches": 0, "failures": 0, "raw_bytes": 0, "sent_bytes": 0, "dropped": 0}
+        self._stop = threading.Event()
+        psutil.cpu_percent()  # prime the CPU counter so the first metrics sample is meaningful
+
+    def collect(self, name):
+        """Run one collector and queue a report of what changed since the last one sent."""
+        current = self.collectors[name]()
+        full = name in self.resync
+        if full:
+            changed, removed, baseline = current, [], {}
+        else:
+            changed, removed = snapshot_delta(self.sent[name], current)
+            baseline = self.sent[name]
+        baseline.update(changed)
+        for key in removed:
+            del baseline[key]
+        self.sent[name] = baseline
+        self.resync.discard(name)
+        if full or changed or removed:
+            self._queue({"collector": name, "time": round(time.time(), 3), "full": full, "records": changed, "removed": removed})
+
+    def _queue(self, report):
+        if len(self.pending) >= MAX_PENDING_REPORTS:
+            # The deltas after a dropped report no longer add up, so that collector starts over
+            dropped = self.pending.popleft()
+            self.resync.add(dropped["collector"])
+            self.stats["dropped"] += 1
+        self.pending.append(report)
+        self.stats["reports"] += 1
+
+    def _post(self, body, headers):
+        # A kept-alive connection the collector has since closed fails on first use; reconnect once.
+        # Batches are idempotent upserts, so resending one the collector did get is harmless.
+        for attempt in range(2):
+            try:
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+                self.connection.request("POST", self.path, body, headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (OSError, http.client.HTTPException):
+                self.close()
+                if attempt:
+                    raise
+
+    def upload(self):
+        """Send every waiting report, MAX_BATCH_REPORTS per request; returns False if any could not be delivered."""
+        delivered = True
+        while self.pending:
+            batch = [self.pending[index] for index in range(min(len(self.pending), MAX_BATCH_REPORTS))]
+            raw = json.dumps({"agent": self.name, "sent": round(time.time(), 3), "reports": batch}).encode()
+            body = gzip.compress(raw)
+            headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            try:
+                status, reply = self._post(body, headers)
+            except (OSError, http.client.HTTPException) as e:
+                self.stats["failures"] += 1
+                console.print(f"[bold red]Upload to {self.host}:{self.port} failed: {e}; {len(self.pending)} reports kept[/bold red]")
+                return False
+            if status >= 500:
+                self.stats["failures"] += 1
+                console.print(f"[bold red]Collector error {status}; {len(self.pending)} reports kept[/bold red]")
+                return False
+            for _ in batch:
+                self.pending.popleft()
+            if status != 200:
+                # Retrying a rejected batch cannot help; drop it and start its collectors over
+                self.resync.update(report["collector"] for report in batch)
+                self.stats["failures"] += 1
+                console.print(f"[bold red]Collector rejected {len(batch)} reports ({status}): {reply.decode(errors='replace')}[/bold red]")
+                delivered = False
+                continue
+            self.stats["batches"] += 1
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["sent_bytes"] += len(body)
+            console.print(f"[green]Uploaded {len(batch)} reports ({len(raw) / 1024:.1f} KB, {len(body) / 1024:.1f} KB compressed)[/green]")
+        return delivered
+
+    def run(self, once=False):
+        """Collect and upload until stop() or Ctrl+C; with `once`, run every collector a single time and upload."""
+        next_run = dict.fromkeys(self.collectors, 0)
+        next_upload = time.monotonic() + self.upload_interval
+        try:
+            while True:
+                for name, due in next_run.items():
+                    if due <= time.monotonic():
+                        try:
+                            self.collect(name)
+                        except (OSError, psutil.Error) as e:
+                            console.print(f"[bold red]The {name} collector failed: {e}[/bold red]")
+                        next_run[name] = time.monotonic() + self.intervals[name]
+                if once:
+                    break
+                if len(self.pending) >= MAX_BATCH_REPORTS or time.monotonic() >= next_upload:
+                    self.upload()
+                    next_upload = time.monotonic() + self.upload_interval
+                wait = min(min(next_run.values()), next_upload) - time.monotonic()
+                if self._stop.wait(max(wait, 0)):
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.upload()
+            self.close()
+        return self.stats
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agents (
+    agent TEXT PRIMARY KEY,
+    address TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    batches INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS records (
+    agent TEXT NOT NULL,
+    collector TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated REAL NOT NULL,
+    PRIMARY KEY (agent, collector, key)
+);
+CREATE INDEX IF NOT EXISTS records_by_key ON records (collector, key);
+CREATE TABLE IF NOT EXISTS history (
+    agent TEXT NOT NULL,
+    collector TEXT NOT NULL,
+    key TEXT NOT NULL,
+    time REAL NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS history_by_record ON history (agent, collector, key, time);
+CREATE INDEX IF NOT EXISTS history_by_time ON history (time);
+"""
+
+class FleetStore:
+    """SQLite index of the latest record per agent, collector and key, plus every change (data NULL means removed)."""
+
+    def __init__(self, path=DEFAULT_FLEET_DB):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self.last_prune = 0
+
+    def close(self):
+        self.db.close()
+
+    def ingest(self, batch, address=None, size=0):
+        """Store one uploaded batch and return how many reports it held."""
+        agent = str(batch["agent"])
+        reports = batch["reports"]
+        now = time.time()
+        with self.lock, self.db:
+            self.db.execute(
+                """INSERT INTO agents (agent, address, first_seen, last_seen, batches, bytes) VALUES (?, ?, ?, ?, 1, ?)
+                   ON CONFLICT(agent) DO UPDATE SET address = excluded.address, last_seen = excluded.last_seen,
+                   batches = batches + 1, bytes = bytes + excluded.bytes""",
+                (agent, address, now, now, size),
+            )
+            for report in reports:
+                collector = str(report["collector"])
+                timestamp = float(report["time"])
+                if report.get("full"):
+                    self.db.execute("DELETE FROM records WHERE agent = ? AND collector = ?", (agent, collector))
+                rows = [(agent, collector, str(key), json.dumps(record), timestamp) for key, record in report["records"].items()]
+                removed = [(agent, collector, str(key)) for key in report.get("removed", ())]
+                self.db.executemany(
+                    """INSERT INTO records (agent, collector, key, data, updated) VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT(agent, collector, key) DO UPDATE SET data = excluded.data, updated = excluded.updated""",
+                    rows,
+                )
+                self.db.executemany("DELETE FROM records WHERE agent = ? AND collector = ? AND key = ?", removed)
+                self.db.executemany("INSERT INTO history (agent, collector, key, data, time) VALUES (?, ?, ?, ?, ?)", rows)
+                self.db.executemany("INSERT INTO history (agent, collector, key, data, time) VALUES (?, ?, ?, NULL, ?)",
+                                    [row + (timestamp,) for row in removed])
+            if now - self.last_prune > PRUNE_INTERVAL:
+                self.db.execute("DELETE FROM history WHERE time < ?", (now - HISTORY_RETENTION,))
+                self.last_prune = now
+        return len(reports)
+
+    def agents(self):
+        with self.lock:
+            return [dict(row) for row in self.db.execute(
+                """SELECT agents.*, (SELECT COUNT(*) FROM records WHERE records.agent = agents.agent) AS records
+                   FROM agents ORDER BY agent""")]
+
+    def records(self, collector, agent=None):
+        """The latest records of one collector, across the fleet or for one agent."""
+        query = "SELECT agent, key, data, updated FROM records WHERE collector = ?"
+        params = [collector]
+        if agent:
+            query += " AND agent = ?"
+            params.append(agent)
+        with self.lock:
+            rows = self.db.execute(query + " ORDER BY agent, key", params).fetchall()
+        return [{"agent": row["agent"], "key": row["key"], "updated": row["updated"], **json.loads(row["data"])} for row in rows]
+
+    def history(self, agent, collector, key, since=0):
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT time, data FROM history WHERE agent = ? AND collector = ? AND key = ? AND time >= ? ORDER BY time",
+                (agent, collector, key, since),
+            ).fetchall()
+        return [{"time": row["time"], "record": json.loads(row["data"]) if row["data"] else None} for row in rows]
+
+def _gunzip(data, limit=MAX_BATCH_BYTES):
+    decompressor = zlib.decompressobj(wbits=31)
+    result = decompressor.decompress(data, limit)
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Report batch is larger than {limit} bytes uncompressed")
+    return result
+
+class _CollectorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so an agent sends every batch over one connection
+
+    def log_message(self, format, *args):
+        pass  # one line per batch from hundreds of agents is noise
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        token = self.server.token
+        return not token or hmac.compare_digest(self.headers.get("Authorization", ""), f"Bearer {token}")
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip("/") != "/reports":
+            self.close_connection = True
+            return self._reply(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(length)
+        except ValueError:
+            self.close_connection = True  # without a length the body cannot be skipped
+            return self._reply(400, {"error": "bad Content-Length"})
+        if length > MAX_BATCH_BYTES:
+            self.close_connection = True  # the body is never read, so the connection cannot be reused
+            return self._reply(413, {"error": "batch too large"})
+        body = self.rfile.read(length)
+        if not self._authorized():
+            return self._reply(401, {"error": "unauthorized"})
+        try:
+            data = _gunzip(body) if self.headers.get("Content-Encoding") == "gzip" else body
+            count = self.server.store.ingest(json.loads(data), self.client_address[0], len(body))
+        except (ValueError, KeyError, TypeError, AttributeError, zlib.error) as e:
+            return self._reply(400, {"error": f"bad batch: {e}"})
+        except sqlite3.Error as e:
+            # e.g. a keep-alive connection outliving a collector restart; the agent keeps the batch and retries
+            self.close_connection = True
+            return self._reply(503, {"error": f"store unavailable: {e}"})
+        self._reply(200, {"ok": True, "reports": count})
+
+    def do_GET(self):
+        if not self._authorized():
+            return self._reply(401, {"error": "unauthorized"})
+        parts = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        store = self.server.store
+        if parts.path == "/agents":
+            return self._reply(200, store.agents())
+        if parts.path == "/records" and "collector" in query:
+            return self._reply(200, store.records(query["collector"], query.get("agent")))
+        if parts.path == "/history" and {"agent", "collector", "key"} <= query.keys():
+            try:
+                since = float(query.get("since", 0))
+            except ValueError:
+                return self._reply(400, {"error": "since must be a timestamp"})
+            return self._reply(200, store.history(query["agent"], query["collector"], query["key"], since))
+        self._reply(404, {"error": "not found"})
+
+class CollectorServer(ThreadingHTTPServer):
+    """Accepts agent uploads on POST /reports and answers GET /agents, /records and /history."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_COLLECTOR_PORT, db_path=DEFAULT_FLEET_DB, token=None):
+        self.store = FleetStore(db_path)
+        self.token = token
+        super().__init__((host, port), _CollectorHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.store.close()
+
+def start_collector(host="127.0.0.1", port=DEFAULT_COLLECTOR_PORT, db_path=DEFAULT_FLEET_DB, token=None):
+    """Start a CollectorServer on a background thread and return it; call shutdown() to stop."""
+    server = CollectorServer(host, port, db_path, token)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def display_fleet(store):
+    agents = store.agents()
+    if not agents:
+        console.print("[bold yellow]No agents have reported yet.[/bold yellow]")
+        return
+
+    table = Table(title="Fleet Agents")
+    table.add_column("Agent", style="cyan")
+    table.add_column("Address", style="magenta")
+    table.add_column("Last Report", justify="right", style="green")
+    table.add_column("Batches", justify="right")
+    table.add_column("Received (KB)", justify="right")
+    table.add_column("Records", justify="right", style="yellow")
+    now = time.time()
+    for agent in agents:
+        table.add_row(agent["agent"], agent["address"] or "Unknown", f"{now - agent['last_seen']:.0f} s ago",
+                      str(agent["batches"]), f"{agent['bytes'] / 1024:.1f}", str(agent["records"]))
+    console.print(table)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fleet agent and collector for central storage, process and metric snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    collector = commands.add_parser("collector", help="receive and index agent reports")
+    collector.add_argument("--bind", default="127.0.0.1")
+    collector.add_argument("--port", type=int, default=DEFAULT_COLLECTOR_PORT)
+    collector.add_argument("--db", default=DEFAULT_FLEET_DB)
+    collector.add_argument("--token", help="require this bearer token from agents and readers")
+
+    agent = commands.add_parser("agent", help="collect on a schedule and upload to a collector")
+    agent.add_argument("url", help="collector address, e.g. http://collector:8765")
+    agent.add_argument("--name", help="agent name (default: the hostname)")
+    agent.add_argument("--storage", action="append", default=[], metavar="PATH",
+                       help="report subdirectory sizes under PATH (repeatable; storage is off without it)")
+    agent.add_argument("--metrics-interval", type=float, default=DEFAULT_INTERVALS["metrics"])
+    agent.add_argument("--process-interval", type=float, default=DEFAULT_INTERVALS["processes"])
+    agent.add_argument("--storage-interval", type=float, default=DEFAULT_INTERVALS["storage"])
+    agent.add_argument("--process-limit", type=int, default=DEFAULT_PROCESS_LIMIT, help="top processes to report, 0 for all")
+    agent.add_argument("--upload-interval", type=float, default=DEFAULT_UPLOAD_INTERVAL)
+    agent.add_argument("--token")
+    agent.add_argument("--once", action="store_true", help="run every collector once, upload and exit")
+
+    status = commands.add_parser("status", help="show the agents a collector database has heard from")
+    status.add_argument("--db", default=DEFAULT_FLEET_DB)
+    args = parser.parse_args(argv)
+
+    if args.command == "collector":
+        with CollectorServer(args.bind, args.port, args.db, args.token) as server:
+            console.print(f"[bold cyan]Fleet collector listening on {args.bind}:{args.port}, storing in {args.db} (Ctrl+C to stop)[/bold cyan]")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    if args.command == "status":
+        store = FleetStore(args.db)
+        display_fleet(store)
+        store.close()
+        return 0
+
+    intervals = {"metrics": args.metrics_interval, "processes": args.process_interval, "storage": args.storage_interval}
+    try:
+        fleet_agent = Agent(args.url, args.name, intervals, args.storage, args.process_limit, args.upload_interval, args.token)
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        return 1
+    console.print(f"[bold cyan]Agent {fleet_agent.name} reporting to {fleet_agent.host}:{fleet_agent.port} (Ctrl+C to stop)[/bold cyan]")
+    signal.signal(signal.SIGTERM, lambda *_: fleet_agent.stop())  # service managers stop agents this way; flush first
+    fleet_agent.run(once=args.once)
+    return 0 if not fleet_agent.pending else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import asyncio
+import threading
+import contextlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+from skr_utils import load_config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+console = Console()
+
+# One process-wide budget for threads, file descriptors and sockets, so
+# storage walks, memory attribution and network scans running together
+# stay inside the limits in seekr_config.ini instead of each sizing itself
+# as if it were alone. Blocking work runs on one shared thread pool of
+# MaxThreads workers. Scanners reserve a block of sockets up front (a
+# scan's concurrency) rather than one at a time per probe, and get fewer
+# than they asked for when another subsystem holds part of the budget.
+
+DEFAULT_MAX_THREADS = 100
+FD_RESERVE = 64             # descriptors left for stdio, logging, imports and the like
+FALLBACK_MAX_OPEN_FILES = 512
+SOCKET_SHARE = 0.75         # 'auto' MaxSockets leaves a quarter of MaxOpenFiles to file work
+
+class Budget:
+    """A counted limit shared between threads, with partial and blocking reservations."""
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = max(int(capacity), 1)
+        self.in_use = 0
+        self.peak = 0
+        self.waiting = 0
+        self.waits = 0
+        self._condition = threading.Condition()
+
+    def reserve(self, wanted, minimum=1, timeout=None):
+        """Take up to `wanted` units, blocking until at least `minimum` are free, and return how many were granted.
+
+        Returns 0 if `timeout` runs out first.
+        """
+        minimum = min(minimum, wanted, self.capacity)
+        with self._condition:
+            if self.capacity - self.in_use < minimum:
+                self.waiting += 1
+                self.waits += 1
+                try:
+                    if not self._condition.wait_for(lambda: self.capacity - self.in_use >= minimum, timeout):
+                        return 0
+                finally:
+                    self.waiting -= 1
+            granted = min(wanted, self.capacity - self.in_use)
+            self.in_use += granted
+            self.peak = max(self.peak, self.in_use)
+            return granted
+
+    def release(self, count):
+        if not count:
+            return
+        with self._condition:
+            self.in_use -= count
+            self._condition.notify_all()
+
+    def status(self):
+        return {"limit": self.capacity, "in_use": self.in_use, "peak": self.peak, "waiting": self.waiting, "waits": self.waits}
+
+class Governor:
+    """Shared executor plus thread, open file and socket budgets for every subsystem."""
+
+    def __init__(self, max_threads=DEFAULT_MAX_THREADS, max_open_files=None, max_sockets=None):
+        self.max_threads = max(int(max_threads), 1)
+        self.files = Budget("files", max_open_files or default_max_open_files())
+        self.sockets = Budget("sockets", min(max_sockets or int(self.files.capacity * SOCKET_SHARE), self.files.capacity))
+        self.executor = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="seekr")
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self._lock = threading.Lock()
+
+    def _run(self, fn, args, kwargs, files):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            if files:
+                with self.hold_files(files):
+                    return fn(*args, **kwargs)
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def submit(self, fn, *args, files=0, **kwargs):
+        """Run fn(*args, **kwargs) on the shared executor, holding `files` descriptors while it runs."""
+        with self._lock:
+            self.queued += 1
+        return self.executor.submit(self._run, fn, args, kwargs, files)
+
+    def imap(self, fn, *iterables, files=0):
+        """Lazily map `fn` over the iterables on the shared executor, yielding results in order.
+
+        At most twice MaxThreads calls are queued at a time, so huge inputs
+        such as every directory on a drive are not turned into futures up
+        front. Do not call this from a task already on the executor.
+        """
+        pending = deque()
+        window = 2 * self.max_threads
+        try:
+            for args in zip(*iterables):
+                pending.append(self.submit(fn, *args, files=files))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                if future.cancel():
+                    with self._lock:
+                        self.queued -= 1
+
+    async def run_in_thread(self, fn, *args, files=0):
+        """Await fn(*args) run on the shared executor."""
+        return await asyncio.wrap_future(self.submit(fn, *args, files=files))
+
+    @contextlib.contextmanager
+    def hold_files(self, count):
+        granted = self.files.reserve(count, count)
+        try:
+            yield granted
+        finally:
+            self.files.release(granted)
+
+    def reserve_sockets(self, wanted, minimum=1, timeout=None):
+        """Reserve up to `wanted` sockets, each also counted as an open file, and return how many were granted."""
+        granted = self.sockets.reserve(wanted, minimum, timeout)
+        files = self.files.reserve(granted, min(minimum, granted), timeout) if granted else 0
+        self.sockets.release(granted - files)
+        return files
+
+    def release_sockets(self, count):
+        self.sockets.release(count)
+        self.files.release(count)
+
+    @contextlib.asynccontextmanager
+    async def hold_sockets(self, wanted, minimum=1):
+        """Reserve a block of sockets for a scan without blocking the event loop, releasing it afterwards."""
+        granted = self.reserve_sockets(wanted, minimum, timeout=0)
+        if not granted and wanted:
+            granted = await self._reserve_sockets_in_thread(wanted, minimum)
+        try:
+            yield granted
+        finally:
+            self.release_sockets(granted)
+
+    async def _reserve_sockets_in_thread(self, wanted, minimum):
+        # If the waiter is cancelled while the thread is still blocked, the
+        # thread hands back whatever it is granted later; if the grant came
+        # first, the waiter releases it. The lock decides which side owns it.
+        handoff = threading.Lock()
+        state = {"granted": 0, "abandoned": False}
+
+        def reserve():
+            granted = self.reserve_sockets(wanted, minimum)
+            with handoff:
+                if state["abandoned"]:
+                    self.release_sockets(granted)
+                    return 0
+                state["granted"] = granted
+            return granted
+
+        try:
+            return await asyncio.to_thread(reserve)
+        except asyncio.CancelledError:
+            with handoff:
+                state["abandoned"] = True
+                self.release_sockets(state["granted"])
+            raise
+
+    def status(self):
+        return {
+            "threads": {"limit": self.max_threads, "in_use": self.active, "queued": self.queued, "completed": self.completed},
+            "files": self.files.status(),
+            "sockets": self.sockets.status(),
+        }
+
+def default_max_open_files():
+    """The soft RLIMIT_NOFILE minus a reserve, or a conservative fallback where it is unknown."""
+    if resource is None:
+        return FALLBACK_MAX_OPEN_FILES
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return FALLBACK_MAX_OPEN_FILES * 8
+    return max(soft - FD_RESERVE, 1)
+
+def _limit(section, key, default):
+    value = section.get(key, "auto").strip().lower()
+    return default if value in ("", "auto") else int(value)
+
+_governor = None
+_governor_lock = threading.Lock()
+
+def get_governor():
+    """Return the process-wide Governor, built from seekr_config.ini on first use."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            section = load_config(create=False)["DEFAULT"]
+            _governor = Governor(
+                _limit(section, "MaxThreads", DEFAULT_MAX_THREADS),
+                _limit(section, "MaxOpenFiles", None),
+                _limit(section, "MaxSockets", None),
+            )
+        return _governor
+
+def display_governor_status():
+    status = get_governor().status()
+    table = Table(title="Resource Governor")
+    table.add_column("Resource", style="cyan")
+    table.add_column("Limit", justify="right", style="magenta")
+    table.add_column("In Use", justify="right", style="green")
+    table.add_column("Peak", justify="right", style="yellow")
+    table.add_column("Fullness", justify="right", style="red")
+    table.add_column("Waiting", justify="right")
+
+    threads = status["threads"]
+    table.add_row("Threads", str(threads["limit"]), str(threads["in_use"]), "-",
+                  f"{threads['in_use'] / threads['limit']:.0%}", f"{threads['queued']} queued")
+    for name in ("files", "sockets"):
+        budget = status[name]
+        table.add_row(name.capitalize(), str(budget["limit"]), str(budget["in_use"]), str(budget["peak"]),
+                      f"{budget['in_use'] / budget['limit']:.0%}", str(budget["waiting"]))
+    console.print(table)
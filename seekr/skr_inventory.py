@@ -0,0 +1,137 @@
+import os
+import time
+import sqlite3
+import ipaddress
+from rich.console import Console
+from rich.table import Table
+from skr_ports import PortBitmap
+from skr_records import Device
+
+console = Console()
+
+# Persistent inventory of discovered devices and their open ports, so a
+# return trip into the network menu can start from what is already known.
+
+DEFAULT_INVENTORY_PATH = os.path.join(os.path.expanduser("~"), "seekr_inventory.db")
+FULL_SWEEP_TTL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS devices (
+    ip TEXT PRIMARY KEY,
+    mac TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_port_scan REAL
+);
+CREATE TABLE IF NOT EXISTS ports (
+    ip TEXT NOT NULL,
+    port INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (ip, port)
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    network TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    last_sweep REAL NOT NULL,
+    PRIMARY KEY (network, kind)
+);
+"""
+
+class Inventory:
+    """SQLite-backed store of devices (IP, MAC, first/last seen) and their open ports."""
+
+    def __init__(self, path=DEFAULT_INVENTORY_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def record_devices(self, devices, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.db:
+            self.db.executemany(
+                """INSERT INTO devices (ip, mac, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(ip) DO UPDATE SET mac = COALESCE(excluded.mac, mac), last_seen = excluded.last_seen""",
+                [(device.ip, device.mac, timestamp, timestamp) for device in devices],
+            )
+
+    def record_ports(self, ip, open_ports, scanned_ports, timestamp=None):
+        """Store a port scan result; known ports that were scanned and found closed are dropped."""
+        timestamp = time.time() if timestamp is None else timestamp
+        open_ports = PortBitmap(open_ports)
+        closed = PortBitmap(scanned_ports) - open_ports
+        with self.db:
+            self.db.executemany(
+                """INSERT INTO ports (ip, port, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(ip, port) DO UPDATE SET last_seen = excluded.last_seen""",
+                [(ip, port, timestamp, timestamp) for port in open_ports],
+            )
+            known = [row['port'] for row in self.db.execute("SELECT port FROM ports WHERE ip = ?", (ip,))]
+            self.db.executemany("DELETE FROM ports WHERE ip = ? AND port = ?", [(ip, port) for port in known if port in closed])
+            self.db.execute(
+                """INSERT INTO devices (ip, first_seen, last_seen, last_port_scan) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(ip) DO UPDATE SET last_seen = excluded.last_seen, last_port_scan = excluded.last_port_scan""",
+                (ip, timestamp, timestamp, timestamp),
+            )
+
+    def devices(self, network=None):
+        rows = [dict(row) for row in self.db.execute("SELECT * FROM devices ORDER BY last_seen DESC")]
+        if network:
+            network = ipaddress.ip_network(network, strict=False)
+            rows = [row for row in rows if ipaddress.ip_address(row['ip']) in network]
+        return rows
+
+    def device_records(self, network=None):
+        """Known devices as Device records, for code that works on discovery results."""
+        return [Device(row['ip'], row['mac'], "inventory") for row in self.devices(network)]
+
+    def open_ports(self, ip):
+        return PortBitmap(row['port'] for row in self.db.execute("SELECT port FROM ports WHERE ip = ?", (ip,)))
+
+    def port_records(self, ip):
+        return [dict(row) for row in self.db.execute("SELECT * FROM ports WHERE ip = ? ORDER BY port", (ip,))]
+
+    def last_sweep(self, network, kind="full"):
+        """Return when `network` last had a sweep of `kind` ('full' or 'discovery')."""
+        row = self.db.execute("SELECT last_sweep FROM sweeps WHERE network = ? AND kind = ?", (network, kind)).fetchone()
+        return row['last_sweep'] if row else None
+
+    def mark_sweep(self, network, kind="full", timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self.db:
+            self.db.execute(
+                """INSERT INTO sweeps (network, kind, last_sweep) VALUES (?, ?, ?)
+                   ON CONFLICT(network, kind) DO UPDATE SET last_sweep = excluded.last_sweep""",
+                (network, kind, timestamp),
+            )
+
+    def needs_sweep(self, network, kind="full", ttl=FULL_SWEEP_TTL):
+        last = self.last_sweep(network, kind)
+        return last is None or time.time() - last >= ttl
+
+def display_inventory(inventory, network=None):
+    table = Table(title="Device Inventory")
+    table.add_column("IP Address", style="magenta")
+    table.add_column("MAC Address", style="green")
+    table.add_column("First Seen", style="cyan")
+    table.add_column("Last Seen", style="cyan")
+    table.add_column("Open Ports", style="yellow")
+
+    def when(timestamp):
+        return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp)) if timestamp else "N/A"
+
+    for device in inventory.devices(network):
+        ports = inventory.open_ports(device['ip'])
+        table.add_row(
+            device['ip'],
+            device['mac'] or "Unknown",
+            when(device['first_seen']),
+            when(device['last_seen']),
+            (", ".join(map(str, ports)) or "None") if device['last_port_scan'] else "Not scanned",
+        )
+
+    console.print(table)
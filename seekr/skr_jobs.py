@@ -0,0 +1,247 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import psutil
+from rich.console import Console
+from rich.table import Table
+from skr_storage import iter_directory_sizes
+from skr_synscan import fast_scan_hosts
+from skr_discovery import sweep_network, network_hosts, read_arp_cache
+from skr_performance import collect_resource_sample
+from skr_ports import parse_port_spec
+from skr_records import to_dicts
+
+console = Console()
+
+# Background jobs for the interactive menus. The menus block on prompts,
+# so jobs cannot live on the menu's event loop: coroutine jobs (scans,
+# sweeps) run on an event loop in a background thread, and blocking jobs
+# (directory walks, sampling) on a small pool of job threads. A job reports
+# progress and appends results as it goes, so they can be read while it
+# runs, and stops at its next check once cancelled.
+
+DEFAULT_MAX_JOBS = 8
+MAX_SAMPLES = 3600
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+class JobCancelled(Exception):
+    """Raised inside a job function when its job has been cancelled."""
+
+class Job:
+    """One background task with progress, partial results and cancellation."""
+
+    def __init__(self, job_id, name, max_results=None):
+        self.id = job_id
+        self.name = name
+        self.status = PENDING
+        self.done = 0
+        self.total = None
+        self.results = deque(maxlen=max_results)
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def advance(self, count=1):
+        with self._lock:
+            self.done += count
+
+    def add_result(self, result):
+        with self._lock:
+            self.results.append(result)
+
+    def partial_results(self):
+        with self._lock:
+            return list(self.results)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def wait(self, seconds):
+        """Sleep up to `seconds`, raising JobCancelled as soon as the job is cancelled."""
+        if self._cancel.wait(seconds):
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel() and self.status == PENDING:
+            self.status = CANCELLED  # never started
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def progress_text(self):
+        if self.total:
+            return f"{self.done}/{self.total} ({self.done / self.total:.0%})"
+        return str(self.done)
+
+class JobManager:
+    """Runs blocking and async jobs in the background and keeps them for inspection."""
+
+    def __init__(self, max_jobs=DEFAULT_MAX_JOBS):
+        self.jobs = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="seekr-job")
+        self.loop = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def _event_loop(self):
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="seekr-jobs-loop", daemon=True).start()
+            return self.loop
+
+    def submit(self, name, fn, *args, max_results=None):
+        """Start fn(job, *args) in the background and return its Job.
+
+        Coroutine functions run on the job event loop, anything else on a
+        job thread. `max_results` keeps only the newest results.
+        """
+        with self._lock:
+            job = Job(self._next_id, name, max_results)
+            self.jobs[job.id] = job
+            self._next_id += 1
+        if asyncio.iscoroutinefunction(fn):
+            job.future = asyncio.run_coroutine_threadsafe(self._run_async(job, fn, args), self._event_loop())
+        else:
+            job.future = self.executor.submit(self._run_sync, job, fn, args)
+        return job
+
+    def _start(self, job):
+        job.status = RUNNING
+        job.started = time.monotonic()
+
+    def _finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished = time.monotonic()
+
+    def _run_sync(self, job, fn, args):
+        if job.cancelled:
+            self._finish(job, CANCELLED)
+            return
+        self._start(job)
+        try:
+            fn(job, *args)
+            self._finish(job, DONE)
+        except JobCancelled:
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            self._finish(job, FAILED, str(e))
+
+    async def _run_async(self, job, fn, args):
+        self._start(job)
+        try:
+            await fn(job, *args)
+            self._finish(job, DONE)
+        except (JobCancelled, asyncio.CancelledError):
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            self._finish(job, FAILED, str(e))
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def running(self):
+        return [job for job in self.jobs.values() if job.status in (PENDING, RUNNING)]
+
+    def shutdown(self):
+        """Cancel every unfinished job and stop the job threads and loop."""
+        for job in self.running():
+            job.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+def directory_scan_job(job, root):
+    """Size every directory under `root`, as scan_drive does, one result per directory."""
+    directories = (os.path.join(parent, d) for parent, dirs, _ in os.walk(root) for d in dirs)
+    for record in iter_directory_sizes(directories):
+        job.check_cancelled()
+        job.add_result(record)
+        job.advance()
+
+async def port_scan_job(job, targets, ports):
+    """Scan ports on `targets`, one result per host as it finishes."""
+    ports = parse_port_spec(ports)
+    job.total = len(targets) * len(ports)
+    async for target, open_ports, error in fast_scan_hosts(targets, ports, progress=job.advance):
+        job.add_result({"host": target, "open_ports": open_ports.to_list(), "error": str(error) if error else None})
+
+async def sweep_job(job, network):
+    """Sweep a network for live hosts, one result per host as it answers."""
+    job.total = len(network_hosts(network))
+    async for device in sweep_network(network, progress=job.advance):
+        job.add_result(device)
+    arp = read_arp_cache()
+    for device in job.partial_results():
+        device.mac = arp.get(device.ip)
+
+def sampling_job(job, interval=1, count=None):
+    """Record resource usage every `interval` seconds until cancelled or `count` samples are taken."""
+    job.total = count
+    psutil.cpu_percent()  # prime the CPU counter so the first sample is meaningful
+    while count is None or job.done < count:
+        job.wait(interval)
+        job.add_result({"time": time.strftime("%H:%M:%S"), **collect_resource_sample()})
+        job.advance()
+
+def display_jobs(manager):
+    if not manager.jobs:
+        console.print("[bold yellow]No jobs have been started.[/bold yellow]")
+        return
+
+    styles = {PENDING: "white", RUNNING: "cyan", DONE: "green", CANCELLED: "yellow", FAILED: "red"}
+    table = Table(title="Background Jobs")
+    table.add_column("ID", style="cyan")
+    table.add_column("Job", style="magenta")
+    table.add_column("Status")
+    table.add_column("Progress", justify="right")
+    table.add_column("Results", justify="right")
+    table.add_column("Elapsed (s)", justify="right")
+
+    for job in manager.jobs.values():
+        status = f"[{styles[job.status]}]{job.status}[/{styles[job.status]}]"
+        if job.error:
+            status += f": {job.error}"
+        table.add_row(str(job.id), job.name, status, job.progress_text(), str(len(job.results)), f"{job.elapsed:.1f}")
+    console.print(table)
+
+def display_job_results(job, limit=50):
+    """Show a job's results so far (the newest `limit` of them) as a table."""
+    results = job.partial_results()
+    if not results:
+        console.print(f"[bold yellow]Job {job.id} has no results yet ({job.status}).[/bold yellow]")
+        return
+
+    shown = to_dicts(results[-limit:])
+    table = Table(title=f"Job {job.id}: {job.name} ({job.status}, {len(results)} results)")
+    for key in shown[0]:
+        table.add_column(key, style="cyan")
+    for record in shown:
+        table.add_row(*(
+            ", ".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+            for value in record.values()
+        ))
+    console.print(table)
+    if len(results) > limit:
+        console.print(f"[dim]Showing the newest {limit} of {len(results)} results.[/dim]")
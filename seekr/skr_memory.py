@@ -0,0 +1,158 @@
+import os
+import time
+import threading
+import psutil
+from rich.console import Console
+from rich.table import Table
+from skr_procfs import PROC_FAST_PATH, collect_processes
+from skr_governor import get_governor
+from skr_profile import profiled
+
+console = Console()
+
+# USS/PSS memory attribution. RSS counts shared pages once per process, so a
+# pre-forked server with 64 workers looks 64 times larger than it is. PSS
+# splits shared pages between the processes mapping them and USS counts only
+# private pages, so summing them per application gives real footprints.
+
+SMAPS_FIELDS = {
+    b"Rss:": "rss",
+    b"Pss:": "pss",
+    b"Private_Clean:": "private_clean",
+    b"Private_Dirty:": "private_dirty",
+    b"Swap:": "swap",
+    b"SwapPss:": "swap_pss",
+}
+
+CACHE_TTL = 5.0
+_cache = {}
+_cache_lock = threading.Lock()
+
+def read_smaps_rollup(pid):
+    """Read USS/PSS/RSS/swap for one process from /proc/[pid]/smaps_rollup, in bytes."""
+    usage = dict.fromkeys(SMAPS_FIELDS.values(), 0)
+    with open(f"/proc/{pid}/smaps_rollup", "rb") as f:
+        for line in f:
+            key = SMAPS_FIELDS.get(line.split(None, 1)[0])
+            if key:
+                usage[key] = int(line.split()[1]) * 1024
+    return {
+        "uss": usage["private_clean"] + usage["private_dirty"],
+        "pss": usage["pss"],
+        "rss": usage["rss"],
+        "swap": usage["swap_pss"] or usage["swap"],
+    }
+
+def _read_with_psutil(pid):
+    info = psutil.Process(pid).memory_full_info()
+    return {
+        "uss": info.uss,
+        "pss": getattr(info, "pss", info.uss),
+        "rss": info.rss,
+        "swap": getattr(info, "swap", 0),
+    }
+
+def _group_key(pid, name, group_by):
+    try:
+        if group_by == "cgroup":
+            with open(f"/proc/{pid}/cgroup") as f:
+                # cgroup v2 has a single "0::/path" line, v1 lists every hierarchy
+                lines = f.read().splitlines()
+            return (lines[-1].split(":", 2)[2] or "/") if lines else "unknown"
+        if PROC_FAST_PATH:
+            return os.readlink(f"/proc/{pid}/exe")
+        return psutil.Process(pid).exe() or name
+    except (OSError, IndexError, psutil.Error):
+        # kernel threads and processes owned by other users have no readable exe
+        return f"[{name}]"
+
+def _process_usage(pid, start_time, now, ttl):
+    key = (pid, start_time)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    try:
+        usage = read_smaps_rollup(pid) if PROC_FAST_PATH else _read_with_psutil(pid)
+    except FileNotFoundError:
+        # smaps_rollup needs Linux 4.14+, older kernels go through psutil's smaps parser
+        try:
+            usage = _read_with_psutil(pid)
+        except psutil.Error:
+            return None
+    except (OSError, psutil.Error):
+        return None
+
+    with _cache_lock:
+        _cache[key] = (now + ttl, usage)
+    return usage
+
+def _grouped_usage(pid, start_time, name, group_by, now, ttl):
+    usage = _process_usage(pid, start_time, now, ttl)
+    if usage is None or not usage["rss"]:
+        # kernel threads have no user memory to attribute
+        return None, None
+    return _group_key(pid, name, group_by), usage
+
+@profiled()
+def memory_attribution(group_by="exe", ttl=CACHE_TTL):
+    """Collect USS/PSS for every process on the shared executor and aggregate it by executable or cgroup."""
+    if group_by not in ("exe", "cgroup"):
+        raise ValueError("group_by must be 'exe' or 'cgroup'")
+
+    processes = collect_processes()
+    now = time.monotonic()
+    usages = get_governor().imap(
+        _grouped_usage,
+        processes.pids,
+        processes.start_time,
+        processes.names,
+        [group_by] * len(processes),
+        [now] * len(processes),
+        [ttl] * len(processes),
+        files=1,  # each call reads one smaps_rollup at a time
+    )
+    groups = {}
+    for name, usage in usages:
+        if usage is None:
+            continue
+        group = groups.get(name)
+        if group is None:
+            group = groups[name] = {"group": name, "processes": 0, "uss": 0, "pss": 0, "rss": 0, "swap": 0}
+        group["processes"] += 1
+        for field in ("uss", "pss", "rss", "swap"):
+            group[field] += usage[field]
+
+    with _cache_lock:
+        for key in [key for key, (expires, _) in _cache.items() if expires <= now]:
+            del _cache[key]
+
+    return sorted(groups.values(), key=lambda group: group["pss"], reverse=True)
+
+def analyze_memory_attribution(group_by="exe", limit=20):
+    """Display memory usage aggregated by application, ranked by PSS."""
+    with console.status("[cyan]Reading per-process memory maps...", spinner="dots"):
+        start = time.perf_counter()
+        groups = memory_attribution(group_by)
+        elapsed = time.perf_counter() - start
+
+    table = Table(title=f"Memory by {'Executable' if group_by == 'exe' else 'Cgroup'} ({elapsed:.2f}s)")
+    table.add_column("Application", style="cyan")
+    table.add_column("Procs", justify="right", style="blue")
+    table.add_column("USS (MB)", justify="right", style="green")
+    table.add_column("PSS (MB)", justify="right", style="magenta")
+    table.add_column("RSS (MB)", justify="right", style="yellow")
+    table.add_column("Swap (MB)", justify="right", style="red")
+
+    for group in groups[:limit]:
+        table.add_row(
+            group["group"],
+            str(group["processes"]),
+            f"{group['uss'] / (1024**2):.2f}",
+            f"{group['pss'] / (1024**2):.2f}",
+            f"{group['rss'] / (1024**2):.2f}",
+            f"{group['swap'] / (1024**2):.2f}",
+        )
+
+    console.print(table)
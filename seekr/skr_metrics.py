@@ -0,0 +1,354 @@
+import math
+import operator
+import re
+import time
+
+# Streaming statistics and threshold alerting for long-running monitoring.
+# Every estimator here keeps a fixed amount of state no matter how many
+# samples it sees, so a monitor can run for weeks without growing.
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+RULE_PATTERN = re.compile(
+    r"^\s*(?P<stat>p\d{1,2}(?:\.\d+)?|avg|mean|min|max|ewma|value)\s+"
+    r"(?P<metric>[\w.]+)\s*"
+    r"(?P<op>>=|<=|==|>|<)\s*"
+    r"(?P<threshold>-?\d+(?:\.\d+)?)\s*%?"
+    r"(?:\s+for\s+(?P<duration>\d+(?:\.\d+)?\s*[smhd]?))?\s*$",
+    re.IGNORECASE,
+)
+
+def parse_duration(text):
+    """Parse a duration such as '30s', '5m' or '1h' into seconds."""
+    text = str(text).strip().lower()
+    unit = text[-1] if text and text[-1] in DURATION_UNITS else "s"
+    number = text[:-1] if text and text[-1] in DURATION_UNITS else text
+    try:
+        return float(number) * DURATION_UNITS[unit]
+    except ValueError:
+        raise ValueError(f"Invalid duration: {text!r}")
+
+class EWMA:
+    """Exponentially weighted moving average."""
+
+    def __init__(self, alpha=0.3):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, sample):
+        if self.value is None:
+            self.value = sample
+        else:
+            self.value += self.alpha * (sample - self.value)
+        return self.value
+
+class P2Quantile:
+    """Single-quantile estimator using the P² algorithm (Jain & Chlamtac), five markers of state."""
+
+    def __init__(self, quantile):
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be in (0, 1)")
+        self.quantile = quantile
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def update(self, sample):
+        self.count += 1
+        heights = self.heights
+
+        if self.count <= 5:
+            heights.append(sample)
+            heights.sort()
+            return
+
+        if sample < heights[0]:
+            heights[0] = sample
+            cell = 0
+        elif sample >= heights[4]:
+            heights[4] = sample
+            cell = 3
+        else:
+            cell = 0
+            while sample >= heights[cell + 1]:
+                cell += 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        for i in range(1, 4):
+            delta = self.desired[i] - positions[i]
+            if (delta >= 1 and positions[i + 1] - positions[i] > 1) or (delta <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if delta > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i, step):
+        n, q = self.positions, self.heights
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    def _linear(self, i, step):
+        n, q = self.positions, self.heights
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self):
+        if not self.heights:
+            return None
+        if self.count <= 5:
+            # Too few samples for the markers, fall back to the exact nearest-rank quantile
+            index = min(int(math.ceil(self.quantile * len(self.heights))) - 1, len(self.heights) - 1)
+            return self.heights[max(index, 0)]
+        return self.heights[2]
+
+class SlidingWindow:
+    """Time window split into a fixed ring of buckets tracking count, sum, min, max and matches."""
+
+    def __init__(self, window, buckets=60, predicate=None):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.buckets = buckets
+        self.width = window / buckets
+        self.predicate = predicate
+        self.slots = [[None, 0, 0.0, math.inf, -math.inf, 0] for _ in range(buckets)]
+        self.first_seen = None
+
+    def add(self, sample, timestamp):
+        if self.first_seen is None:
+            self.first_seen = timestamp
+        epoch = int(timestamp // self.width)
+        slot = self.slots[epoch % self.buckets]
+        if slot[0] != epoch:
+            slot[0], slot[1], slot[2], slot[3], slot[4], slot[5] = epoch, 0, 0.0, math.inf, -math.inf, 0
+        slot[1] += 1
+        slot[2] += sample
+        if sample < slot[3]:
+            slot[3] = sample
+        if sample > slot[4]:
+            slot[4] = sample
+        if self.predicate is not None and self.predicate(sample):
+            slot[5] += 1
+
+    def covered(self, timestamp):
+        """Return True once samples span the whole window."""
+        return self.first_seen is not None and timestamp - self.first_seen >= self.window
+
+    def summary(self, timestamp):
+        epoch = int(timestamp // self.width)
+        count, total, matches = 0, 0.0, 0
+        minimum, maximum = math.inf, -math.inf
+        for slot in self.slots:
+            if slot[0] is None or not 0 <= epoch - slot[0] < self.buckets:
+                continue
+            count += slot[1]
+            total += slot[2]
+            matches += slot[5]
+            minimum = min(minimum, slot[3])
+            maximum = max(maximum, slot[4])
+        if not count:
+            return {"count": 0, "mean": None, "min": None, "max": None, "matches": 0}
+        return {"count": count, "mean": total / count, "min": minimum, "max": maximum, "matches": matches}
+
+class StreamingStats:
+    """Constant-memory summary of one metric: last value, mean, EWMA, min/max and P² quantiles."""
+
+    def __init__(self, quantiles=(0.5, 0.95, 0.99), ewma_alpha=0.3, window=300):
+        self.count = 0
+        self.mean = 0.0
+        self.last = None
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.ewma = EWMA(ewma_alpha)
+        self.quantiles = {q: P2Quantile(q) for q in quantiles}
+        self.window = SlidingWindow(window)
+
+    def update(self, sample, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        self.count += 1
+        self.mean += (sample - self.mean) / self.count
+        self.last = sample
+        self.minimum = min(self.minimum, sample)
+        self.maximum = max(self.maximum, sample)
+        self.ewma.update(sample)
+        for estimator in self.quantiles.values():
+            estimator.update(sample)
+        self.window.add(sample, timestamp)
+
+    def quantile(self, q):
+        if q not in self.quantiles:
+            raise KeyError(f"Quantile {q} is not tracked")
+        return self.quantiles[q].value
+
+    def snapshot(self, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        windowed = self.window.summary(timestamp)
+        snapshot = {
+            "count": self.count,
+            "last": self.last,
+            "mean": self.mean if self.count else None,
+            "ewma": self.ewma.value,
+            "min": self.minimum if self.count else None,
+            "max": self.maximum if self.count else None,
+            "window_min": windowed["min"],
+            "window_max": windowed["max"],
+        }
+        for q, estimator in self.quantiles.items():
+            snapshot[f"p{q * 100:g}"] = estimator.value
+        return snapshot
+
+class ThresholdRule:
+    """Declarative threshold rule such as 'p95 cpu > 90% for 5m'."""
+
+    def __init__(self, metric, stat, op, threshold, duration=0, name=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported operator: {op}")
+        self.metric = metric
+        self.stat = stat.lower()
+        self.op = op
+        self.threshold = threshold
+        self.duration = duration
+        self.name = name or f"{self.stat} {metric} {op} {threshold:g}" + (f" for {duration:g}s" if duration else "")
+        self.compare = OPERATORS[op]
+        self.quantile = float(self.stat[1:]) / 100 if self.stat.startswith("p") else None
+        if self.quantile is not None and not 0 < self.quantile < 1:
+            raise ValueError(f"Quantile {self.stat} is out of range, use min or max for the extremes")
+        if self.quantile is not None and op == "==":
+            raise ValueError("Quantile rules need an ordering operator")
+
+        # Windowed aggregates evaluate over the rule duration, instantaneous
+        # stats (value, ewma) must hold continuously for the duration.
+        self.windowed = duration > 0 and self.stat not in ("value", "ewma")
+        self.window = SlidingWindow(duration, predicate=lambda v: self.compare(v, threshold)) if self.windowed else None
+        self.pending_since = None
+        self.firing = False
+
+    @classmethod
+    def parse(cls, expression, name=None):
+        match = RULE_PATTERN.match(expression)
+        if not match:
+            raise ValueError(f"Invalid rule: {expression!r}")
+        duration = parse_duration(match["duration"]) if match["duration"] else 0
+        return cls(match["metric"], match["stat"], match["op"], float(match["threshold"]), duration, name)
+
+    def _observed(self, stats, timestamp):
+        """Return (observed value, condition) for the rule's statistic."""
+        if self.windowed:
+            summary = self.window.summary(timestamp)
+            if not summary["count"] or not self.window.covered(timestamp):
+                return None, False
+            if self.quantile is not None:
+                # p_q > T exactly when more than (1 - q) of the window lies above T,
+                # so the observed value reported is that fraction rather than p_q itself
+                fraction = summary["matches"] / summary["count"]
+                met = fraction > 1 - self.quantile if self.op in (">", ">=") else fraction >= self.quantile
+                return fraction, met
+            observed = summary["mean"] if self.stat in ("avg", "mean") else summary[self.stat]
+            return observed, self.compare(observed, self.threshold)
+
+        if self.stat == "value":
+            observed = stats.last
+        elif self.stat == "ewma":
+            observed = stats.ewma.value
+        elif self.stat in ("avg", "mean"):
+            observed = stats.mean
+        elif self.stat == "min":
+            observed = stats.minimum
+        elif self.stat == "max":
+            observed = stats.maximum
+        else:
+            estimator = stats.quantiles.get(self.quantile)
+            if estimator is None:
+                estimator = stats.quantiles[self.quantile] = P2Quantile(self.quantile)
+                estimator.update(stats.last)
+            observed = estimator.value
+        return observed, observed is not None and self.compare(observed, self.threshold)
+
+    def evaluate(self, sample, stats, timestamp):
+        """Feed one sample and return an alert event when the rule changes state."""
+        if self.window is not None:
+            self.window.add(sample, timestamp)
+
+        observed, met = self._observed(stats, timestamp)
+
+        if met and not self.windowed and self.duration:
+            if self.pending_since is None:
+                self.pending_since = timestamp
+            met = timestamp - self.pending_since >= self.duration
+        elif not met:
+            self.pending_since = None
+
+        if met == self.firing:
+            return None
+        self.firing = met
+        return {
+            "rule": self.name,
+            "metric": self.metric,
+            "state": "firing" if met else "resolved",
+            "observed": observed,
+            # Windowed quantile rules observe the fraction of the window meeting the threshold
+            "observed_kind": "fraction" if self.windowed and self.quantile is not None else "value",
+            "threshold": self.threshold,
+            "timestamp": timestamp,
+        }
+
+class AlertEngine:
+    """Feeds samples through per-metric streaming stats and evaluates threshold rules as they arrive."""
+
+    def __init__(self, rules=(), on_alert=None, ewma_alpha=0.3):
+        self.rules = [ThresholdRule.parse(rule) if isinstance(rule, str) else rule for rule in rules]
+        self.on_alert = on_alert
+        self.ewma_alpha = ewma_alpha
+        self.stats = {}
+
+    def add_rule(self, rule):
+        self.rules.append(ThresholdRule.parse(rule) if isinstance(rule, str) else rule)
+
+    def observe(self, metric, sample, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        stats = self.stats.get(metric)
+        if stats is None:
+            stats = self.stats[metric] = StreamingStats(ewma_alpha=self.ewma_alpha)
+        stats.update(sample, timestamp)
+
+        events = []
+        for rule in self.rules:
+            if rule.metric != metric:
+                continue
+            event = rule.evaluate(sample, stats, timestamp)
+            if event:
+                events.append(event)
+                if self.on_alert:
+                    self.on_alert(event)
+        return events
+
+    def observe_many(self, samples, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        events = []
+        for metric, sample in samples.items():
+            events.extend(self.observe(metric, sample, timestamp))
+        return events
+
+    def snapshot(self, timestamp=None):
+        return {metric: stats.snapshot(timestamp) for metric, stats in self.stats.items()}
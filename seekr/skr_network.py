@@ -1,5 +1,5 @@
 import socket
-import ssl
+import time
 import asyncio
 import ipaddress
 import psutil
@@ -8,7 +8,18 @@ from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress
 from scapy.all import ARP, Ether, srp
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from skr_synscan import fast_scan_hosts
+from skr_governor import get_governor
+from skr_profile import profiled
+from skr_fingerprint import fingerprint_port, fingerprint_services
+from skr_ports import PortBitmap, compare_port_scans, parse_port_spec
+from skr_records import Device
+from skr_events import event_bus
+from skr_inventory import FULL_SWEEP_TTL
+from skr_discovery import async_sweep_network, interface_network
+from skr_utils import is_admin
+from skr_sockdiag import collect_sockets, display_socket_summary
+from skr_tls import get_tls_context, peer_certificates, summarize_certificate
 import speedtest
 
 console = Console()
@@ -37,13 +48,12 @@ def get_network_range(local_ip):
     if not local_ip:
         return None
     try:
-        return str(ipaddress.ip_network(f"{local_ip}/24", strict=False))
+        return str(interface_network(local_ip))
     except ValueError as e:
         console.print(f"[bold red]Error getting network range: {e}[/bold red]")
         return None
 
 async def async_scan_network(target_ip):
-    loop = asyncio.get_running_loop()
     arp = ARP(pdst=target_ip)
     ether = Ether(dst="ff:ff:ff:ff:ff:ff")
     packet = ether/arp
@@ -52,14 +62,28 @@ async def async_scan_network(target_ip):
         return srp(packet, timeout=3, verbose=0)[0]
 
     with console.status("[bold cyan]Sending ARP requests to discover devices...[/bold cyan]"):
-        result = await loop.run_in_executor(None, send_packet)
+        result = await get_governor().run_in_thread(send_packet)
     
-    devices = [{'ip': received.psrc, 'mac': received.hwsrc} for sent, received in result]
+    devices = [Device(received.psrc, received.hwsrc, "arp") for sent, received in result]
 
     if not devices:
         console.print("[bold yellow]No devices found. Check your network settings and try again.[/bold yellow]")
     return devices
 
+async def find_devices(network_range, method="auto"):
+    """Discover devices with an ARP broadcast ('arp') or a TCP/ICMP sweep ('sweep').
+
+    'auto' uses ARP only when running as root on a network attached to a
+    local interface, where it also yields MAC addresses, and sweeps otherwise.
+    """
+    if method == "auto":
+        local_ip = get_local_ip()
+        attached = local_ip is not None and ipaddress.ip_network(network_range, strict=False).overlaps(interface_network(local_ip))
+        method = "arp" if is_admin() and attached else "sweep"
+    if method == "arp":
+        return await async_scan_network(network_range)
+    return await async_sweep_network(network_range)
+
 def display_devices(devices):
     table = Table(title="Available Devices")
     table.add_column("Index", justify="right", style="cyan", no_wrap=True)
@@ -67,10 +91,11 @@ def display_devices(devices):
     table.add_column("MAC Address", style="green")
 
     for index, device in enumerate(devices):
-        table.add_row(str(index + 1), device['ip'], device['mac'])
+        table.add_row(str(index + 1), device.ip, device.mac or "Unknown")
 
     console.print(table)
 
+@profiled()
 def scan_port(target, port):
     sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     sock.settimeout(0.5)
@@ -78,22 +103,28 @@ def scan_port(target, port):
     sock.close()
     return port if result == 0 else None
 
+async def async_scan_ports(target, port_range=(1, 1000)):
+    """Open ports on `target`, or None if the scan failed and nothing is known."""
+    try:
+        ports = parse_port_spec(port_range)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return None
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Scanning {target}", total=len(ports))
+        try:
+            open_ports = []
+            async for _, found, error in fast_scan_hosts([target], ports, progress=task.advance):
+                if error:
+                    raise error
+                open_ports = found.to_list()
+            return open_ports
+        except OSError as e:
+            console.print(f"[bold red]An error occurred while scanning {target}: {str(e)}[/bold red]")
+            return None
+
 def check_open_ports(target, port_range=(1, 1000)):
-    open_ports = []
-    with ThreadPoolExecutor(max_workers=100) as executor:
-        future_to_port = {executor.submit(scan_port, target, port): port for port in range(port_range[0], port_range[1] + 1)}
-        with Progress() as progress:
-            task = progress.add_task(f"[cyan]Scanning {target}", total=port_range[1] - port_range[0] + 1)
-            for future in as_completed(future_to_port):
-                port = future_to_port[future]
-                try:
-                    result = future.result()
-                    if result:
-                        open_ports.append(result)
-                    progress.update(task, advance=1, description=f"[cyan]Scanning {target} - Port {port}")
-                except Exception as e:
-                    console.print(f"[bold red]An error occurred while scanning port {port}: {str(e)}[/bold red]")
-    return open_ports
+    return asyncio.run(async_scan_ports(target, port_range))
 
 def get_service_name(port):
     try:
@@ -103,16 +134,15 @@ def get_service_name(port):
 
 def get_ssl_info(ip, port):
     try:
-        context = ssl.create_default_context()
         with socket.create_connection((ip, port), timeout=3) as sock:
-            with context.wrap_socket(sock, server_hostname=ip) as secure_sock:
-                cert = secure_sock.getpeercert()
-                return {
-                    "Issuer": dict(x[0] for x in cert['issuer']),
-                    "Subject": dict(x[0] for x in cert['subject']),
-                    "Version": cert['version'],
-                    "Serial Number": cert['serialNumber'],
-                }
+            with get_tls_context().wrap_socket(sock) as secure_sock:
+                chain = peer_certificates(secure_sock)
+                if not chain:
+                    return "SSL Error: no certificate presented"
+                info = summarize_certificate(chain[0])
+                info["Version"] = secure_sock.version()
+                info["Cipher"] = secure_sock.cipher()[0]
+                return info
     except Exception as e:
         return f"SSL Error: {str(e)}"
 
@@ -128,75 +158,157 @@ def get_http_info(ip, port):
     except requests.RequestException as e:
         return f"HTTP Error: {str(e)}"
 
+@profiled()
 def analyze_port(ip, port):
-    service_name = get_service_name(port)
-    result = {
-        "Port": port,
-        "Service": service_name,
-        "SSL Info": None,
-        "HTTP Info": None,
-    }
+    return asyncio.run(fingerprint_port(ip, port))[1]
 
-    if service_name in ['https', 'ssl']:
-        result["SSL Info"] = get_ssl_info(ip, port)
+async def async_closer_look(targets):
+    """Fingerprint the open ports of several hosts in one pipeline; `targets` maps ip -> ports."""
+    pairs = [(ip, port) for ip, ports in targets.items() for port in ports]
+    if len(targets) == 1:
+        console.print(f"\n[bold cyan]Performing a closer look at open ports on {next(iter(targets))}...[/bold cyan]")
+    else:
+        console.print(f"\n[bold cyan]Performing a closer look at {len(pairs)} open ports on {len(targets)} devices...[/bold cyan]")
 
-    if service_name in ['http', 'https']:
-        result["HTTP Info"] = get_http_info(ip, port)
+    results = {ip: [] for ip in targets}
+    with event_bus() as bus:
+        task = bus.add_task("[cyan]Analyzing ports...", total=len(pairs))
+        async for ip, result in fingerprint_services(pairs, progress=task.advance):
+            results[ip].append(result)
 
-    return result
+    for ip, host_results in results.items():
+        display_analysis_results(sorted(host_results, key=lambda result: result.port), ip)
 
 def closer_look(ip, open_ports):
-    console.print(f"\n[bold cyan]Performing a closer look at open ports on {ip}...[/bold cyan]")
-    results = []
+    asyncio.run(async_closer_look({ip: open_ports}))
 
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Analyzing ports...", total=len(open_ports))
-        
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_port = {executor.submit(analyze_port, ip, port): port for port in open_ports}
-            for future in as_completed(future_to_port):
-                port = future_to_port[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    console.print(f"[bold red]An error occurred while analyzing port {port}: {str(e)}[/bold red]")
-                progress.update(task, advance=1)
-
-    display_analysis_results(results)
-
-def display_analysis_results(results):
-    table = Table(title="Port Analysis Results")
+def display_analysis_results(results, ip=None):
+    table = Table(title=f"Port Analysis Results for {ip}" if ip else "Port Analysis Results")
     table.add_column("Port", style="cyan")
     table.add_column("Service", style="magenta")
+    table.add_column("Banner", style="blue")
     table.add_column("SSL Info", style="green")
     table.add_column("HTTP Info", style="yellow")
 
     for result in results:
-        ssl_info = str(result["SSL Info"]) if result["SSL Info"] else "N/A"
-        http_info = str(result["HTTP Info"]) if result["HTTP Info"] else "N/A"
+        ssl_info = str(result.ssl_info) if result.ssl_info else "N/A"
+        http_info = str(result.http_info) if result.http_info else "N/A"
         table.add_row(
-            str(result["Port"]),
-            result["Service"],
+            str(result.port),
+            result.service,
+            result.banner or "N/A",
             ssl_info,
             http_info
         )
 
     console.print(table)
 
-async def scan_single_device(target):
+async def scan_single_device(target, port_range=(1, 1000), inventory=None):
+    try:
+        ports = parse_port_spec(port_range)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return
+
     console.print(f"\n[bold cyan]Scanning {target}...[/bold cyan]")
-    open_ports = check_open_ports(target)
+    open_ports = await async_scan_ports(target, ports)
+    if open_ports is None:
+        return
+    if inventory is not None:
+        inventory.record_ports(target, open_ports, ports)
 
     if open_ports:
         console.print(f"\n[bold green]Open ports on {target}:[/bold green] {sorted(open_ports)}")
-        closer_look(target, open_ports)
+        await async_closer_look({target: open_ports})
     else:
         console.print("\n[bold yellow]No open ports found.[/bold yellow]")
 
-async def scan_all_devices(devices):
-    for device in devices:
-        await scan_single_device(device['ip'])
+async def sweep_ports(targets, ports, inventory=None):
+    """Scan ports on many hosts at once, printing (and recording) each host as it finishes."""
+    results = {}
+    with event_bus() as bus:
+        task = bus.add_task("[cyan]Scanning devices", total=len(targets) * len(ports))
+        async for target, open_ports, error in fast_scan_hosts(targets, ports, progress=task.advance):
+            if error:
+                bus.message(f"[bold red]An error occurred while scanning {target}: {str(error)}[/bold red]")
+                continue
+
+            if inventory is not None:
+                opened, closed, _ = compare_port_scans(inventory.open_ports(target) & PortBitmap(ports), open_ports)
+                inventory.record_ports(target, open_ports, ports)
+                if opened:
+                    bus.message(f"[bold green]Newly open on {target}:[/bold green] {opened.to_list()}")
+                if closed:
+                    bus.message(f"[bold red]No longer open on {target}:[/bold red] {closed.to_list()}")
+
+            if open_ports:
+                bus.message(f"[bold green]Open ports on {target}:[/bold green] {open_ports.to_list()}")
+                results[target] = open_ports.to_list()
+            else:
+                bus.message(f"[bold yellow]No open ports found on {target}.[/bold yellow]")
+    return results
+
+async def scan_all_devices(devices, port_range=(1, 1000), inventory=None):
+    targets = [device.ip for device in devices]
+    try:
+        ports = parse_port_spec(port_range)
+    except ValueError as e:
+        console.print(f"[bold red]{str(e)}[/bold red]")
+        return
+
+    console.print(f"\n[bold cyan]Scanning {len(targets)} devices...[/bold cyan]")
+    results = await sweep_ports(targets, ports, inventory)
+
+    if results:
+        await async_closer_look(results)
+
+async def discover_devices(network_range, inventory=None, ttl=FULL_SWEEP_TTL):
+    """Return devices on a network, from the inventory when its last discovery sweep is fresh."""
+    if inventory is not None and not inventory.needs_sweep(network_range, "discovery", ttl):
+        devices = inventory.device_records(network_range)
+        if devices:
+            age = time.time() - inventory.last_sweep(network_range, "discovery")
+            console.print(f"[bold cyan]Loaded {len(devices)} devices from inventory (swept {age / 60:.0f} min ago).[/bold cyan]")
+            return devices
+
+    devices = await find_devices(network_range)
+    if inventory is not None and devices:
+        inventory.record_devices(devices)
+        inventory.mark_sweep(network_range, "discovery")
+    return devices
+
+async def delta_rescan(inventory, network_range, port_range=(1, 1000), ttl=FULL_SWEEP_TTL):
+    """Re-probe known-open ports and scan only never-scanned hosts, with a full sweep once the TTL expires."""
+    ports = parse_port_spec(port_range)
+
+    if inventory.needs_sweep(network_range, "full", ttl):
+        console.print("[bold cyan]Inventory is older than the full sweep TTL, running a full sweep...[/bold cyan]")
+        devices = await find_devices(network_range)
+        inventory.record_devices(devices)
+        inventory.mark_sweep(network_range, "discovery")
+        if devices:
+            await sweep_ports([device.ip for device in devices], ports, inventory)
+        inventory.mark_sweep(network_range, "full")
+        return inventory.device_records(network_range)
+
+    known = inventory.devices(network_range)
+    scanned = [device['ip'] for device in known if device['last_port_scan']]
+    unscanned = [device['ip'] for device in known if not device['last_port_scan']]
+
+    known_ports = PortBitmap()
+    for ip in scanned:
+        known_ports |= inventory.open_ports(ip)
+
+    if scanned and known_ports:
+        console.print(f"[bold cyan]Re-probing {len(known_ports)} known-open ports on {len(scanned)} devices...[/bold cyan]")
+        await sweep_ports(scanned, known_ports.to_list(), inventory)
+    if unscanned:
+        console.print(f"[bold cyan]Scanning {len(unscanned)} newly seen devices...[/bold cyan]")
+        await sweep_ports(unscanned, ports, inventory)
+    if not (scanned and known_ports) and not unscanned:
+        console.print("[bold yellow]Nothing to re-probe; no known open ports or new devices.[/bold yellow]")
+
+    return inventory.device_records(network_range)
 
 def network_speed_test():
     console.print("[cyan]Performing network speed test...[/cyan]")
@@ -223,26 +335,9 @@ def network_speed_test():
 
     console.print(table)
 
-def analyze_network_connections():
-    connections = psutil.net_connections()
-    
-    table = Table(title="Current Network Connections")
-    table.add_column("Local Address", style="cyan")
-    table.add_column("Local Port", style="magenta")
-    table.add_column("Remote Address", style="green")
-    table.add_column("Remote Port", style="yellow")
-    table.add_column("Status", style="blue")
-
-    for conn in connections:
-        if conn.laddr and conn.raddr:
-            table.add_row(
-                conn.laddr.ip,
-                str(conn.laddr.port),
-                conn.raddr.ip,
-                str(conn.raddr.port),
-                conn.status
-            )
-
-    console.print(table)
+def analyze_network_connections(top=10, with_process=True):
+    """Summarise all TCP/UDP sockets by remote subnet, local port, state and owning process."""
+    table = collect_sockets("inet", with_process=with_process)
+    display_socket_summary(table, top=top)
 
 # Additional network-related functions can be added here as needed
\ No newline at end of file
@@ -8,6 +8,10 @@ import base64
 from rich.console import Console
 from rich.table import Table
 from rich.progress import Progress
+from rich.live import Live
+from skr_metrics import AlertEngine
+from skr_procfs import collect_processes, cpu_percentages
+from skr_profile import profiled
 
 console = Console()
 
@@ -143,27 +147,100 @@ def generate_resource_usage_graph(duration=60, interval=1):
     console.print("[green]Resource usage graph generated.[/green]")
     console.print(f"[cyan]Graph data (base64):[/cyan] {img_base64}")
 
-def analyze_disk_io():
-    """Analyze and display disk I/O statistics."""
-    io_counters = psutil.disk_io_counters()
-
-    disk_io_info = {
-        "Read count": io_counters.read_count,
-        "Write count": io_counters.write_count,
-        "Read bytes": f"{io_counters.read_bytes / (1024**3):.2f} GB",
-        "Write bytes": f"{io_counters.write_bytes / (1024**3):.2f} GB",
-        "Read time": f"{io_counters.read_time} ms",
-        "Write time": f"{io_counters.write_time} ms",
-    }
-
-    table = Table(title="Disk I/O Statistics")
-    table.add_column("Property", style="cyan")
-    table.add_column("Value", style="magenta")
+def get_disk_io_rates(before, after, elapsed):
+    """Compute per-disk IOPS, throughput, await and utilization from two counter snapshots."""
+    rates = {}
+    if elapsed <= 0:
+        return rates
+
+    for disk, new in after.items():
+        old = before.get(disk)
+        if old is None:
+            continue
+
+        reads = max(new.read_count - old.read_count, 0)
+        writes = max(new.write_count - old.write_count, 0)
+        io_time = max((new.read_time - old.read_time) + (new.write_time - old.write_time), 0)
+        ops = reads + writes
+
+        # busy_time is only reported on Linux and FreeBSD
+        if hasattr(new, "busy_time"):
+            busy = max(new.busy_time - old.busy_time, 0)
+            utilization = min(busy / (elapsed * 1000) * 100, 100.0)
+        else:
+            utilization = None
+
+        rates[disk] = {
+            "read_iops": reads / elapsed,
+            "write_iops": writes / elapsed,
+            "read_bps": max(new.read_bytes - old.read_bytes, 0) / elapsed,
+            "write_bps": max(new.write_bytes - old.write_bytes, 0) / elapsed,
+            "await_ms": io_time / ops if ops else 0.0,
+            "utilization": utilization,
+        }
+    return rates
+
+def sample_disk_io(interval=1):
+    """Sample per-disk I/O counters over an interval and return their rates."""
+    before = psutil.disk_io_counters(perdisk=True) or {}
+    start = time.monotonic()
+    time.sleep(interval)
+    after = psutil.disk_io_counters(perdisk=True) or {}
+    return get_disk_io_rates(before, after, time.monotonic() - start)
+
+def build_disk_io_table(rates, interval=1):
+    """Build a table of per-disk I/O rates, busiest devices first."""
+    table = Table(title=f"Disk I/O Rates ({interval}s window)")
+    table.add_column("Disk", style="cyan")
+    table.add_column("Read IOPS", justify="right", style="magenta")
+    table.add_column("Write IOPS", justify="right", style="magenta")
+    table.add_column("Read MB/s", justify="right", style="green")
+    table.add_column("Write MB/s", justify="right", style="green")
+    table.add_column("Await (ms)", justify="right", style="yellow")
+    table.add_column("Util (%)", justify="right", style="red")
+
+    def load(item):
+        stats = item[1]
+        return (stats["utilization"] or 0, stats["read_iops"] + stats["write_iops"])
+
+    for disk, stats in sorted(rates.items(), key=load, reverse=True):
+        utilization = stats["utilization"]
+        table.add_row(
+            disk,
+            f"{stats['read_iops']:.1f}",
+            f"{stats['write_iops']:.1f}",
+            f"{stats['read_bps'] / (1024**2):.2f}",
+            f"{stats['write_bps'] / (1024**2):.2f}",
+            f"{stats['await_ms']:.2f}",
+            f"{utilization:.1f}%" if utilization is not None else "N/A",
+        )
+
+    return table
+
+def analyze_disk_io(interval=1, live=False, duration=None):
+    """Analyze and display per-disk I/O rates, optionally refreshing live."""
+    before = psutil.disk_io_counters(perdisk=True)
+    if not before:
+        console.print("[yellow]Disk I/O counters not available on this system.[/yellow]")
+        return
 
-    for key, value in disk_io_info.items():
-        table.add_row(key, str(value))
+    if not live:
+        with console.status("[cyan]Sampling disk I/O...", spinner="dots"):
+            rates = sample_disk_io(interval)
+        console.print(build_disk_io_table(rates, interval))
+        return
 
-    console.print(table)
+    start = last = time.monotonic()
+    try:
+        with Live(build_disk_io_table({}, interval), console=console, auto_refresh=False) as live_view:
+            while duration is None or time.monotonic() - start < duration:
+                time.sleep(interval)
+                after = psutil.disk_io_counters(perdisk=True) or {}
+                now = time.monotonic()
+                live_view.update(build_disk_io_table(get_disk_io_rates(before, after, now - last), interval), refresh=True)
+                before, last = after, now
+    except KeyboardInterrupt:
+        pass
 
 def analyze_battery():
     """Analyze and display battery information if available."""
@@ -191,28 +268,202 @@ def analyze_battery():
 
     console.print(table)
 
-def analyze_network_usage():
-    """Analyze and display network usage statistics."""
-    net_io = psutil.net_io_counters()
-
-    net_info = {
-        "Bytes sent": f"{net_io.bytes_sent / (1024**3):.2f} GB",
-        "Bytes received": f"{net_io.bytes_recv / (1024**3):.2f} GB",
-        "Packets sent": net_io.packets_sent,
-        "Packets received": net_io.packets_recv,
-        "Error in": net_io.errin,
-        "Error out": net_io.errout,
-        "Drop in": net_io.dropin,
-        "Drop out": net_io.dropout,
-    }
-
-    table = Table(title="Network Usage Statistics")
-    table.add_column("Property", style="cyan")
-    table.add_column("Value", style="magenta")
+def get_network_rates(before, after, elapsed, if_stats=None):
+    """Compute per-interface bit, packet, error and drop rates from two counter snapshots."""
+    rates = {}
+    if elapsed <= 0:
+        return rates
+    if_stats = if_stats or {}
+
+    def rate(new, old, field):
+        return max(getattr(new, field) - getattr(old, field), 0) / elapsed
+
+    for nic, new in after.items():
+        old = before.get(nic)
+        if old is None:
+            continue
+
+        rx_bps = rate(new, old, "bytes_recv") * 8
+        tx_bps = rate(new, old, "bytes_sent") * 8
+
+        # net_if_stats reports link speed in Mbps, 0 when unknown (loopback, virtual links)
+        stats = if_stats.get(nic)
+        speed_bps = stats.speed * 1_000_000 if stats and stats.speed else 0
+        utilization = max(rx_bps, tx_bps) / speed_bps * 100 if speed_bps else None
+
+        rates[nic] = {
+            "rx_bps": rx_bps,
+            "tx_bps": tx_bps,
+            "rx_pps": rate(new, old, "packets_recv"),
+            "tx_pps": rate(new, old, "packets_sent"),
+            "err_ps": rate(new, old, "errin") + rate(new, old, "errout"),
+            "drop_ps": rate(new, old, "dropin") + rate(new, old, "dropout"),
+            "speed_mbps": stats.speed if stats else 0,
+            "utilization": utilization,
+        }
+    return rates
+
+def sample_network_usage(interval=1):
+    """Sample per-interface network counters over an interval and return their rates."""
+    before = psutil.net_io_counters(pernic=True)
+    start = time.monotonic()
+    time.sleep(interval)
+    after = psutil.net_io_counters(pernic=True)
+    return get_network_rates(before, after, time.monotonic() - start, psutil.net_if_stats())
+
+def format_bitrate(bps):
+    """Format a bit rate using decimal network units."""
+    for unit in ("bps", "Kbps", "Mbps", "Gbps"):
+        if bps < 1000:
+            return f"{bps:.1f} {unit}"
+        bps /= 1000
+    return f"{bps:.1f} Tbps"
+
+def build_network_table(rates, interval=1, saturation_threshold=80):
+    """Build a table of per-interface network rates, flagging saturated links."""
+    table = Table(title=f"Network Interface Rates ({interval}s window)")
+    table.add_column("Interface", style="cyan")
+    table.add_column("RX", justify="right", style="green")
+    table.add_column("TX", justify="right", style="green")
+    table.add_column("RX pkt/s", justify="right", style="magenta")
+    table.add_column("TX pkt/s", justify="right", style="magenta")
+    table.add_column("Err/s", justify="right", style="red")
+    table.add_column("Drop/s", justify="right", style="red")
+    table.add_column("Link", justify="right", style="blue")
+    table.add_column("Util (%)", justify="right", style="yellow")
+
+    def load(item):
+        stats = item[1]
+        return (stats["utilization"] or 0, stats["rx_bps"] + stats["tx_bps"])
+
+    for nic, stats in sorted(rates.items(), key=load, reverse=True):
+        utilization = stats["utilization"]
+        if utilization is None:
+            util_text = "N/A"
+        elif utilization >= saturation_threshold:
+            util_text = f"[bold red]{utilization:.1f}% SATURATED[/bold red]"
+        else:
+            util_text = f"{utilization:.1f}%"
+
+        table.add_row(
+            nic,
+            format_bitrate(stats["rx_bps"]),
+            format_bitrate(stats["tx_bps"]),
+            f"{stats['rx_pps']:.0f}",
+            f"{stats['tx_pps']:.0f}",
+            f"{stats['err_ps']:.1f}",
+            f"{stats['drop_ps']:.1f}",
+            f"{stats['speed_mbps']} Mbps" if stats["speed_mbps"] else "N/A",
+            util_text,
+        )
+
+    return table
+
+def analyze_network_usage(interval=1, live=False, duration=None, saturation_threshold=80):
+    """Analyze and display per-interface network rates, optionally refreshing live."""
+    if not live:
+        with console.status("[cyan]Sampling network interfaces...", spinner="dots"):
+            rates = sample_network_usage(interval)
+        console.print(build_network_table(rates, interval, saturation_threshold))
+        return
 
-    for key, value in net_info.items():
-        table.add_row(key, str(value))
+    before = psutil.net_io_counters(pernic=True)
+    start = last = time.monotonic()
+    try:
+        with Live(build_network_table({}, interval), console=console, auto_refresh=False) as live_view:
+            while duration is None or time.monotonic() - start < duration:
+                time.sleep(interval)
+                after = psutil.net_io_counters(pernic=True)
+                now = time.monotonic()
+                rates = get_network_rates(before, after, now - last, psutil.net_if_stats())
+                live_view.update(build_network_table(rates, interval, saturation_threshold), refresh=True)
+                before, last = after, now
+    except KeyboardInterrupt:
+        pass
+
+def analyze_process_summary(interval=1, limit=10):
+    """Summarize process states and thread counts and show the heaviest processes."""
+    before = collect_processes()
+    time.sleep(interval)
+    processes = collect_processes()
+    cpu = cpu_percentages(before, processes)
+
+    states = {}
+    for state in processes.states:
+        states[state] = states.get(state, 0) + 1
+
+    summary = Table(title="Process Summary")
+    summary.add_column("Property", style="cyan")
+    summary.add_column("Value", style="magenta")
+    summary.add_row("Processes", str(len(processes)))
+    summary.add_row("Threads", str(sum(processes.threads)))
+    for state, count in sorted(states.items(), key=lambda x: x[1], reverse=True):
+        summary.add_row(f"State: {state}", str(count))
+    console.print(summary)
+
+    heaviest = sorted(range(len(processes)), key=lambda i: (cpu[i], processes.rss[i]), reverse=True)[:limit]
+
+    table = Table(title=f"Top {limit} Processes")
+    table.add_column("PID", style="cyan")
+    table.add_column("Name", style="magenta")
+    table.add_column("Threads", justify="right", style="blue")
+    table.add_column("CPU %", justify="right", style="green")
+    table.add_column("RSS (MB)", justify="right", style="yellow")
+
+    for i in heaviest:
+        table.add_row(
+            str(processes.pids[i]),
+            processes.names[i],
+            str(processes.threads[i]),
+            f"{cpu[i]:.2f}%",
+            f"{processes.rss[i] / (1024**2):.2f}",
+        )
 
     console.print(table)
 
-# Additional performance-related functions can be added here as needed
\ No newline at end of file
+@profiled()
+def collect_resource_sample():
+    """Collect one sample of the headline resource metrics as percentages."""
+    return {
+        "cpu": psutil.cpu_percent(),
+        "memory": psutil.virtual_memory().percent,
+        "swap": psutil.swap_memory().percent,
+        "disk": psutil.disk_usage('/').percent,
+    }
+
+def monitor_resources(rules=(), duration=None, interval=1):
+    """Stream resource samples through constant-memory statistics and evaluate alert rules."""
+    def report(event):
+        style = "bold red" if event["state"] == "firing" else "bold green"
+        observed = event["observed"]
+        if observed is None:
+            detail = "observed n/a"  # e.g. a windowed rule resolving after a gap in samples
+        elif event["observed_kind"] == "fraction":
+            detail = f"{observed:.0%} of samples met the threshold"
+        else:
+            detail = f"observed {observed:.2f}"
+        console.print(f"[{style}]ALERT {event['state'].upper()}:[/{style}] {event['rule']} ({detail})")
+
+    engine = AlertEngine(rules, on_alert=report)
+    psutil.cpu_percent()  # prime the CPU counter so the first sample is meaningful
+
+    start = time.monotonic()
+    try:
+        with console.status("[cyan]Monitoring resources (Ctrl+C to stop)...", spinner="dots"):
+            while duration is None or time.monotonic() - start < duration:
+                time.sleep(interval)
+                engine.observe_many(collect_resource_sample())
+    except KeyboardInterrupt:
+        pass
+
+    table = Table(title="Resource Usage Summary")
+    table.add_column("Metric", style="cyan")
+    for column in ("Last", "Mean", "EWMA", "Min", "Max", "p50", "p95", "p99"):
+        table.add_column(column, justify="right", style="magenta")
+
+    for metric, snapshot in engine.snapshot().items():
+        values = [snapshot[key] for key in ("last", "mean", "ewma", "min", "max", "p50", "p95", "p99")]
+        table.add_row(metric, *(f"{value:.2f}" if value is not None else "N/A" for value in values))
+
+    console.print(table)
+    return engine
@@ -0,0 +1,157 @@
+import re
+
+# Port specifications, probe ordering and compact per-host port sets.
+
+MAX_PORT = 65535
+
+# TCP ports ordered by how often they are found open in practice (after the
+# open-frequency column of nmap-services). Probing these first means the
+# interesting results of a long sweep arrive in the first second.
+TOP_PORTS = (
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080,
+    1723, 111, 995, 993, 5900, 1025, 587, 8888, 199, 1720, 465, 548, 113, 81,
+    6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000, 32768, 554, 26, 1433,
+    49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153,
+    8081, 2049, 88, 79, 5800, 106, 2121, 1110, 49155, 6000, 513, 990, 5357,
+    427, 49156, 543, 544, 5101, 144, 7, 389, 8009, 3128, 444, 9999, 5009, 7070,
+    5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646, 49157, 1028, 873,
+    1755, 2717, 4899, 9100, 119, 37, 6379, 9200, 11211, 27017, 5672, 2375,
+    6443, 9090, 9443, 5601, 8086, 15672, 2379, 10250,
+)
+
+PORT_SPEC_PATTERN = re.compile(r"^(\d+)?\s*-\s*(\d+)?$")
+
+def parse_port_spec(spec):
+    """Parse a spec like '22,80,8000-9000', '-1024' or 'all' into a sorted list of ports.
+
+    A (low, high) tuple is read as an inclusive range and any other
+    iterable as the ports themselves.
+    """
+    if isinstance(spec, tuple) and len(spec) == 2 and all(isinstance(p, int) for p in spec):
+        if not 1 <= spec[0] <= spec[1] <= MAX_PORT:
+            raise ValueError(f"Port range out of bounds: {spec!r}")
+        return list(range(spec[0], spec[1] + 1))
+    if not isinstance(spec, str):
+        ports = list(spec)
+        for port in ports:
+            if not isinstance(port, int) or not 1 <= port <= MAX_PORT:
+                raise ValueError(f"Port out of bounds: {port!r}")
+        return PortBitmap(ports).to_list()
+
+    ports = PortBitmap()
+    for part in str(spec).split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part in ("all", "*"):
+            part = f"1-{MAX_PORT}"
+        match = PORT_SPEC_PATTERN.match(part)
+        if match:
+            low = int(match.group(1) or 1)
+            high = int(match.group(2) or MAX_PORT)
+        elif part.isdigit():
+            low = high = int(part)
+        else:
+            raise ValueError(f"Invalid port specification: {part!r}")
+        if not 1 <= low <= high <= MAX_PORT:
+            raise ValueError(f"Port range out of bounds: {part!r}")
+        ports.add_range(low, high)
+
+    if not ports:
+        raise ValueError(f"Empty port specification: {spec!r}")
+    return ports.to_list()
+
+def format_port_spec(ports):
+    """Return the compact spec for a set of ports, e.g. '22,80,8000-9000' (the inverse of parse_port_spec)."""
+    parts = []
+    low = high = None
+    for port in PortBitmap(ports):
+        if high is not None and port == high + 1:
+            high = port
+            continue
+        if low is not None:
+            parts.append(str(low) if low == high else f"{low}-{high}")
+        low = high = port
+    if low is not None:
+        parts.append(str(low) if low == high else f"{low}-{high}")
+    return ",".join(parts)
+
+def frequency_order(ports):
+    """Return ports with the most commonly open ones first and the rest in numeric order."""
+    wanted = PortBitmap(ports)
+    first = [port for port in TOP_PORTS if port in wanted]
+    return first + list(wanted - PortBitmap(first))
+
+class PortBitmap:
+    """Set of TCP ports stored as the bits of one integer.
+
+    A host with a handful of open ports costs a few dozen bytes, and set
+    operations between two scans run on whole machine words.
+    """
+
+    __slots__ = ("bits",)
+
+    def __init__(self, ports=(), bits=0):
+        self.bits = bits
+        for port in ports:
+            self.bits |= 1 << port
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(bits=int.from_bytes(data, "little"))
+
+    def to_bytes(self):
+        return self.bits.to_bytes((self.bits.bit_length() + 7) // 8, "little")
+
+    def add(self, port):
+        self.bits |= 1 << port
+
+    def add_range(self, low, high):
+        self.bits |= ((1 << (high - low + 1)) - 1) << low
+
+    def discard(self, port):
+        self.bits &= ~(1 << port)
+
+    def to_list(self):
+        return list(self)
+
+    def __contains__(self, port):
+        return port >= 0 and (self.bits >> port) & 1 == 1
+
+    def __iter__(self):
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            yield lowest.bit_length() - 1
+            bits ^= lowest
+
+    def __len__(self):
+        return self.bits.bit_count()
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def __eq__(self, other):
+        return isinstance(other, PortBitmap) and self.bits == other.bits
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __and__(self, other):
+        return PortBitmap(bits=self.bits & other.bits)
+
+    def __or__(self, other):
+        return PortBitmap(bits=self.bits | other.bits)
+
+    def __sub__(self, other):
+        return PortBitmap(bits=self.bits & ~other.bits)
+
+    def __xor__(self, other):
+        return PortBitmap(bits=self.bits ^ other.bits)
+
+    def __repr__(self):
+        return f"PortBitmap({self.to_list()})"
+
+def compare_port_scans(before, after):
+    """Return (newly_open, newly_closed, unchanged) bitmaps between two scans of a host."""
+    return after - before, before - after, before & after
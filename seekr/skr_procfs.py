@@ -0,0 +1,218 @@
+import os
+import sys
+import time
+from array import array
+import psutil
+from rich.console import Console
+from rich.table import Table
+from skr_profile import profiled
+
+console = Console()
+
+# Bulk process enumeration. On Linux the collector reads /proc/[pid]/stat and
+# statm directly into one reused buffer and parses them into column arrays,
+# which avoids building a psutil.Process object per pid. Other platforms use
+# psutil and fill the same columns.
+
+PROC_FAST_PATH = sys.platform.startswith("linux") and os.path.isdir("/proc/self")
+
+if PROC_FAST_PATH:
+    CLK_TCK = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+STATE_NAMES = {
+    "R": "running", "S": "sleeping", "D": "disk-sleep", "Z": "zombie",
+    "T": "stopped", "t": "tracing-stop", "X": "dead", "I": "idle",
+    "W": "waking", "P": "parked", "K": "wake-kill",
+}
+
+class ProcessTable:
+    """Column-oriented snapshot of the process table."""
+
+    def __init__(self):
+        self.pids = array("l")
+        self.ppids = array("l")
+        self.names = []
+        self.states = []
+        self.threads = array("l")
+        self.cpu_time = array("d")   # user + system seconds
+        self.start_time = array("d")  # only used to tell reused pids apart
+        self.rss = array("Q")
+        self.vms = array("Q")
+        self.timestamp = time.monotonic()
+
+    def __len__(self):
+        return len(self.pids)
+
+    def append(self, pid, ppid, name, state, threads, cpu_time, start_time, rss, vms):
+        self.pids.append(pid)
+        self.ppids.append(ppid)
+        self.names.append(name)
+        self.states.append(state)
+        self.threads.append(threads)
+        self.cpu_time.append(cpu_time)
+        self.start_time.append(start_time)
+        self.rss.append(rss)
+        self.vms.append(vms)
+
+    def row(self, index):
+        return {
+            "pid": self.pids[index],
+            "ppid": self.ppids[index],
+            "name": self.names[index],
+            "status": self.states[index],
+            "num_threads": self.threads[index],
+            "cpu_time": self.cpu_time[index],
+            "rss": self.rss[index],
+            "vms": self.vms[index],
+        }
+
+def _read_into(path, buffer):
+    """Read a small /proc file into a reused buffer and return the byte count."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.readv(fd, [buffer])
+    finally:
+        os.close(fd)
+
+def _collect_from_proc(threads=False):
+    table = ProcessTable()
+    buffer = bytearray(4096)
+    view = memoryview(buffer)
+
+    def add(stat_path, statm_path):
+        try:
+            size = _read_into(stat_path, buffer)
+            stat = bytes(view[:size])
+            size = _read_into(statm_path, buffer)
+            statm = bytes(view[:size]).split(None, 2)
+        except OSError:
+            return  # the process exited between listdir and open
+
+        # comm sits in parentheses and may itself contain spaces or ')'
+        open_paren = stat.find(b"(")
+        close_paren = stat.rfind(b")")
+        fields = stat[close_paren + 2:].split()
+        # fields[0] is field 3 (state) of proc(5)
+        table.append(
+            int(stat[:open_paren]),
+            int(fields[1]),
+            stat[open_paren + 1:close_paren].decode("utf-8", "replace"),
+            STATE_NAMES.get(fields[0].decode(), fields[0].decode()),
+            int(fields[17]),
+            (int(fields[11]) + int(fields[12])) / CLK_TCK,
+            int(fields[19]) / CLK_TCK,
+            int(statm[1]) * PAGE_SIZE,
+            int(statm[0]) * PAGE_SIZE,
+        )
+
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        if threads:
+            try:
+                tids = os.listdir(f"/proc/{entry.name}/task")
+            except OSError:
+                continue
+            for tid in tids:
+                add(f"/proc/{entry.name}/task/{tid}/stat", f"/proc/{entry.name}/task/{tid}/statm")
+        else:
+            add(f"/proc/{entry.name}/stat", f"/proc/{entry.name}/statm")
+
+    return table
+
+def _collect_with_psutil():
+    table = ProcessTable()
+    attrs = ['pid', 'ppid', 'name', 'status', 'num_threads', 'cpu_times', 'create_time', 'memory_info']
+    for proc in psutil.process_iter(attrs):
+        info = proc.info
+        cpu_times = info['cpu_times']
+        memory = info['memory_info']
+        table.append(
+            info['pid'],
+            info['ppid'] or 0,
+            info['name'] or "",
+            info['status'] or "unknown",
+            info['num_threads'] or 0,
+            cpu_times.user + cpu_times.system if cpu_times else 0.0,
+            info['create_time'] or 0.0,
+            memory.rss if memory else 0,
+            memory.vms if memory else 0,
+        )
+    return table
+
+@profiled()
+def collect_processes(threads=False):
+    """Snapshot every process (or thread) into a ProcessTable, using /proc on Linux."""
+    if PROC_FAST_PATH:
+        return _collect_from_proc(threads)
+    return _collect_with_psutil()
+
+def cpu_percentages(before, after):
+    """Compute per-row CPU percent of `after` from two snapshots, matched by (pid, start time)."""
+    elapsed = after.timestamp - before.timestamp
+    previous = {(pid, start): cpu for pid, start, cpu in zip(before.pids, before.start_time, before.cpu_time)}
+    percentages = array("d", bytes(8 * len(after)))
+    if elapsed <= 0:
+        return percentages
+    for index, key in enumerate(zip(after.pids, after.start_time)):
+        cpu = previous.get(key)
+        if cpu is not None:
+            percentages[index] = max(after.cpu_time[index] - cpu, 0.0) / elapsed * 100
+    return percentages
+
+def top_processes(interval=1, limit=10, sort_by="cpu_percent"):
+    """Return the top processes by CPU or memory over a sampling interval as dicts."""
+    before = collect_processes()
+    time.sleep(interval)
+    after = collect_processes()
+
+    cpu = cpu_percentages(before, after)
+    total_memory = psutil.virtual_memory().total
+    rows = []
+    for index in range(len(after)):
+        row = after.row(index)
+        row["cpu_percent"] = cpu[index]
+        row["memory_percent"] = after.rss[index] / total_memory * 100
+        rows.append(row)
+
+    rows.sort(key=lambda row: row[sort_by], reverse=True)
+    return rows[:limit] if limit else rows
+
+def benchmark_process_collectors(rounds=5):
+    """Time the /proc fast path against the psutil collector and print the results."""
+    collectors = {"psutil": _collect_with_psutil}
+    if PROC_FAST_PATH:
+        collectors["procfs"] = _collect_from_proc
+
+    results = {}
+    for name, collector in collectors.items():
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            count = len(collector())
+            timings.append(time.perf_counter() - start)
+        results[name] = {"processes": count, "best_ms": min(timings) * 1000, "mean_ms": sum(timings) / rounds * 1000}
+
+    table = Table(title=f"Process Collector Benchmark ({rounds} rounds)")
+    table.add_column("Collector", style="cyan")
+    table.add_column("Processes", justify="right", style="magenta")
+    table.add_column("Best (ms)", justify="right", style="green")
+    table.add_column("Mean (ms)", justify="right", style="yellow")
+    table.add_column("Speedup", justify="right", style="red")
+
+    baseline = results["psutil"]["best_ms"]
+    for name, result in results.items():
+        table.add_row(
+            name,
+            str(result["processes"]),
+            f"{result['best_ms']:.2f}",
+            f"{result['mean_ms']:.2f}",
+            f"{baseline / result['best_ms']:.1f}x" if result["best_ms"] else "N/A",
+        )
+
+    console.print(table)
+    return results
+
+if __name__ == "__main__":
+    benchmark_process_collectors()
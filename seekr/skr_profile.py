@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import asyncio
+import cProfile
+import functools
+import itertools
+import threading
+import contextlib
+import tracemalloc
+from collections import Counter
+from rich.console import Console
+from rich.table import Table
+
+console = Console(stderr=True)
+
+# Opt-in instrumentation for finding where a slow run spends its time. Hot
+# functions carry @profiled and count() calls that cost one global check
+# while profiling is off. With it on, every span becomes a Chrome trace
+# event (load the JSON in chrome://tracing or ui.perfetto.dev) and is also
+# folded into per-name totals for a summary table. cProfile, when asked
+# for, only sees the thread that started profiling; spans see every thread.
+
+MAX_EVENTS = 500_000  # past this only the totals keep growing
+TOP_ALLOCATIONS = 20
+
+_enabled = False
+_origin = 0
+_events = []
+_dropped = 0
+_stats = {}  # name -> [calls, total ns, max ns]
+_counters = Counter()
+_async_ids = itertools.count(1)
+_lock = threading.Lock()
+_profiler = None
+_allocations = None
+
+def is_profiling():
+    return _enabled
+
+def _record(name, start, end, args=None, async_id=None):
+    global _dropped
+    duration = end - start
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            _stats[name] = [1, duration, duration]
+        else:
+            stat[0] += 1
+            stat[1] += duration
+            if duration > stat[2]:
+                stat[2] = duration
+        if len(_events) >= MAX_EVENTS:
+            _dropped += 1
+            return
+        ts = (start - _origin) / 1000
+        event = {"name": name, "ts": ts, "pid": os.getpid(), "tid": threading.get_native_id()}
+        if args:
+            event["args"] = args
+        if async_id is None:
+            event.update(ph="X", dur=duration / 1000)
+            _events.append(event)
+        else:
+            # Coroutines interleave on one thread, so they get async begin/end pairs instead
+            event.update(ph="b", cat="async", id=async_id)
+            _events.append(event)
+            _events.append({"name": name, "ph": "e", "cat": "async", "id": async_id, "ts": (end - _origin) / 1000,
+                            "pid": event["pid"], "tid": event["tid"]})
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.start, time.perf_counter_ns(), self.args)
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+def span(name, **args):
+    """Time a block as `name`; free when profiling is off."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args or None)
+
+def count(name, amount=1):
+    """Add to a named counter while profiling."""
+    if _enabled:
+        with _lock:
+            _counters[name] += amount
+
+def profiled(name=None):
+    """Decorator recording every call of a function or coroutine function as a span."""
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    _record(label, start, time.perf_counter_ns(), async_id=next(_async_ids))
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(label, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
+
+def start_profiling(cprofile=False, memory=False):
+    """Clear earlier data and start recording spans, plus cProfile and tracemalloc if asked."""
+    global _enabled, _origin, _dropped, _profiler, _allocations
+    with _lock:
+        _events.clear()
+        _stats.clear()
+        _counters.clear()
+        _dropped = 0
+    _allocations = None
+    if memory:
+        tracemalloc.start()
+    _profiler = cProfile.Profile() if cprofile else None
+    _origin = time.perf_counter_ns()
+    _enabled = True
+    if _profiler:
+        _profiler.enable()
+
+def stop_profiling():
+    global _enabled, _allocations
+    _enabled = False
+    if _profiler:
+        _profiler.disable()
+    if tracemalloc.is_tracing():
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _allocations = {
+            "peak_bytes": peak,
+            "top": [
+                {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size, "blocks": stat.count}
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ],
+        }
+
+def summary():
+    """Return per-span totals (sorted by total time), counters and allocation stats."""
+    with _lock:
+        spans = [
+            {"name": name, "calls": calls, "total_ms": total / 1e6, "mean_ms": total / calls / 1e6, "max_ms": longest / 1e6}
+            for name, (calls, total, longest) in _stats.items()
+        ]
+        counters = dict(_counters)
+    spans.sort(key=lambda row: row["total_ms"], reverse=True)
+    return {"spans": spans, "counters": counters, "dropped_events": _dropped, "allocations": _allocations}
+
+def write_trace(path):
+    """Write the Chrome trace JSON to `path`, and cProfile stats next to it as `path`.prof."""
+    end = (time.perf_counter_ns() - _origin) / 1000
+    with _lock:
+        events = list(_events)
+        events.extend(
+            {"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "args": {"value": value}}
+            for name, value in _counters.items()
+        )
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary()}, f)
+    if _profiler:
+        _profiler.dump_stats(f"{path}.prof")
+
+def display_profile_summary(limit=25):
+    data = summary()
+    table = Table(title="Profile: Time by Span")
+    table.add_column("Span", style="cyan")
+    table.add_column("Calls", justify="right", style="magenta")
+    table.add_column("Total (ms)", justify="right", style="green")
+    table.add_column("Mean (ms)", justify="right", style="yellow")
+    table.add_column("Max (ms)", justify="right", style="red")
+    for row in data["spans"][:limit]:
+        table.add_row(row["name"], str(row["calls"]), f"{row['total_ms']:.1f}", f"{row['mean_ms']:.3f}", f"{row['max_ms']:.1f}")
+    console.print(table)
+
+    if data["counters"]:
+        counters = Table(title="Profile: Counters")
+        counters.add_column("Counter", style="cyan")
+        counters.add_column("Value", justify="right", style="magenta")
+        for name, value in sorted(data["counters"].items()):
+            counters.add_row(name, str(value))
+        console.print(counters)
+
+    if data["allocations"]:
+        allocations = Table(title=f"Profile: Top Allocations (peak {data['allocations']['peak_bytes'] / 1024 ** 2:.1f} MB)")
+        allocations.add_column("Location", style="cyan")
+        allocations.add_column("KB", justify="right", style="magenta")
+        allocations.add_column("Blocks", justify="right", style="green")
+        for row in data["allocations"]["top"][:10]:
+            allocations.add_row(row["location"], f"{row['bytes'] / 1024:.1f}", str(row["blocks"]))
+        console.print(allocations)
+
+    if data["dropped_events"]:
+        console.print(f"[yellow]{data['dropped_events']} spans were left out of the trace (limit {MAX_EVENTS}).[/yellow]")
+
+@contextlib.contextmanager
+def profiling(trace_path=None, cprofile=False, memory=False):
+    """Profile the enclosed block, then print a summary and write the trace if a path is given."""
+    start_profiling(cprofile, memory)
+    try:
+        yield
+    finally:
+        stop_profiling()
+        display_profile_summary()
+        if trace_path:
+            try:
+                write_trace(trace_path)
+            except OSError as e:
+                console.print(f"[bold red]Could not write the trace: {e}[/bold red]")
+            else:
+                console.print(f"[bold green]Trace written to {trace_path}[/bold green]"
+                              + (f" [green](cProfile stats in {trace_path}.prof)[/green]" if cprofile else ""))
+
+def add_profile_arguments(parser):
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", metavar="TRACE.json", help="time hot paths and write a Chrome trace here")
+    group.add_argument("--cprofile", action="store_true", help="with --profile, also save cProfile stats to TRACE.json.prof")
+    group.add_argument("--tracemalloc", action="store_true", help="with --profile, also report the top allocations")
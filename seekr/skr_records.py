@@ -0,0 +1,114 @@
+import socket
+import ipaddress
+
+# Compact result records. Scans can produce hundreds of thousands of
+# results, and a dict per result (plus a str per address) costs several
+# times the data it holds. These classes use __slots__, keep IP addresses
+# as integers and MAC addresses as 6 raw bytes, and only build strings or
+# dicts when something is displayed or serialized.
+
+def pack_ip(ip):
+    """Return (version, integer) for an address given as text, an integer or an ipaddress object."""
+    if isinstance(ip, str) and "." in ip:
+        try:
+            return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip), "big")
+        except OSError:
+            pass
+    address = ipaddress.ip_address(ip)
+    return address.version, int(address)
+
+def unpack_ip(version, value):
+    if version == 4:
+        return socket.inet_ntoa(value.to_bytes(4, "big"))
+    return str(ipaddress.IPv6Address(value))
+
+def pack_mac(mac):
+    """Return 6 bytes for a MAC given as 'aa:bb:cc:dd:ee:ff' (or with dashes), bytes, or None."""
+    if mac is None or isinstance(mac, bytes):
+        return mac
+    return bytes.fromhex(mac.replace(":", "").replace("-", ""))
+
+def unpack_mac(mac):
+    return mac.hex(":") if mac is not None else None
+
+class Device:
+    """A discovered host; `ip` and `mac` read and write as strings but are stored packed."""
+
+    __slots__ = ("version", "address", "mac_bytes", "method", "rtt")
+
+    def __init__(self, ip, mac=None, method=None, rtt=None):
+        self.version, self.address = pack_ip(ip)
+        self.mac_bytes = pack_mac(mac)
+        self.method = method  # how it answered, e.g. 'arp', 'icmp' or 'tcp/443'
+        self.rtt = rtt        # milliseconds, when measured
+
+    @property
+    def ip(self):
+        return unpack_ip(self.version, self.address)
+
+    @property
+    def mac(self):
+        return unpack_mac(self.mac_bytes)
+
+    @mac.setter
+    def mac(self, value):
+        self.mac_bytes = pack_mac(value)
+
+    def sort_key(self):
+        return self.version, self.address
+
+    def to_dict(self):
+        return {"ip": self.ip, "mac": self.mac, "method": self.method, "rtt": self.rtt}
+
+    def __eq__(self, other):
+        if not isinstance(other, Device):
+            return NotImplemented
+        return (self.version, self.address, self.mac_bytes) == (other.version, other.address, other.mac_bytes)
+
+    def __hash__(self):
+        return hash((self.version, self.address))
+
+    def __repr__(self):
+        return f"Device(ip={self.ip!r}, mac={self.mac!r}, method={self.method!r}, rtt={self.rtt!r})"
+
+class PortResult:
+    """What a closer look found on one open port."""
+
+    __slots__ = ("port", "service", "banner", "ssl_info", "http_info")
+
+    def __init__(self, port, service, banner=None, ssl_info=None, http_info=None):
+        self.port = port
+        self.service = service
+        self.banner = banner
+        self.ssl_info = ssl_info
+        self.http_info = http_info
+
+    def to_dict(self):
+        return {"Port": self.port, "Service": self.service, "Banner": self.banner,
+                "SSL Info": self.ssl_info, "HTTP Info": self.http_info}
+
+    def __repr__(self):
+        return f"PortResult(port={self.port!r}, service={self.service!r}, banner={self.banner!r})"
+
+class StorageEntry:
+    """A directory and its total size in bytes."""
+
+    __slots__ = ("path", "size")
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+    @property
+    def size_mb(self):
+        return round(self.size / (1024 * 1024), 2)
+
+    def to_dict(self):
+        return {"Directory": self.path, "SizeMB": self.size_mb}
+
+    def __repr__(self):
+        return f"StorageEntry(path={self.path!r}, size={self.size!r})"
+
+def to_dicts(records):
+    """Convert records (or dicts, passed through) to dicts for tables, pandas and JSON."""
+    return [record.to_dict() if hasattr(record, "to_dict") else record for record in records]
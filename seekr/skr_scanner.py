@@ -0,0 +1,280 @@
+import asyncio
+import errno
+import ipaddress
+import socket
+import struct
+import time
+from collections import deque
+from skr_ports import PortBitmap, frequency_order, parse_port_spec
+from skr_governor import get_governor
+from skr_profile import count
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# asyncio TCP connect scanner. Each probe is a non-blocking socket driven by
+# the event loop, so thousands of connects can be in flight from one thread
+# without a thread (and its stack) per port.
+
+DEFAULT_CONCURRENCY = 2000
+DEFAULT_PER_HOST_LIMIT = 256
+DEFAULT_TIMEOUT = 0.5
+DEFAULT_RETRIES = 1
+MIN_TIMEOUT = 0.05
+MAX_TIMEOUT = 3.0
+PROGRESS_BATCH = 256
+
+# Closing with SO_LINGER 0 sends RST instead of FIN, so a sweep does not
+# leave thousands of sockets behind in TIME_WAIT
+LINGER_RESET = struct.pack("ii", 1, 0)
+
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+
+UNREACHABLE_ERRNOS = {errno.EHOSTUNREACH, errno.ENETUNREACH, getattr(errno, "EHOSTDOWN", errno.EHOSTUNREACH)}
+# Local errors no retry can fix, e.g. an IPv6 target on a host without IPv6
+UNSUPPORTED_ERRNOS = {errno.EAFNOSUPPORT, errno.EPROTONOSUPPORT}
+
+def fd_headroom(reserve=64):
+    """Return how many more file descriptors this process may open, or None if unknown."""
+    if resource is None:
+        return None
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return None
+    return max(soft - reserve, 1)
+
+def effective_concurrency(concurrency):
+    """Clamp a requested concurrency to the file descriptor limit."""
+    headroom = fd_headroom()
+    return min(concurrency, headroom) if headroom else concurrency
+
+async def resolve_target(target):
+    """Resolve a host name to (family, ip) once, so probes skip per-port lookups."""
+    try:
+        # IP literals, the common case on large sweeps, need no resolver thread
+        address = ipaddress.ip_address(target)
+        return (socket.AF_INET6 if address.version == 6 else socket.AF_INET), str(address)
+    except ValueError:
+        pass
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(target, None, type=socket.SOCK_STREAM)
+    family, _, _, _, sockaddr = infos[0]
+    return family, sockaddr[0]
+
+class RttEstimator:
+    """Per-host connect timeout derived from smoothed RTT and its variance, as TCP does (RFC 6298)."""
+
+    def __init__(self, initial=DEFAULT_TIMEOUT, minimum=MIN_TIMEOUT, maximum=MAX_TIMEOUT):
+        self.srtt = None
+        self.rttvar = None
+        self.minimum = minimum
+        self.maximum = maximum
+        self.timeout = initial
+
+    def sample(self, rtt):
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        self.timeout = min(max(self.srtt + 4 * self.rttvar, self.minimum), self.maximum)
+
+    def backoff(self):
+        """Double the timeout after a round of unanswered probes, up to the maximum."""
+        self.timeout = min(self.timeout * 2, self.maximum)
+
+async def probe_port_state(family, ip, port, timeout=DEFAULT_TIMEOUT):
+    """Attempt one non-blocking TCP connect and return (state, rtt).
+
+    OPEN and CLOSED are definitive answers from the host and carry the
+    round-trip time; FILTERED means no usable answer and is worth retrying.
+    Raises OSError when the address family is not supported here at all.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        sock = socket.socket(family, socket.SOCK_STREAM)
+    except OSError as e:
+        if e.errno in UNSUPPORTED_ERRNOS:
+            raise
+        return FILTERED, None  # out of descriptors or buffers for now; a retry may get one
+    sock.setblocking(False)
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+        return OPEN, time.perf_counter() - start
+    except ConnectionRefusedError:
+        return CLOSED, time.perf_counter() - start
+    except (ConnectionResetError, ConnectionAbortedError):
+        # The handshake completed and the service then dropped us, so the port is open
+        return OPEN, time.perf_counter() - start
+    except asyncio.TimeoutError:
+        return FILTERED, None
+    except OSError as e:
+        # ICMP unreachable is an answer; local errors such as EMFILE or ENOBUFS are not
+        if e.errno in UNSUPPORTED_ERRNOS:
+            raise
+        return (CLOSED if e.errno in UNREACHABLE_ERRNOS else FILTERED), None
+    finally:
+        sock.close()
+
+async def probe_port(family, ip, port, timeout=DEFAULT_TIMEOUT):
+    """Attempt one non-blocking TCP connect and return True if the port accepted it."""
+    state, _ = await probe_port_state(family, ip, port, timeout)
+    return state == OPEN
+
+async def async_check_open_ports(target, ports=range(1, 1001), concurrency=DEFAULT_CONCURRENCY,
+                                 timeout=DEFAULT_TIMEOUT, progress=None, retries=DEFAULT_RETRIES, adaptive=True):
+    """Scan ports on a target with non-blocking connects and return the open ones, sorted.
+
+    `progress`, if given, is called with the number of newly finished ports
+    in batches rather than once per port.
+    """
+    open_ports = []
+    async for _, found, error in scan_hosts([target], ports, concurrency, concurrency, timeout, progress, retries, adaptive):
+        if error:
+            raise error
+        open_ports = found.to_list()
+    return open_ports
+
+def interleave(targets, ports):
+    """Yield (target, port) pairs round-robin across targets so load is spread between hosts."""
+    for port in ports:
+        for target in targets:
+            yield target, port
+
+async def scan_hosts(targets, ports=range(1, 1001), concurrency=DEFAULT_CONCURRENCY,
+                     per_host_limit=DEFAULT_PER_HOST_LIMIT, timeout=DEFAULT_TIMEOUT, progress=None,
+                     retries=DEFAULT_RETRIES, adaptive=True, ordered=True, on_probe=None):
+    """Scan many hosts at once and yield (target, open_ports, error) as each host finishes.
+
+    `ports` is an iterable of ports or a spec such as '22,80,8000-9000';
+    with `ordered` set, commonly open ports are probed first. Each host's
+    open ports come back as a PortBitmap.
+
+    `concurrency` caps connection attempts in flight overall and
+    `per_host_limit` caps them per host, so one target is never hit with
+    the whole budget at once. With `adaptive` set, each host's timeout
+    starts at `timeout` and then follows its measured RTT; ports that got
+    no answer are retried up to `retries` times.
+
+    `on_probe`, if given, is called as on_probe(target, port, state, seconds)
+    after every connection attempt, retries included.
+    """
+    targets = list(dict.fromkeys(targets))
+    ports = parse_port_spec(ports) if isinstance(ports, str) else list(ports)
+    if ordered:
+        ports = frequency_order(ports)
+    finished = asyncio.Queue()
+
+    resolved = await asyncio.gather(*(resolve_target(target) for target in targets), return_exceptions=True)
+    hosts = {}
+    for target, address in zip(targets, resolved):
+        if isinstance(address, BaseException):
+            finished.put_nowait((target, PortBitmap(), address))
+        elif not ports:
+            finished.put_nowait((target, PortBitmap(), None))
+        else:
+            hosts[target] = {
+                "address": address,
+                "limit": asyncio.Semaphore(per_host_limit),
+                "rtt": RttEstimator(timeout),
+                "remaining": len(ports),
+                "open": PortBitmap(),
+            }
+
+    pairs = interleave(list(hosts), ports)
+    pending_retries = deque()
+    alive = 0
+
+    def fail(target, error):
+        host = hosts[target]
+        if host["remaining"]:
+            host["remaining"] = 0  # its outstanding probes are skipped
+            finished.put_nowait((target, PortBitmap(), error))
+
+    def next_probe():
+        if pending_retries:
+            return pending_retries.popleft()
+        pair = next(pairs, None)
+        return pair + (0,) if pair else None
+
+    async def worker():
+        nonlocal alive
+        try:
+            await probe_loop()
+        finally:
+            # The last worker out fails any host still waiting (e.g. after a
+            # worker died on an unexpected error) so the caller never hangs
+            alive -= 1
+            if not alive:
+                for target in hosts:
+                    fail(target, RuntimeError(f"Scan of {target} stopped before all ports were probed"))
+
+    async def probe_loop():
+        done = 0
+        while True:
+            probe = next_probe()
+            if probe is None:
+                break
+            target, port, attempt = probe
+            host = hosts[target]
+            if not host["remaining"]:
+                continue  # the host already failed
+            rtt = host["rtt"]
+            wait = rtt.timeout if adaptive else timeout
+            try:
+                async with host["limit"]:
+                    started = time.perf_counter()
+                    state, elapsed = await probe_port_state(*host["address"], port, wait)
+            except OSError as e:
+                fail(target, e)
+                continue
+            if on_probe:
+                on_probe(target, port, state, time.perf_counter() - started)
+            count(f"scanner.{state}")  # filtered probes are the ones that sat out a timeout
+
+            if state == FILTERED and attempt < retries:
+                # With no answers at all yet the first guess was too short, back
+                # off once per round rather than once per unanswered probe
+                if adaptive and rtt.srtt is None and wait == rtt.timeout:
+                    rtt.backoff()
+                pending_retries.append((target, port, attempt + 1))
+                continue
+            if elapsed is not None and adaptive:
+                rtt.sample(elapsed)
+            if state == OPEN:
+                host["open"].add(port)
+
+            host["remaining"] -= 1
+            if not host["remaining"]:
+                finished.put_nowait((target, host["open"], None))
+            done += 1
+            if progress and done == PROGRESS_BATCH:
+                progress(done)
+                done = 0
+        if progress and done:
+            progress(done)
+
+    # Each worker holds at most one socket; the governor may grant fewer
+    # than asked when other subsystems are using part of the budget
+    workers = min(effective_concurrency(concurrency), len(hosts) * len(ports))
+    async with get_governor().hold_sockets(workers) as workers:
+        alive = workers
+        tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+        try:
+            for _ in range(len(targets)):
+                yield await finished.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+def scan_ports(target, ports=range(1, 1001), concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+               progress=None, retries=DEFAULT_RETRIES, adaptive=True):
+    """Synchronous wrapper around async_check_open_ports for callers outside an event loop."""
+    return asyncio.run(async_check_open_ports(target, ports, concurrency, timeout, progress, retries, adaptive))
@@ -0,0 +1,278 @@
+import os
+import sys
+import time
+import socket
+import struct
+import ipaddress
+from array import array
+from collections import Counter
+import psutil
+from rich.console import Console
+from rich.table import Table
+from skr_profile import profiled
+
+console = Console()
+
+# Bulk socket enumeration. On Linux sockets are dumped straight from the
+# kernel over netlink sock_diag (what `ss` uses) and parsed into column
+# arrays, instead of psutil walking /proc/net/tcp* text and every process's
+# fd table. Other platforms fill the same columns from psutil.
+
+NETLINK_SOCK_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x01
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+ALL_STATES = 0xFFFFFFFF
+RECV_BUFFER_SIZE = 256 * 1024
+
+SOCK_DIAG_AVAILABLE = sys.platform.startswith("linux") and hasattr(socket, "AF_NETLINK")
+
+NLMSG_HEADER = struct.Struct("=IHHII")
+# inet_diag_req_v2: family, protocol, ext, pad, states, then a zeroed inet_diag_sockid
+INET_DIAG_REQUEST = struct.Struct("=BBBxI48x")
+# inet_diag_msg: family, state, timer, retrans, sockid, expires, queues, uid, inode. The
+# ports are big-endian; they are read natively and byte-swapped per column afterwards.
+INET_DIAG_MSG = struct.Struct("=BBBBHH16s16sIQIIIII")
+
+TCP_STATES = {
+    1: "ESTABLISHED", 2: "SYN_SENT", 3: "SYN_RECV", 4: "FIN_WAIT1", 5: "FIN_WAIT2",
+    6: "TIME_WAIT", 7: "CLOSE", 8: "CLOSE_WAIT", 9: "LAST_ACK", 10: "LISTEN",
+    11: "CLOSING", 12: "SYN_RECV",
+}
+STATE_CODES = {name: code for code, name in TCP_STATES.items() if code != 12}
+UNCONNECTED = 7
+
+PROTOCOLS = {"tcp": (socket.IPPROTO_TCP,), "udp": (socket.IPPROTO_UDP,), "inet": (socket.IPPROTO_TCP, socket.IPPROTO_UDP)}
+GROUPINGS = ("remote_subnet", "local_port", "state", "process")
+
+class SocketTable:
+    """Column-oriented snapshot of the system's TCP/UDP sockets."""
+
+    def __init__(self):
+        self.families = array("B")
+        self.protocols = array("B")
+        self.states = array("B")
+        self.local_addrs = []   # packed addresses
+        self.local_ports = array("H")
+        self.remote_addrs = []
+        self.remote_ports = array("H")
+        self.inodes = array("Q")
+        self.pids = array("l")  # -1 when unknown
+        self.collector = None
+        self.elapsed = 0.0
+
+    def __len__(self):
+        return len(self.families)
+
+    def append(self, family, protocol, state, local_addr, local_port, remote_addr, remote_port, inode=0, pid=-1):
+        self.families.append(family)
+        self.protocols.append(protocol)
+        self.states.append(state)
+        self.local_addrs.append(local_addr)
+        self.local_ports.append(local_port)
+        self.remote_addrs.append(remote_addr)
+        self.remote_ports.append(remote_port)
+        self.inodes.append(inode)
+        self.pids.append(pid)
+
+    def state_name(self, index):
+        if self.protocols[index] == socket.IPPROTO_UDP:
+            return "NONE"  # UDP has no connection state, psutil reports the same
+        return TCP_STATES.get(self.states[index], "UNKNOWN")
+
+    def row(self, index):
+        family = self.families[index]
+        remote = self.remote_addrs[index]
+        return {
+            "proto": "udp" if self.protocols[index] == socket.IPPROTO_UDP else "tcp",
+            "laddr": (socket.inet_ntop(family, self.local_addrs[index]), self.local_ports[index]),
+            "raddr": (socket.inet_ntop(family, remote), self.remote_ports[index]) if self.remote_ports[index] else (),
+            "status": self.state_name(index),
+            "pid": self.pids[index] if self.pids[index] >= 0 else None,
+        }
+
+def _dump(sock, family, protocol, table, buffer):
+    view = memoryview(buffer)
+    request = INET_DIAG_REQUEST.pack(family, protocol, 0, ALL_STATES)
+    sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(request), SOCK_DIAG_BY_FAMILY, NLM_F_REQUEST | NLM_F_DUMP, 1, 0) + request)
+    addr_len = 4 if family == socket.AF_INET else 16
+    unpack_header = NLMSG_HEADER.unpack_from
+    unpack_msg = INET_DIAG_MSG.unpack_from
+    # Hundreds of thousands of rows: append to the columns directly, not through table.append
+    families, states, inodes = table.families.append, table.states.append, table.inodes.append
+    local_addrs, local_ports = table.local_addrs.append, table.local_ports.append
+    remote_addrs, remote_ports = table.remote_addrs.append, table.remote_ports.append
+    start = len(table)
+
+    while True:
+        size = sock.recv_into(buffer)
+        offset = 0
+        while offset + NLMSG_HEADER.size <= size:
+            length, kind, _, _, _ = unpack_header(view, offset)
+            if kind == NLMSG_DONE:
+                count = len(table.families) - start
+                table.protocols.extend(array("B", [protocol]) * count)
+                table.pids.extend(array("l", [-1]) * count)
+                if sys.byteorder == "little":
+                    for column in (table.local_ports, table.remote_ports):
+                        ports = column[start:]
+                        ports.byteswap()
+                        column[start:] = ports
+                return
+            if kind == NLMSG_ERROR:
+                error = -struct.unpack_from("=i", view, offset + NLMSG_HEADER.size)[0]
+                raise OSError(error, os.strerror(error))
+            (msg_family, state, _, _, sport, dport, src, dst,
+             _, _, _, _, _, _, inode) = unpack_msg(view, offset + NLMSG_HEADER.size)
+            families(msg_family)
+            states(state)
+            local_addrs(src[:addr_len])
+            local_ports(sport)
+            remote_addrs(dst[:addr_len])
+            remote_ports(dport)
+            inodes(inode)
+            offset += (length + 3) & ~3
+
+def _collect_with_sock_diag(kind="inet"):
+    table = SocketTable()
+    buffer = bytearray(RECV_BUFFER_SIZE)
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_SOCK_DIAG) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)
+        for protocol in PROTOCOLS[kind]:
+            for family in (socket.AF_INET, socket.AF_INET6):
+                _dump(sock, family, protocol, table, buffer)
+    return table
+
+def _collect_with_psutil(kind="inet"):
+    table = SocketTable()
+    for conn in psutil.net_connections(kind=kind):
+        family = int(conn.family)
+        udp = conn.type == socket.SOCK_DGRAM
+        remote = conn.raddr or (("::" if family == socket.AF_INET6 else "0.0.0.0"), 0)
+        table.append(
+            family,
+            socket.IPPROTO_UDP if udp else socket.IPPROTO_TCP,
+            UNCONNECTED if udp else STATE_CODES.get(conn.status, 0),
+            socket.inet_pton(family, conn.laddr.ip), conn.laddr.port,
+            socket.inet_pton(family, remote[0]), remote[1],
+            0, conn.pid if conn.pid is not None else -1,
+        )
+    return table
+
+def socket_owners():
+    """Return {socket inode: pid} by reading every process's fd table."""
+    owners = {}
+    for entry in os.scandir("/proc"):
+        if not entry.name.isdigit():
+            continue
+        pid = int(entry.name)
+        try:
+            fds = os.scandir(f"/proc/{pid}/fd")
+        except OSError:
+            continue  # exited, or not ours to look at
+        with fds:
+            for fd in fds:
+                try:
+                    target = os.readlink(fd.path)
+                except OSError:
+                    continue
+                if target.startswith("socket:["):
+                    owners[int(target[8:-1])] = pid
+    return owners
+
+@profiled()
+def collect_sockets(kind="inet", with_process=False):
+    """Snapshot all TCP and/or UDP sockets ('tcp', 'udp' or 'inet') into a SocketTable.
+
+    With `with_process` set, owning pids are filled in where permissions allow.
+    """
+    start = time.perf_counter()
+    table = None
+    if SOCK_DIAG_AVAILABLE:
+        try:
+            table = _collect_with_sock_diag(kind)
+            table.collector = "sock_diag"
+            if with_process:
+                owners = socket_owners()
+                table.pids = array("l", (owners.get(inode, -1) for inode in table.inodes))
+        except OSError:
+            table = None  # netlink blocked, e.g. by a seccomp profile
+    if table is None:
+        table = _collect_with_psutil(kind)
+        table.collector = "psutil"
+    table.elapsed = time.perf_counter() - start
+    return table
+
+def _process_names(pids):
+    names = {}
+    for pid in pids:
+        try:
+            names[pid] = psutil.Process(pid).name()
+        except psutil.Error:
+            names[pid] = "?"
+    return names
+
+def aggregate_sockets(table, by="remote_subnet", top=10, ipv4_prefix=24, ipv6_prefix=64):
+    """Count sockets per group and return (top groups as [(label, count)], count of the rest).
+
+    Groups are 'remote_subnet', 'local_port', 'state' or 'process'. Sockets
+    with no remote end are left out of 'remote_subnet' and ones with no
+    known owner out of 'process'.
+    """
+    if by == "remote_subnet":
+        v4_bytes, v6_bytes = ipv4_prefix // 8, ipv6_prefix // 8
+        counts = Counter(
+            (family, addr[:v4_bytes if family == socket.AF_INET else v6_bytes])
+            for family, addr, port in zip(table.families, table.remote_addrs, table.remote_ports)
+            if port
+        )
+
+        def label(key):
+            family, prefix = key
+            size = 4 if family == socket.AF_INET else 16
+            bits = ipv4_prefix if family == socket.AF_INET else ipv6_prefix
+            return str(ipaddress.ip_network((prefix + bytes(size - len(prefix)), bits)))
+    elif by == "local_port":
+        counts = Counter(zip(table.protocols, table.local_ports))
+
+        def label(key):
+            return f"{key[1]}/{'udp' if key[0] == socket.IPPROTO_UDP else 'tcp'}"
+    elif by == "state":
+        counts = Counter(table.state_name(i) for i in range(len(table)))
+        label = str
+    elif by == "process":
+        counts = Counter(pid for pid in table.pids if pid >= 0)
+        names = _process_names(pid for pid, _ in counts.most_common(top))
+
+        def label(pid):
+            return f"{names[pid]} ({pid})"
+    else:
+        raise ValueError(f"Unknown grouping {by!r}; expected one of {', '.join(GROUPINGS)}")
+
+    ranked = counts.most_common(top)
+    rest = sum(counts.values()) - sum(count for _, count in ranked)
+    return [(label(key), count) for key, count in ranked], rest
+
+def display_socket_summary(table, groupings=GROUPINGS, top=10):
+    console.print(
+        f"[bold cyan]{len(table)} sockets collected in {table.elapsed * 1000:.0f} ms "
+        f"via {table.collector}[/bold cyan]"
+    )
+    titles = {"remote_subnet": "Remote Subnet", "local_port": "Local Port", "state": "State", "process": "Process"}
+
+    for by in groupings:
+        if by == "process" and not any(pid >= 0 for pid in table.pids):
+            continue
+        ranked, rest = aggregate_sockets(table, by, top)
+        total = sum(count for _, count in ranked) + rest
+        result = Table(title=f"Top {top} by {titles[by]}")
+        result.add_column(titles[by], style="cyan")
+        result.add_column("Sockets", justify="right", style="magenta")
+        result.add_column("Share", justify="right", style="green")
+        for label, count in ranked:
+            result.add_row(label, str(count), f"{count / total:.1%}")
+        if rest:
+            result.add_row("[dim]other[/dim]", str(rest), f"{rest / total:.1%}")
+        console.print(result)
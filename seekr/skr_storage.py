@@ -2,44 +2,71 @@ import os
 import pandas as pd
 from rich.console import Console
 from rich.table import Table
-from rich.progress import track
 from rich.prompt import Confirm
+from skr_profile import profiled, span, count
+from skr_governor import get_governor
+from skr_records import StorageEntry, to_dicts
+from skr_events import event_bus
 
 console = Console()
 
+@profiled()
 def get_directory_size(path):
     """Calculate the total size of a directory."""
     total_size = 0
+    files = 0
     for dirpath, _, filenames in os.walk(path):
+        files += len(filenames)
         for f in filenames:
             fp = os.path.join(dirpath, f)
             if os.path.exists(fp):
                 total_size += os.path.getsize(fp)
+    count("storage.directories_walked")
+    count("storage.stat_calls", 2 * files)  # exists() and getsize() per file
     return total_size
 
-def scan_directories(directories):
-    """Scan specified directories and return size information."""
+def _measure_directory(dir):
+    if os.path.exists(dir):
+        return StorageEntry(dir, get_directory_size(dir))
+    return None
+
+def iter_directory_sizes(directories):
+    """Yield a StorageEntry for each existing directory, in order, measuring several at once on the shared executor."""
+    # os.walk keeps one directory open at a time
+    for record in get_governor().imap(_measure_directory, directories, files=1):
+        if record:
+            yield record
+
+def track_directory_sizes(directories, description, total=None):
+    """Measure directories like iter_directory_sizes, returning the list and showing progress per directory."""
     report = []
-    for dir in track(directories, description="Scanning directories..."):
-        if os.path.exists(dir):
-            size = get_directory_size(dir)
-            report.append({"Directory": dir, "SizeMB": round(size / (1024 * 1024), 2)})
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]{description}", total)
+        for entry in get_governor().imap(_measure_directory, directories, files=1):
+            task.advance()
+            if entry:
+                report.append(entry)
     return report
 
+def scan_directories(directories):
+    """Scan specified directories and return size information."""
+    directories = list(directories)
+    return track_directory_sizes(directories, "Scanning directories...", len(directories))
+
 def get_all_drives():
     """Get a list of all available drives."""
     return [f"{chr(drive)}:\\" for drive in range(ord('A'), ord('Z') + 1) if os.path.exists(f"{chr(drive)}:\\")]
 
 def scan_drive(drive):
     """Scan a specific drive and return size information for all directories."""
-    report = []
-    for root, dirs, _ in track(os.walk(drive), description=f"Scanning drive {drive}..."):
-        for d in dirs:
-            dir_path = os.path.join(root, d)
-            size = get_directory_size(dir_path)
-            report.append({"Directory": dir_path, "SizeMB": round(size / (1024 * 1024), 2)})
-    return report
-
+    directories = (
+        os.path.join(root, d)
+        for root, dirs, _ in os.walk(drive)
+        for d in dirs
+    )
+    return track_directory_sizes(directories, f"Scanning drive {drive}...")
+
+@profiled()
 def visualize_storage(report):
     """Visualize storage information in a table format."""
     if not report:
@@ -51,13 +78,15 @@ def visualize_storage(report):
     table.add_column("Size (MB)", justify="right", style="magenta")
 
     try:
-        df = pd.DataFrame(report).sort_values(by="SizeMB", ascending=False).head(20)
+        with span("storage.pandas_sort", rows=len(report)):
+            df = pd.DataFrame(to_dicts(report)).sort_values(by="SizeMB", ascending=False).head(20)
         for _, row in df.iterrows():
             table.add_row(row["Directory"], f"{row['SizeMB']:.2f}")
     except KeyError as e:
         console.print(f"Error: {e}. Ensure the report contains 'SizeMB' key.", style="bold red")
 
-    console.print(table)
+    with span("rich.render"):
+        console.print(table)
 
 def generate_storage_report():
     """Generate a comprehensive storage report for all drives."""
@@ -73,25 +102,27 @@ def generate_storage_report():
         return
 
     report_path = os.path.join(os.path.expanduser("~"), "storage_report.csv")
-    pd.DataFrame(full_report).to_csv(report_path, index=False)
+    pd.DataFrame(to_dicts(full_report)).to_csv(report_path, index=False)
     console.print(f"Storage report generated at {report_path}", style="bold green")
 
     visualize_storage(full_report)
 
+def iter_large_files(path, size_limit_mb=100):
+    """Yield (file path, size in MB) for files over the size limit while the walk is still running."""
+    for root, _, files in os.walk(path):
+        for file in files:
+            file_path = os.path.join(root, file)
+            try:
+                file_size = os.path.getsize(file_path) / (1024 * 1024)  # Size in MB
+            except OSError:
+                continue
+            if file_size > size_limit_mb:
+                yield file_path, file_size
+
 def find_large_files(path, size_limit_mb=100):
     """Find files larger than the specified size limit."""
-    large_files = []
-
     with console.status("[cyan]Scanning for large files...", spinner="dots"):
-        for root, _, files in os.walk(path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                try:
-                    file_size = os.path.getsize(file_path) / (1024 * 1024)  # Size in MB
-                    if file_size > size_limit_mb:
-                        large_files.append((file_path, file_size))
-                except OSError:
-                    pass
+        large_files = list(iter_large_files(path, size_limit_mb))
 
     table = Table(title=f"Large Files (>{size_limit_mb} MB)")
     table.add_column("File Path", style="cyan")
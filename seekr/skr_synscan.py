@@ -0,0 +1,268 @@
+import os
+import sys
+import time
+import zlib
+import errno
+import random
+import socket
+import struct
+import asyncio
+import argparse
+import threading
+import ipaddress
+from skr_ports import PortBitmap, parse_port_spec
+from skr_scanner import scan_hosts, resolve_target, UNREACHABLE_ERRNOS
+from skr_utils import is_admin
+from skr_profile import profiled
+
+# Half-open (SYN) port scanning for privileged runs. SYN segments are built
+# by hand and written to a raw socket in paced batches; a receiver thread
+# reads replies from a second raw socket and matches SYN-ACK (open) and RST
+# (closed) to probes. No handshake ever completes and no socket is opened
+# per port, so there is no per-connection file descriptor or kernel state.
+# The kernel answers the SYN-ACKs it knows nothing about with RST itself.
+#
+# Probes carry no per-port state: the sequence number is a keyed hash of the
+# target address and port, and a reply is accepted only if it acknowledges it.
+
+DEFAULT_RATE = 20000          # packets per second
+DEFAULT_WAIT = 1.0            # seconds to wait for late replies after each pass
+DEFAULT_RETRIES = 1
+SEND_BATCH = 256
+SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+SOURCE_PORTS = (61000, 65535)  # above Linux's default ephemeral range
+WINDOW = 1024
+
+TCP_SYN = 0x02
+TCP_RST = 0x04
+TCP_ACK = 0x10
+TCP_HEADER = struct.Struct("!HHIIBBHHH")
+TCP_REPLY = struct.Struct("!HHIIBB")
+
+_raw_sockets = None
+
+def syn_scan_available():
+    """Return True if this process may open raw sockets and so run SYN scans."""
+    global _raw_sockets
+    if _raw_sockets is None:
+        _raw_sockets = False
+        if sys.platform.startswith("linux") and is_admin():
+            try:
+                socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP).close()
+                _raw_sockets = True
+            except OSError:  # e.g. no CAP_NET_RAW inside a container
+                pass
+    return _raw_sockets
+
+def source_address(ip):
+    """Return the local address the kernel would use to reach `ip`, without sending anything."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect((ip, 9))
+        return sock.getsockname()[0]
+
+def _cookie(secret, dst, port):
+    return zlib.crc32(dst + port.to_bytes(2, "big"), secret)
+
+def _checksum_base(src, dst, sport):
+    """Sum the 16-bit words of the pseudo-header and every SYN field except port and sequence."""
+    pseudo = src + dst + struct.pack("!BBH", 0, socket.IPPROTO_TCP, TCP_HEADER.size)
+    header = TCP_HEADER.pack(sport, 0, 0, 0, 5 << 4, TCP_SYN, WINDOW, 0, 0)
+    data = pseudo + header
+    return sum(struct.unpack(f"!{len(data) // 2}H", data))
+
+def build_syn(sport, dport, seq, base):
+    """Return a 20-byte TCP SYN header, with the checksum finished from a precomputed `base`."""
+    total = base + dport + (seq >> 16) + (seq & 0xFFFF)
+    total = (total & 0xFFFF) + (total >> 16)
+    total = (total & 0xFFFF) + (total >> 16)
+    return TCP_HEADER.pack(sport, dport, seq, 0, 5 << 4, TCP_SYN, WINDOW, ~total & 0xFFFF, 0)
+
+class _Receiver(threading.Thread):
+    """Reads TCP segments from a raw socket and records answers to our probes."""
+
+    def __init__(self, sport, secret, hosts):
+        super().__init__(daemon=True)
+        self.sport = sport
+        self.secret = secret
+        self.hosts = hosts  # packed address -> {"open": PortBitmap, "answered": PortBitmap}
+        self.answers = 0
+        self.stopping = threading.Event()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        self.sock.settimeout(0.1)
+
+    def run(self):
+        buffer = bytearray(65535)
+        view = memoryview(buffer)
+        unpack = TCP_REPLY.unpack_from
+        with self.sock:
+            while not self.stopping.is_set():
+                try:
+                    size = self.sock.recv_into(buffer)
+                except socket.timeout:
+                    continue
+                header_length = (buffer[0] & 0x0F) * 4
+                if size < header_length + TCP_REPLY.size:
+                    continue
+                sport, dport, _, ack, _, flags = unpack(view, header_length)
+                if dport != self.sport or not flags & (TCP_ACK | TCP_RST):
+                    continue  # not ours, or our own SYN seen on loopback
+                src = bytes(view[12:16])
+                host = self.hosts.get(src)
+                if host is None or sport in host["answered"]:
+                    continue
+                if ack != (_cookie(self.secret, src, sport) + 1) & 0xFFFFFFFF:
+                    continue  # stale or forged reply
+                host["answered"].add(sport)
+                if flags & TCP_SYN and flags & TCP_ACK:
+                    host["open"].add(sport)
+                self.answers += 1
+
+    def stop(self):
+        self.stopping.set()
+        self.join()
+
+def _send(sock, packet, ip):
+    while True:
+        try:
+            sock.sendto(packet, (ip, 0))
+            return True
+        except OSError as e:
+            if e.errno in (errno.ENOBUFS, errno.EAGAIN):
+                time.sleep(0.001)  # transmit queue full, let it drain
+                continue
+            if e.errno in UNREACHABLE_ERRNOS:
+                return False
+            raise
+
+@profiled()
+def syn_scan(targets, ports=range(1, 1001), rate=DEFAULT_RATE, wait=DEFAULT_WAIT, retries=DEFAULT_RETRIES, progress=None):
+    """SYN scan IPv4 `targets` and return {target: PortBitmap of open ports}.
+
+    Probes go out in batches of SEND_BATCH paced to `rate` packets per
+    second. After each pass the scanner waits `wait` seconds for late
+    replies, then probes the unanswered ports again, up to `retries` times;
+    ports that never answer are filtered. `progress`, if given, is called
+    with the number of probes in each batch of the first pass. Raises
+    PermissionError without raw socket privileges.
+    """
+    ports = parse_port_spec(ports) if isinstance(ports, str) else list(ports)
+    targets = list(dict.fromkeys(targets))
+    secret = int.from_bytes(os.urandom(4), "big")
+    sport = random.randint(*SOURCE_PORTS)
+
+    hosts = {}
+    bases = {}
+    for target in targets:
+        dst = socket.inet_aton(target)
+        hosts[dst] = {"open": PortBitmap(), "answered": PortBitmap()}
+        bases[target] = (dst, _checksum_base(socket.inet_aton(source_address(target)), dst, sport))
+
+    receiver = _Receiver(sport, secret, hosts)
+    receiver.start()
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_TCP) as sock:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            for attempt in range(retries + 1):
+                sent = 0
+                start = time.perf_counter()
+                batch = 0
+                for port in ports:
+                    for target in targets:
+                        dst, base = bases[target]
+                        if attempt and port in hosts[dst]["answered"]:
+                            continue
+                        _send(sock, build_syn(sport, port, _cookie(secret, dst, port), base), target)
+                        sent += 1
+                        batch += 1
+                        if batch == SEND_BATCH:
+                            if progress and not attempt:
+                                progress(batch)
+                            batch = 0
+                            delay = start + sent / rate - time.perf_counter()
+                            if delay > 0:
+                                time.sleep(delay)
+                if progress and batch and not attempt:
+                    progress(batch)
+                if not sent:
+                    break
+                time.sleep(wait)
+                if receiver.answers == len(targets) * len(ports):
+                    break
+    finally:
+        receiver.stop()
+    return {target: hosts[bases[target][0]]["open"] for target in targets}
+
+async def fast_scan_hosts(targets, ports=range(1, 1001), engine="auto", progress=None):
+    """Scan many hosts and yield (target, open_ports, error) like scan_hosts, using SYN scans when possible.
+
+    `engine` is 'syn', 'connect' or 'auto'. 'auto' SYN scans IPv4 targets
+    when raw sockets are available and falls back to the connect scanner
+    otherwise; IPv6 targets always use the connect scanner.
+    """
+    targets = list(dict.fromkeys(targets))
+    ports = parse_port_spec(ports) if isinstance(ports, str) else list(ports)
+    use_syn = engine == "syn" or (engine == "auto" and syn_scan_available())
+
+    syn_targets = {}  # address -> every target that resolved to it
+    connect_targets = []
+    for target in targets:
+        if not use_syn:
+            connect_targets.append(target)
+            continue
+        try:
+            family, ip = await resolve_target(target)
+        except OSError as e:
+            yield target, PortBitmap(), e
+            continue
+        if family == socket.AF_INET:
+            syn_targets.setdefault(ip, []).append(target)
+        else:
+            connect_targets.append(target)
+
+    if syn_targets:
+        try:
+            results = await asyncio.to_thread(syn_scan, list(syn_targets), ports, progress=progress)
+        except OSError as e:
+            # No raw socket privileges, or no route to pick a source address from
+            if engine == "syn":
+                for names in syn_targets.values():
+                    for target in names:
+                        yield target, PortBitmap(), e
+            else:
+                connect_targets.extend(target for names in syn_targets.values() for target in names)
+        else:
+            for ip, open_ports in results.items():
+                for i, target in enumerate(syn_targets[ip]):
+                    if i and progress:
+                        progress(len(ports))  # the shared address was probed once, for the first of them
+                    yield target, open_ports, None
+
+    if connect_targets:
+        async for result in scan_hosts(connect_targets, ports, progress=progress):
+            yield result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SYN (half-open) port scan; needs root.")
+    parser.add_argument("targets", nargs="+", help="IPv4 addresses or CIDRs")
+    parser.add_argument("--ports", default="1-1000")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE, help="packets per second")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    args = parser.parse_args(argv)
+
+    hosts = []
+    for target in args.targets:
+        network = ipaddress.ip_network(target, strict=False)
+        hosts.extend(str(ip) for ip in (network.hosts() if network.num_addresses > 2 else network))
+    start = time.perf_counter()
+    results = syn_scan(hosts, args.ports, args.rate, retries=args.retries)
+    elapsed = time.perf_counter() - start
+    for host, open_ports in results.items():
+        if open_ports:
+            print(f"{host}: {open_ports.to_list()}")
+    probes = len(hosts) * len(parse_port_spec(args.ports))
+    print(f"{probes} probes in {elapsed:.2f}s ({probes / elapsed:.0f}/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import argparse
+import tempfile
+import threading
+import socketserver
+from concurrent.futures import ThreadPoolExecutor
+from rich.console import Console
+from rich.table import Table
+
+console = Console()
+
+# Throughput, latency and jitter between two seekr instances, for networks
+# that cannot reach public speed test servers. One side runs the server and
+# the other the client; the data path avoids copies on both ends, sending
+# with sendfile (or one preallocated memoryview) and receiving with
+# recv_into into a reused buffer.
+
+DEFAULT_PORT = 5299
+DEFAULT_STREAMS = 4
+DEFAULT_DURATION = 5
+DEFAULT_PINGS = 100
+BUFFER_SIZE = 1024 * 1024
+PAYLOAD_SIZE = 8 * 1024 * 1024
+PING_SIZE = 64
+MAX_PING_SIZE = 64 * 1024
+MAX_MESSAGE_SIZE = 64 * 1024  # control messages are small JSON objects
+CONNECT_TIMEOUT = 5
+SEND_METHODS = ("sendfile", "memoryview")
+
+HEADER = struct.Struct("!I")
+
+def _recv_exact(sock, buffer):
+    """Fill `buffer` completely from `sock`, returning False on EOF."""
+    view = memoryview(buffer)
+    while view:
+        size = sock.recv_into(view)
+        if not size:
+            return False
+        view = view[size:]
+    return True
+
+def _send_message(sock, message):
+    data = json.dumps(message).encode()
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+def _recv_message(sock):
+    header = bytearray(HEADER.size)
+    if not _recv_exact(sock, header):
+        raise ConnectionError("peer closed the connection")
+    length = HEADER.unpack(header)[0]
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"control message of {length} bytes is too large")
+    data = bytearray(length)
+    if not _recv_exact(sock, data):
+        raise ConnectionError("peer closed the connection")
+    return json.loads(data)
+
+def _receive_all(sock):
+    """Read until EOF into one reused buffer and return (bytes, seconds from first byte)."""
+    buffer = bytearray(BUFFER_SIZE)
+    total = 0
+    start = None
+    while True:
+        size = sock.recv_into(buffer)
+        if not size:
+            break
+        if start is None:
+            start = time.perf_counter()
+        total += size
+    return total, (time.perf_counter() - start) if start else 0.0
+
+def _send_for(sock, seconds, method, payload_path):
+    """Send payload data for `seconds` and return the byte count."""
+    deadline = time.perf_counter() + seconds
+    sent = 0
+    if method == "sendfile":
+        # Own file object per stream: sendfile seeks it
+        with open(payload_path, "rb") as payload:
+            while time.perf_counter() < deadline:
+                sent += sock.sendfile(payload, 0, PAYLOAD_SIZE)
+    else:
+        view = memoryview(bytearray(os.urandom(BUFFER_SIZE)))
+        while time.perf_counter() < deadline:
+            sent += sock.send(view)
+    return sent
+
+def make_payload_file(size=PAYLOAD_SIZE):
+    """Write incompressible test data to a temporary file for sendfile and return its path."""
+    with tempfile.NamedTemporaryFile(prefix="seekr-payload-", delete=False) as f:
+        f.write(os.urandom(size))
+    return f.name
+
+class _TestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        try:
+            request = _recv_message(sock)
+            if not isinstance(request, dict):
+                raise ValueError("request is not an object")
+            mode = request.get("mode")
+            if mode == "upload":
+                total, seconds = _receive_all(sock)
+                _send_message(sock, {"bytes": total, "seconds": seconds})
+            elif mode == "download":
+                _send_for(sock, float(request["seconds"]), request.get("method", "sendfile"), self.server.payload_path)
+                sock.shutdown(socket.SHUT_WR)
+            elif mode == "ping":
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                size = request.get("size", PING_SIZE)
+                if not isinstance(size, int) or not HEADER.size <= size <= MAX_PING_SIZE:
+                    raise ValueError(f"bad ping size {size!r}")
+                message = bytearray(size)
+                while _recv_exact(sock, message):
+                    sock.sendall(message)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # a client going away mid-test, or a malformed request is not the server's problem
+
+class ThroughputServer(socketserver.ThreadingTCPServer):
+    """Answers upload, download and ping requests from `run_peer_test` clients, one thread per stream."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.payload_path = make_payload_file()
+        super().__init__((host, port), _TestHandler)
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.payload_path)
+        except OSError:
+            pass
+
+def start_server(host="127.0.0.1", port=DEFAULT_PORT):
+    """Start a ThroughputServer on a background thread and return it; call shutdown() to stop."""
+    server = ThroughputServer(host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def _connect(host, port, seconds, start=None):
+    try:
+        sock = socket.create_connection((host, port), timeout=CONNECT_TIMEOUT)
+    except OSError:
+        if start is not None:
+            start.abort()  # release the streams already waiting for this one
+        raise
+    sock.settimeout(seconds + CONNECT_TIMEOUT)
+    return sock
+
+def _upload_stream(host, port, seconds, method, payload_path, start):
+    with _connect(host, port, seconds, start) as sock:
+        _send_message(sock, {"mode": "upload"})
+        start.wait(CONNECT_TIMEOUT)
+        sent = _send_for(sock, seconds, method, payload_path)
+        sock.shutdown(socket.SHUT_WR)
+        report = _recv_message(sock)
+    return {"sent": sent, "bytes": report["bytes"], "seconds": report["seconds"]}
+
+def _download_stream(host, port, seconds, method, start):
+    with _connect(host, port, seconds, start) as sock:
+        start.wait(CONNECT_TIMEOUT)
+        _send_message(sock, {"mode": "download", "seconds": seconds, "method": method})
+        total, elapsed = _receive_all(sock)
+    return {"bytes": total, "seconds": elapsed}
+
+def measure_throughput(host, port=DEFAULT_PORT, direction="upload", streams=DEFAULT_STREAMS,
+                       duration=DEFAULT_DURATION, method="sendfile"):
+    """Run `streams` parallel TCP streams for `duration` seconds and return receiver-side throughput."""
+    if method == "sendfile" and not hasattr(os, "sendfile"):
+        method = "memoryview"
+    start = threading.Barrier(streams)
+    payload_path = make_payload_file() if direction == "upload" and method == "sendfile" else None
+    try:
+        with ThreadPoolExecutor(max_workers=streams) as executor:
+            if direction == "upload":
+                futures = [executor.submit(_upload_stream, host, port, duration, method, payload_path, start) for _ in range(streams)]
+            else:
+                futures = [executor.submit(_download_stream, host, port, duration, method, start) for _ in range(streams)]
+            errors = [future.exception() for future in futures if future.exception()]
+            if errors:
+                # Report the stream that failed, not the ones it left waiting at the barrier
+                raise next((e for e in errors if not isinstance(e, threading.BrokenBarrierError)), errors[0])
+            results = [future.result() for future in futures]
+    finally:
+        if payload_path:
+            os.unlink(payload_path)
+
+    total = sum(result["bytes"] for result in results)
+    seconds = max(result["seconds"] for result in results) or duration
+    return {
+        "direction": direction,
+        "method": method,
+        "streams": streams,
+        "bytes": total,
+        "seconds": round(seconds, 3),
+        "bits_per_second": total * 8 / seconds,
+        "per_stream_bits_per_second": [result["bytes"] * 8 / (result["seconds"] or duration) for result in results],
+    }
+
+def measure_latency(host, port=DEFAULT_PORT, count=DEFAULT_PINGS, interval=0.01, size=PING_SIZE):
+    """Time `count` request/echo round trips on one TCP connection and return RTT statistics and jitter."""
+    rtts = []
+    with _connect(host, port, count * (interval + 1)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _send_message(sock, {"mode": "ping", "size": size})
+        message = bytearray(size)
+        reply = bytearray(size)
+        for seq in range(count):
+            struct.pack_into("!I", message, 0, seq)
+            started = time.perf_counter()
+            sock.sendall(message)
+            if not _recv_exact(sock, reply):
+                raise ConnectionError("peer closed the connection")
+            rtts.append(time.perf_counter() - started)
+            time.sleep(interval)
+
+    ordered = sorted(rtts)
+    # Jitter as the mean difference between consecutive round trips (RFC 3550)
+    jitter = sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / max(len(rtts) - 1, 1)
+    return {
+        "count": count,
+        "min_ms": ordered[0] * 1000,
+        "avg_ms": sum(rtts) / len(rtts) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "jitter_ms": jitter * 1000,
+    }
+
+def run_peer_test(host, port=DEFAULT_PORT, streams=DEFAULT_STREAMS, duration=DEFAULT_DURATION,
+                  method="sendfile", directions=("upload", "download")):
+    """Measure latency, then throughput in each direction, against a seekr peer server."""
+    results = {"host": host, "port": port, "latency": measure_latency(host, port)}
+    for direction in directions:
+        results[direction] = measure_throughput(host, port, direction, streams, duration, method)
+    return results
+
+def format_rate(bits_per_second):
+    for unit in ("bps", "Kbps", "Mbps", "Gbps"):
+        if bits_per_second < 1000:
+            return f"{bits_per_second:.2f} {unit}"
+        bits_per_second /= 1000
+    return f"{bits_per_second:.2f} Tbps"
+
+def display_peer_results(results):
+    table = Table(title=f"Peer Throughput Test ({results['host']}:{results['port']})")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="magenta")
+
+    for direction in ("upload", "download"):
+        if direction in results:
+            result = results[direction]
+            table.add_row(
+                f"{direction.capitalize()} ({result['streams']} streams, {result['method']})",
+                format_rate(result["bits_per_second"]),
+            )
+            table.add_row(
+                "  per stream",
+                ", ".join(format_rate(rate) for rate in result["per_stream_bits_per_second"]),
+            )
+    latency = results["latency"]
+    table.add_row("Latency (min / avg / p99)", f"{latency['min_ms']:.3f} / {latency['avg_ms']:.3f} / {latency['p99_ms']:.3f} ms")
+    table.add_row("Jitter", f"{latency['jitter_ms']:.3f} ms")
+
+    console.print(table)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TCP throughput, latency and jitter between two seekr instances.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="wait for peer tests")
+    serve.add_argument("--bind", default="127.0.0.1", help="address to listen on (use 0.0.0.0 for every interface)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    test = commands.add_parser("test", help="test against a peer running 'serve'")
+    test.add_argument("host")
+    test.add_argument("--port", type=int, default=DEFAULT_PORT)
+    test.add_argument("--streams", type=int, default=DEFAULT_STREAMS)
+    test.add_argument("--duration", type=float, default=DEFAULT_DURATION)
+    test.add_argument("--method", choices=SEND_METHODS, default="sendfile")
+    test.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        with ThroughputServer(args.bind, args.port) as server:
+            console.print(f"[bold cyan]Waiting for peer tests on {args.bind}:{args.port} (Ctrl+C to stop)[/bold cyan]")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    results = run_peer_test(args.host, args.port, args.streams, args.duration, args.method)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        display_peer_results(results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
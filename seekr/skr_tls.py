@@ -0,0 +1,305 @@
+import ssl
+import time
+import asyncio
+import ipaddress
+from rich.console import Console
+from rich.table import Table
+from skr_scanner import scan_hosts
+from skr_governor import get_governor
+from skr_events import event_bus
+
+console = Console()
+
+# TLS inspection. Contexts are built once and shared by every handshake,
+# verification is optional so self-signed and IP-only certificates on
+# internal services are still harvested, and handshakes run concurrently.
+
+DEFAULT_CONCURRENCY = 500
+HANDSHAKE_TIMEOUT = 5
+MAX_AUDIT_HOSTS = 65536
+
+_contexts = {}
+
+def get_tls_context(verify=False):
+    """Return the shared client context, verifying certificates only when asked to."""
+    context = _contexts.get(verify)
+    if context is None:
+        if verify:
+            context = ssl.create_default_context()
+        else:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        _contexts[verify] = context
+    return context
+
+# Just enough of a DER reader to turn a certificate into getpeercert()'s
+# dict format, since the ssl module only decodes certificates it verified.
+_NAME_OIDS = {
+    "2.5.4.3": "commonName",
+    "2.5.4.5": "serialNumber",
+    "2.5.4.6": "countryName",
+    "2.5.4.7": "localityName",
+    "2.5.4.8": "stateOrProvinceName",
+    "2.5.4.9": "streetAddress",
+    "2.5.4.10": "organizationName",
+    "2.5.4.11": "organizationalUnitName",
+    "2.5.4.17": "postalCode",
+    "2.5.4.97": "organizationIdentifier",
+    "1.2.840.113549.1.9.1": "emailAddress",
+    "0.9.2342.19200300.100.1.25": "domainComponent",
+}
+_SAN_TYPES = {0x81: "email", 0x82: "DNS", 0x86: "URI", 0x87: "IP Address"}
+_SAN_OID = "2.5.29.17"
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+
+def _der_items(data):
+    """Yield (tag, value) for each DER element in `data`."""
+    offset = 0
+    while offset < len(data):
+        tag, length = data[offset], data[offset + 1]
+        offset += 2
+        if length & 0x80:
+            size = length & 0x7F
+            length = int.from_bytes(data[offset:offset + size], "big")
+            offset += size
+        if offset + length > len(data):
+            raise ValueError("truncated DER element")
+        yield tag, data[offset:offset + length]
+        offset += length
+
+def _der_first(data):
+    return next(_der_items(data))[1]
+
+def _der_oid(value):
+    arcs, arc = [], 0
+    for byte in value:
+        arc = arc << 7 | byte & 0x7F
+        if not byte & 0x80:
+            arcs.append(arc)
+            arc = 0
+    first = min(arcs[0] // 40, 2)
+    return ".".join(map(str, [first, arcs[0] - 40 * first] + arcs[1:]))
+
+def _der_string(tag, value):
+    if tag == 0x1E:  # BMPString
+        return value.decode("utf-16-be", "replace")
+    return value.decode("utf-8", "replace")
+
+def _der_name(value):
+    rdns = []
+    for _, rdn in _der_items(value):
+        attributes = []
+        for _, attribute in _der_items(rdn):
+            (_, oid), (tag, text) = _der_items(attribute)
+            oid = _der_oid(oid)
+            attributes.append((_NAME_OIDS.get(oid, oid), _der_string(tag, text)))
+        rdns.append(tuple(attributes))
+    return tuple(rdns)
+
+def _der_time(tag, value):
+    text = value.decode("ascii").rstrip("Z")
+    if tag == 0x17:  # UTCTime has a two-digit year
+        text = ("19" if int(text[:2]) >= 50 else "20") + text
+    year, month, day, clock = text[:4], int(text[4:6]), int(text[6:8]), text[8:14]
+    return f"{_MONTHS[month - 1]} {day:2d} {clock[:2]}:{clock[2:4]}:{clock[4:6]} {year} GMT"
+
+def _der_alt_names(value):
+    names = []
+    for tag, name in _der_items(_der_first(value)):
+        if tag == 0x87 and len(name) == 16:  # spelled out in full, as OpenSSL does
+            names.append(("IP Address", ":".join("%X" % int.from_bytes(name[i:i + 2], "big") for i in range(0, 16, 2))))
+        elif tag == 0x87:
+            names.append(("IP Address", str(ipaddress.ip_address(name))))
+        elif tag in _SAN_TYPES:
+            names.append((_SAN_TYPES[tag], name.decode("ascii", "replace")))
+    return tuple(names)
+
+def decode_certificate(der):
+    """Decode a DER certificate into the dict format of SSLSocket.getpeercert(); ValueError if malformed."""
+    try:
+        fields = list(_der_items(_der_first(_der_first(der))))
+        version = 1
+        if fields[0][0] == 0xA0:  # explicit version tag, absent on v1 certificates
+            version = int.from_bytes(_der_first(fields.pop(0)[1]), "big") + 1
+        serial = "%X" % int.from_bytes(fields[0][1], "big")
+        not_before, not_after = _der_items(fields[3][1])
+        info = {
+            "subject": _der_name(fields[4][1]),
+            "issuer": _der_name(fields[2][1]),
+            "version": version,
+            "serialNumber": serial.zfill(len(serial) + len(serial) % 2),
+            "notBefore": _der_time(*not_before),
+            "notAfter": _der_time(*not_after),
+        }
+        for tag, value in fields[6:]:
+            if tag != 0xA3:  # extensions
+                continue
+            for _, extension in _der_items(_der_first(value)):
+                parts = list(_der_items(extension))
+                if _der_oid(parts[0][1]) == _SAN_OID:
+                    info["subjectAltName"] = _der_alt_names(parts[-1][1])
+        return info
+    except (IndexError, ValueError, StopIteration) as e:
+        raise ValueError(f"malformed certificate: {e}") from None
+
+def _decode_chain(ders):
+    chain = []
+    for der in ders:
+        try:
+            chain.append(decode_certificate(der))
+        except ValueError:
+            break  # later certificates can't be placed without this one
+    return chain
+
+def peer_certificates(ssl_object):
+    """Return the decoded certificate chain the peer sent, leaf first."""
+    if hasattr(ssl_object, "get_unverified_chain"):
+        # Public since Python 3.13, as DER bytes
+        return _decode_chain(ssl_object.get_unverified_chain() or [])
+    sslobj = getattr(ssl_object, "_sslobj", None)
+    if sslobj is not None and hasattr(sslobj, "get_unverified_chain"):
+        # Python 3.10-3.12 only have the chain on the private _ssl object, and it is
+        # the only way to see intermediates there. Feature-checked, so a change to
+        # those internals falls through to the leaf below rather than breaking.
+        return [cert.get_info() for cert in sslobj.get_unverified_chain() or []]
+    der = ssl_object.getpeercert(binary_form=True)
+    return _decode_chain([der] if der else [])
+
+def summarize_certificate(info, now=None):
+    """Flatten a decoded certificate into subject, issuer, validity and SANs."""
+    now = time.time() if now is None else now
+    subject = dict(x[0] for x in info.get('subject', ()))
+    issuer = dict(x[0] for x in info.get('issuer', ()))
+    not_after = ssl.cert_time_to_seconds(info['notAfter']) if 'notAfter' in info else None
+    return {
+        "Subject": subject.get('commonName') or ", ".join(f"{k}={v}" for k, v in subject.items()),
+        "Issuer": issuer.get('commonName') or ", ".join(f"{k}={v}" for k, v in issuer.items()),
+        "Serial Number": info.get('serialNumber'),
+        "Not Before": info.get('notBefore'),
+        "Not After": info.get('notAfter'),
+        "Days Left": int((not_after - now) // 86400) if not_after else None,
+        "SANs": [value for _, value in info.get('subjectAltName', ())],
+        "Self Signed": info.get('subject') == info.get('issuer'),
+    }
+
+async def _handshake(host, port, context, server_name):
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, ssl=context, server_hostname=server_name),
+        HANDSHAKE_TIMEOUT,
+    )
+    try:
+        tls = writer.get_extra_info("ssl_object")
+        return tls.version(), tls.cipher(), peer_certificates(tls)
+    finally:
+        writer.close()
+
+async def harvest_certificate(host, port=443, verify=False, server_name=None):
+    """Handshake with one endpoint and record its chain, expiry, SANs and negotiated cipher."""
+    if server_name is None:
+        try:
+            ipaddress.ip_address(host)
+            server_name = ""  # no SNI for IP literals
+        except ValueError:
+            server_name = host
+
+    result = {"Host": host, "Port": port, "Version": None, "Cipher": None, "Verified": None, "Chain": [], "Error": None}
+    try:
+        try:
+            version, cipher, chain = await _handshake(host, port, get_tls_context(verify), server_name if verify else server_name or None)
+            result["Verified"] = True if verify else None
+        except ssl.SSLCertVerificationError as e:
+            # Still harvest what the server presents, just mark it as untrusted
+            result["Verified"] = False
+            result["Error"] = e.verify_message
+            version, cipher, chain = await _handshake(host, port, get_tls_context(False), server_name or None)
+    except (OSError, ssl.SSLError, asyncio.TimeoutError) as e:
+        result["Error"] = str(e) or type(e).__name__
+        return result
+
+    now = time.time()
+    result["Version"] = version
+    result["Cipher"] = cipher[0] if cipher else None
+    result["Chain"] = [summarize_certificate(info, now) for info in chain]
+    return result
+
+async def harvest_certificates(endpoints, verify=False, concurrency=DEFAULT_CONCURRENCY, progress=None):
+    """Harvest certificates from many (host, port) endpoints concurrently, yielding results as they finish."""
+    endpoints = list(endpoints)
+    async with get_governor().hold_sockets(min(concurrency, len(endpoints))) as granted:
+        limit = asyncio.Semaphore(granted)
+
+        async def run(host, port):
+            async with limit:
+                return await harvest_certificate(host, port, verify)
+
+        for finished in asyncio.as_completed([run(host, port) for host, port in endpoints]):
+            yield await finished
+            if progress:
+                progress(1)
+
+async def audit_tls_network(network, ports=(443,), verify=False, concurrency=DEFAULT_CONCURRENCY):
+    """Find TLS endpoints on a network (up to a /16) and harvest every certificate, handshaking as ports are found."""
+    network = ipaddress.ip_network(network, strict=False)
+    if network.num_addresses > MAX_AUDIT_HOSTS:
+        raise ValueError(f"{network} is larger than a /16")
+    hosts = [str(ip) for ip in network.hosts()] or [str(network.network_address)]
+    ports = list(ports)
+
+    limit = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def run(host, port):
+        async with limit:
+            results.append(await harvest_certificate(host, port, verify))
+
+    handshakes = []
+    with event_bus() as bus:
+        task = bus.add_task(f"[cyan]Sweeping {network} for TLS ports", total=len(hosts) * len(ports))
+        async for host, open_ports, error in scan_hosts(hosts, ports, ordered=False, progress=task.advance):
+            for port in open_ports:
+                handshakes.append(asyncio.create_task(run(host, port)))
+        task.update(description=f"[cyan]Harvesting {len(handshakes)} certificates")
+        await asyncio.gather(*handshakes)
+
+    return sorted(results, key=lambda result: (ipaddress.ip_address(result["Host"]), result["Port"]))
+
+def display_certificates(results):
+    table = Table(title="TLS Certificate Audit")
+    table.add_column("Endpoint", style="cyan")
+    table.add_column("Subject", style="magenta")
+    table.add_column("Issuer", style="blue")
+    table.add_column("Expires", style="yellow")
+    table.add_column("SANs", style="green")
+    table.add_column("TLS", style="cyan")
+    table.add_column("Chain", justify="right")
+
+    for result in results:
+        endpoint = f"{result['Host']}:{result['Port']}"
+        if not result["Chain"]:
+            table.add_row(endpoint, f"[red]{result['Error']}[/red]", "", "", "", "", "0")
+            continue
+        leaf = result["Chain"][0]
+        days = leaf["Days Left"]
+        if days is None:
+            expires = "Unknown"
+        elif days < 0:
+            expires = f"[bold red]expired {-days}d ago[/bold red]"
+        elif days < 30:
+            expires = f"[bold yellow]{days}d[/bold yellow]"
+        else:
+            expires = f"{days}d"
+        issuer = "self-signed" if leaf["Self Signed"] else leaf["Issuer"]
+        if result["Verified"] is False:
+            issuer += " [red](untrusted)[/red]"
+        table.add_row(
+            endpoint,
+            leaf["Subject"],
+            issuer,
+            expires,
+            ", ".join(leaf["SANs"][:4]) + (" ..." if len(leaf["SANs"]) > 4 else ""),
+            f"{result['Version']} {result['Cipher']}",
+            str(len(result["Chain"])),
+        )
+
+    console.print(table)
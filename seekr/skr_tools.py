@@ -4,40 +4,44 @@ import psutil
 import subprocess
 from rich.console import Console
 from rich.table import Table
-from rich.progress import track
 from rich.prompt import Confirm
+from skr_profile import profiled, span, count
+from skr_procfs import top_processes
+from skr_storage import track_directory_sizes
+from skr_records import to_dicts
 
 console = Console()
 
+@profiled()
 def get_directory_size(path):
     total_size = 0
+    files = 0
     for dirpath, _, filenames in os.walk(path):
+        files += len(filenames)
         for f in filenames:
             fp = os.path.join(dirpath, f)
             if os.path.exists(fp):
                 total_size += os.path.getsize(fp)
+    count("storage.directories_walked")
+    count("storage.stat_calls", 2 * files)  # exists() and getsize() per file
     return total_size
 
 def scan_directories(directories):
-    report = []
-    for dir in track(directories, description="Scanning directories..."):
-        if os.path.exists(dir):
-            size = get_directory_size(dir)
-            report.append({"Directory": dir, "SizeMB": round(size / (1024 * 1024), 2)})
-    return report
+    directories = list(directories)
+    return track_directory_sizes(directories, "Scanning directories...", len(directories))
 
 def get_all_drives():
     return [f"{chr(drive)}:\\" for drive in range(ord('A'), ord('Z') + 1) if os.path.exists(f"{chr(drive)}:\\")]
 
 def scan_drive(drive):
-    report = []
-    for root, dirs, _ in track(os.walk(drive), description=f"Scanning drive {drive}..."):
-        for d in dirs:
-            dir_path = os.path.join(root, d)
-            size = get_directory_size(dir_path)
-            report.append({"Directory": dir_path, "SizeMB": round(size / (1024 * 1024), 2)})
-    return report
-
+    directories = (
+        os.path.join(root, d)
+        for root, dirs, _ in os.walk(drive)
+        for d in dirs
+    )
+    return track_directory_sizes(directories, f"Scanning drive {drive}...")
+
+@profiled()
 def visualize_storage(report):
     if not report:
         console.print("No data available to visualize.", style="bold red")
@@ -48,13 +52,15 @@ def visualize_storage(report):
     table.add_column("Size (MB)", justify="right", style="magenta")
 
     try:
-        df = pd.DataFrame(report).sort_values(by="SizeMB", ascending=False).head(20)
+        with span("storage.pandas_sort", rows=len(report)):
+            df = pd.DataFrame(to_dicts(report)).sort_values(by="SizeMB", ascending=False).head(20)
         for _, row in df.iterrows():
             table.add_row(row["Directory"], str(row["SizeMB"]))
     except KeyError as e:
         console.print(f"Error: {e}. Ensure the report contains 'SizeMB' key.", style="bold red")
 
-    console.print(table)
+    with span("rich.render"):
+        console.print(table)
 
 def generate_storage_report():
     all_drives = get_all_drives()
@@ -69,7 +75,7 @@ def generate_storage_report():
         return
 
     report_path = os.path.join(os.path.expanduser("~"), "storage_report.csv")
-    pd.DataFrame(full_report).to_csv(report_path, index=False)
+    pd.DataFrame(to_dicts(full_report)).to_csv(report_path, index=False)
     console.print(f"Storage report generated at {report_path}", style="bold green")
 
     visualize_storage(full_report)
@@ -126,23 +132,15 @@ def optimize_performance():
     console.print("System optimization completed.", style="bold green")
 
 def analyze_running_processes():
-    processes = []
-    for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-        try:
-            proc.cpu_percent(interval=1)
-            processes.append(proc.info)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
+    processes = top_processes(interval=1, limit=10, sort_by="cpu_percent")
 
-    processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-    
     table = Table(title="Top 10 CPU-Consuming Processes")
     table.add_column("PID", style="cyan")
     table.add_column("Name", style="magenta")
     table.add_column("CPU %", style="green")
     table.add_column("Memory %", style="yellow")
 
-    for proc in processes[:10]:
+    for proc in processes:
         table.add_row(
             str(proc['pid']),
             proc['name'],
@@ -47,16 +47,20 @@ def check_dependencies():
         return False
     return True
 
-def load_config(config_file='seekr_config.ini'):
+DEFAULT_CONFIG = {
+    'LogLevel': 'INFO',
+    'OutputFormat': 'table',
+    'MaxThreads': '100',
+    'MaxOpenFiles': 'auto',  # the soft RLIMIT_NOFILE less a small reserve
+    'MaxSockets': 'auto',    # three quarters of MaxOpenFiles
+}
+
+def load_config(config_file='seekr_config.ini', create=True):
     config = ConfigParser()
+    config['DEFAULT'] = DEFAULT_CONFIG
     if os.path.exists(config_file):
         config.read(config_file)
-    else:
-        config['DEFAULT'] = {
-            'LogLevel': 'INFO',
-            'OutputFormat': 'table',
-            'MaxThreads': '100'
-        }
+    elif create:
         with open(config_file, 'w') as f:
             config.write(f)
     return config